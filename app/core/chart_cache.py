@@ -0,0 +1,178 @@
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from fastapi import Request, Response
+from app.db.signals import on_tables_changed
+
+logger = logging.getLogger(__name__)
+
+# 图表缓存的有效期（秒），过期后先返回旧图，同时在后台重新渲染
+CHART_CACHE_TTL = int(os.getenv('CHART_CACHE_TTL', '600'))
+
+
+class ChartEntry:
+    """
+    One rendered chart: PNG bytes plus the validators sent to the browser.
+    """
+
+    def __init__(self, png: bytes, render):
+        self.png = png
+        self.render = render
+        self.etag = '"' + hashlib.sha1(png).hexdigest() + '"'
+        self.rendered_at = time.time()
+        self.stale = False
+
+    def expired(self, ttl: int) -> bool:
+        return self.stale or time.time() - self.rendered_at > ttl
+
+
+class ChartCache:
+    """
+    In-memory cache of rendered dashboard PNGs, keyed by chart id and parameters.
+
+    - A miss renders in the request and stores the PNG; concurrent misses share the render.
+    - A hit past its TTL, or invalidated by a write, is served as is while a
+      background task re-renders it (stale-while-revalidate).
+    - Responses carry ETag / Last-Modified so browsers can revalidate with a 304.
+    """
+
+    def __init__(self, ttl: int = CHART_CACHE_TTL):
+        self.ttl = ttl
+        self._entries = {}
+        self._tables = {}
+        self._refreshing = {}
+        self._pending = {}
+        self._versions = {}
+        self._loop = None
+
+    def register(self, chart_id: str, tables):
+        """
+        Declare which base tables a chart is computed from, so writes to them invalidate it.
+        """
+        self._tables[chart_id] = set(tables)
+        self._versions.setdefault(self.make_key(chart_id), 0)
+        on_tables_changed(tables, self._on_tables_changed)
+
+    @staticmethod
+    def make_key(chart_id: str, params: dict = None):
+        return (chart_id, tuple(sorted((params or {}).items())))
+
+    async def get(self, chart_id: str, render, params: dict = None) -> ChartEntry:
+        """
+        Return the cached entry for (chart_id, params), rendering it on a miss.
+
+        Args:
+            chart_id: chart name, e.g. 'chart_1'
+            render: coroutine function returning PNG bytes
+            params: chart parameters that change the image
+        """
+        self._loop = asyncio.get_running_loop()
+        key = self.make_key(chart_id, params)
+        entry = self._entries.get(key)
+
+        if entry is None:
+            # 同一张图同时未命中的请求共用一次渲染
+            pending = self._pending.get(key)
+            if pending is None:
+                pending = asyncio.ensure_future(self._render_missing(key, render))
+                self._pending[key] = pending
+                pending.add_done_callback(lambda future: self._pending.pop(key, None))
+            entry = await asyncio.shield(pending)
+        elif entry.expired(self.ttl):
+            self._schedule_refresh(key)
+        return entry
+
+    async def _render_missing(self, key, render) -> ChartEntry:
+        version = self._versions.get(key, 0)
+        png = await render()
+        entry = ChartEntry(png, render)
+        # 渲染期间如有写入，这张图已经过期
+        entry.stale = self._versions.get(key, 0) != version
+        self._entries[key] = entry
+        return entry
+
+    async def respond(self, request: Request, chart_id: str, render, params: dict = None) -> Response:
+        """
+        Serve a chart as image/png, answering conditional requests with 304.
+        """
+        entry = await self.get(chart_id, render, params)
+        headers = {
+            'ETag': entry.etag,
+            'Last-Modified': formatdate(entry.rendered_at, usegmt=True),
+            'Cache-Control': 'no-cache',
+        }
+
+        if_none_match = request.headers.get('if-none-match')
+        if_modified_since = request.headers.get('if-modified-since')
+        if if_none_match is not None:
+            if entry.etag in [tag.strip() for tag in if_none_match.split(',')]:
+                return Response(status_code=304, headers=headers)
+        elif if_modified_since is not None:
+            try:
+                since = parsedate_to_datetime(if_modified_since).timestamp()
+                if int(entry.rendered_at) <= since:
+                    return Response(status_code=304, headers=headers)
+            except (TypeError, ValueError):
+                pass
+
+        return Response(content=entry.png, media_type='image/png', headers=headers)
+
+    def invalidate(self, chart_id: str = None):
+        """
+        Mark cached charts stale (all of them when chart_id is None) and re-render in the background.
+        """
+        for key in list(self._versions.keys() | self._entries.keys()):
+            if chart_id is None or key[0] == chart_id:
+                self._versions[key] = self._versions.get(key, 0) + 1
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry.stale = True
+                    self._schedule_refresh_threadsafe(key)
+
+    def _on_tables_changed(self, changed):
+        # 写接口运行在数据库线程池中，这里只标记过期并把重新渲染交给事件循环
+        for chart_id, tables in self._tables.items():
+            if tables & changed:
+                self.invalidate(chart_id)
+
+    def _schedule_refresh_threadsafe(self, key):
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._schedule_refresh(key)
+        else:
+            loop.call_soon_threadsafe(self._schedule_refresh, key)
+
+    def _schedule_refresh(self, key):
+        if key in self._refreshing or key not in self._entries:
+            return
+        self._refreshing[key] = asyncio.ensure_future(self._refresh(key))
+
+    async def _refresh(self, key):
+        entry = self._entries[key]
+        version = self._versions.get(key, 0)
+        try:
+            png = await entry.render()
+            fresh = ChartEntry(png, entry.render)
+            fresh.stale = self._versions.get(key, 0) != version
+            self._entries[key] = fresh
+        except Exception as e:
+            # 渲染失败时保留旧图，下次访问再重试
+            logger.error(f"Background re-render of {key[0]} failed: {e}")
+            return
+        finally:
+            self._refreshing.pop(key, None)
+        if fresh.stale:
+            # 刷新期间又有写入，再渲染一次
+            self._schedule_refresh(key)
+
+
+chart_cache = ChartCache()
@@ -0,0 +1,172 @@
+import io
+import warnings
+import matplotlib
+from matplotlib.figure import Figure
+from matplotlib.artist import setp
+from matplotlib.ticker import MaxNLocator
+import pandas as pd
+import seaborn as sns
+
+# 图表渲染函数：只使用面向对象的 Figure API，不依赖 pyplot 的全局状态，
+# 因此可以在渲染进程池中并发执行，互不干扰。
+# 每个函数接收 app/db/chart_data.py 返回的聚合行（list of dict），返回 PNG 字节。
+
+warnings.filterwarnings("ignore", category=UserWarning)
+
+
+def setup_style():
+    """
+    Apply the dashboard plot style. Called once per render worker process.
+    """
+    matplotlib.use('Agg')
+    # Set a professional plot style
+    sns.set_style("whitegrid")
+    matplotlib.rcParams['font.family'] = 'sans-serif'
+    matplotlib.rcParams['font.sans-serif'] = 'DejaVu Sans'
+
+
+def new_figure():
+    fig = Figure(figsize=(12, 7))
+    axes = fig.subplots(1, 1)
+    return fig, axes
+
+
+def to_png(fig) -> bytes:
+    # --- Final Touches ---
+    fig.tight_layout(rect=[0, 0, 1, 0.96])
+    img_buffer = io.BytesIO()
+    fig.savefig(img_buffer, format='png', bbox_inches='tight')
+    return img_buffer.getvalue()
+
+
+def chart_1(rows) -> bytes:
+    """
+    Current Employees per Department.
+    """
+    df1 = pd.DataFrame(rows)
+    fig, axes = new_figure()
+    sns.barplot(ax=axes, x='num_employees', y='dept_name', data=df1, palette='viridis', orient='h', hue='dept_name', legend=False)
+    axes.set_title('Current Employees per Department', fontsize=22, fontweight='bold')
+    axes.set_xlabel('Number of Employees', fontsize=12)
+    axes.set_ylabel('Department', fontsize=12)
+
+    for p in axes.patches:
+        width = p.get_width()
+        axes.annotate(
+            f'{width:.0f}',  # The text to display
+            (width, p.get_y() + p.get_height() / 2.),  # The (x, y) position
+            ha='left',          # Horizontal alignment
+            va='center',        # Vertical alignment
+            xytext=(5, 0),      # 5-point horizontal offset
+            textcoords='offset points'
+        )
+    return to_png(fig)
+
+
+def chart_2(rows) -> bytes:
+    """
+    Average Salary by Job Title Over Time.
+    """
+    df2 = pd.DataFrame(rows)
+    fig, axes = new_figure()
+    sns.lineplot(ax=axes, x='salary_year', y='avg_salary', hue='title', data=df2, marker='o', errorbar=None)
+    axes.xaxis.set_major_locator(MaxNLocator(integer=True))
+    setp(axes.get_xticklabels(), rotation=0, ha="right")
+    axes.set_title('Average Salary by Job Title Over Time', fontsize=22, fontweight='bold')
+    axes.set_xlabel('Year', fontsize=12)
+    axes.set_ylabel('Average Salary ($)', fontsize=12)
+    axes.ticklabel_format(style='plain', axis='y')
+    axes.legend(title='Job Title')
+    return to_png(fig)
+
+
+def chart_3(rows) -> bytes:
+    """
+    Gender Diversity in Current Roles.
+    """
+    df3 = pd.DataFrame(rows)
+    fig, axes = new_figure()
+    sns.barplot(ax=axes, x='title', y='num_employees', hue='gender', data=df3, palette='muted')
+    axes.set_title('Gender Diversity in Current Roles', fontsize=22, fontweight='bold')
+    axes.set_xlabel('Job Title', fontsize=12)
+    axes.set_ylabel('Number of Employees', fontsize=12)
+    axes.tick_params(axis='x', rotation=0)
+
+    for p in axes.patches:
+        height = p.get_height()
+        if height > 0:  # Only add labels to bars with a value
+            axes.annotate(
+                f'{height:.0f}',  # The text to display (as an integer)
+                (p.get_x() + p.get_width() / 2., height),  # The (x, y) position
+                ha='center',         # Horizontal alignment
+                va='bottom',         # Vertical alignment
+                xytext=(0, 5),       # 5-point vertical offset
+                textcoords='offset points'
+            )
+    return to_png(fig)
+
+
+def chart_4(rows) -> bytes:
+    """
+    Tenure Distribution of Current Employees, drawn from the per-department
+    five-number summaries computed in SQL (rows are ordered by median).
+    """
+    fig, axes = new_figure()
+
+    stats = [{
+        'label': row['dept_name'],
+        'whislo': row['whisker_low'],
+        'q1': row['q1'],
+        'med': row['median'],
+        'q3': row['q3'],
+        'whishi': row['whisker_high'],
+        'mean': row['mean_tenure'],
+        'fliers': [],
+    } for row in rows]
+    colors = sns.color_palette('plasma', len(stats))
+
+    boxes = axes.bxp(stats, positions=range(len(stats)), orientation='horizontal', widths=0.8,
+                     patch_artist=True, showfliers=False,
+                     medianprops=dict(color='0.25', linewidth=1.5))
+    for patch, color in zip(boxes['boxes'], colors):
+        patch.set_facecolor(color)
+        patch.set_edgecolor('0.25')
+    # 与 seaborn 横向箱线图一致：第一个部门在最上方
+    axes.set_ylim(len(stats) - 0.5, -0.5)
+    axes.set_title('Tenure Distribution of Current Employees', fontsize=22, fontweight='bold')
+    axes.set_xlabel('Tenure in Department (Years)', fontsize=12)
+    axes.set_ylabel('Department', fontsize=12)
+
+    for y, row in enumerate(rows):
+        summary = {
+            'Min': row['min_tenure'],
+            'Q1': row['q1'],
+            'Median': row['median'],
+            'Q3': row['q3'],
+            'Max': row['max_tenure']
+        }
+
+        for key, value in summary.items():
+            axes.text(x=value, y=y - 0.3, s=f'{value:.1f}', ha='center',
+                      va='center', fontweight='bold', color='white', fontsize=10,
+                      bbox=dict(boxstyle='round,pad=0.2', fc='black', alpha=0.6))
+    return to_png(fig)
+
+
+RENDERERS = {
+    'chart_1': chart_1,
+    'chart_2': chart_2,
+    'chart_3': chart_3,
+    'chart_4': chart_4,
+}
+
+
+def render_chart(spec: str, data) -> bytes:
+    """
+    Render chart `spec` (e.g. 'chart_1') from its data. Entry point of the render workers.
+    """
+    try:
+        renderer = RENDERERS[spec]
+    except KeyError:
+        raise ValueError(f"Unknown chart: {spec}")
+    return renderer(data)
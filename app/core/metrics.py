@@ -0,0 +1,215 @@
+import bisect
+import contextvars
+import threading
+import time
+
+
+# 轻量的 Prometheus 文本格式指标：计数器、仪表、直方图，以及记录每个请求耗时的 ASGI 中间件。
+# 数据库相关指标在 app/db/instrumentation.py 中定义，/metrics 接口见 app/router/metrics.py。
+
+# 默认直方图分桶（秒）
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+registry = []
+
+# 当前请求的 ASGI scope；run_db 会把上下文带到数据库线程，数据库指标据此按路由打标签
+_request_scope = contextvars.ContextVar('request_scope', default=None)
+
+
+def current_route() -> str:
+    """
+    Route template of the request being served (e.g. '/employees/{emp_no}'),
+    'unmatched' before routing, or '-' outside of a request.
+    """
+    scope = _request_scope.get()
+    if scope is None:
+        return '-'
+    route = scope.get('route')
+    return getattr(route, 'path', None) or 'unmatched'
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs += [f'{name}="{_escape(value)}"' for name, value in extra]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        registry.append(self)
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def header(self):
+        return [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+
+
+class Counter(Metric):
+    """
+    Monotonic counter.
+    """
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def collect(self):
+        with self._lock:
+            values = dict(self._values)
+        lines = self.header()
+        for key, value in sorted(values.items()):
+            lines.append(f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}')
+        return lines
+
+
+class Gauge(Metric):
+    """
+    Value that goes up and down. With `function`, the value is read at scrape time;
+    the function returns a number, or a dict of {label values tuple: number}.
+    """
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=(), function=None):
+        super().__init__(name, documentation, labelnames)
+        self._values = {}
+        self._function = function
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def collect(self):
+        if self._function is not None:
+            value = self._function()
+            values = value if isinstance(value, dict) else {(): value}
+        else:
+            with self._lock:
+                values = dict(self._values)
+        lines = self.header()
+        for key, value in sorted(values.items()):
+            lines.append(f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}')
+        return lines
+
+
+class Histogram(Metric):
+    """
+    Cumulative histogram with fixed buckets (in seconds by convention).
+    """
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def collect(self):
+        with self._lock:
+            snapshot = {key: (list(counts), total, count) for key, (counts, total, count) in self._series.items()}
+        lines = self.header()
+        for key, (counts, total, count) in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, [('le', _format_value(float(bound)))])
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f'{self.name}_sum{labels} {_format_value(total)}')
+            lines.append(f'{self.name}_count{labels} {count}')
+        return lines
+
+
+def render_metrics() -> str:
+    """
+    All registered metrics in the Prometheus text exposition format.
+    """
+    lines = []
+    for metric in list(registry):
+        lines.extend(metric.collect())
+    return '\n'.join(lines) + '\n'
+
+
+http_request_duration = Histogram(
+    'http_request_duration_seconds',
+    'HTTP request latency by route template, including streaming the body.',
+    ('method', 'route', 'status'),
+)
+http_requests_in_flight = Gauge(
+    'http_requests_in_flight',
+    'HTTP requests currently being served.',
+)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing every HTTP request by method, route template and status.
+    It also exposes the request scope to the DB instrumentation via a context variable.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def _track(self, delta):
+        with self._lock:
+            self._in_flight += delta
+            http_requests_in_flight.set(self._in_flight)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        token = _request_scope.set(scope)
+        status = {'code': 500}
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                status['code'] = message['status']
+            await send(message)
+
+        self._track(1)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_request_duration.observe(
+                time.perf_counter() - start,
+                method=scope['method'], route=current_route(), status=status['code'],
+            )
+            self._track(-1)
+            _request_scope.reset(token)
@@ -0,0 +1,84 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+logger = logging.getLogger(__name__)
+
+# 渲染进程数，默认使用全部 CPU 核心
+CHART_RENDER_WORKERS = int(os.getenv('CHART_RENDER_WORKERS', str(os.cpu_count() or 1)))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _init_worker():
+    # 在子进程启动时预先导入 matplotlib / seaborn 并设置样式，避免首个请求承担导入开销
+    from app.core.charts import setup_style
+    setup_style()
+
+
+def get_render_pool() -> ProcessPoolExecutor:
+    """
+    Return the shared chart render pool, creating it on first use.
+    Workers are spawned (not forked) so they never inherit DB connections or threads.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=CHART_RENDER_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+            )
+        return _pool
+
+
+def _discard_pool(pool):
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def render_png(spec: str, data) -> bytes:
+    """
+    Render chart `spec` from `data` (usually a DataFrame) in the process pool.
+
+    Returns:
+        bytes: PNG image
+    """
+    from app.core.charts import render_chart
+
+    loop = asyncio.get_running_loop()
+    pool = get_render_pool()
+    try:
+        return await loop.run_in_executor(pool, render_chart, spec, data)
+    except BrokenProcessPool:
+        # 某个渲染进程异常退出，重建进程池后重试一次
+        logger.error(f"Chart render pool broken while rendering {spec}, restarting it")
+        _discard_pool(pool)
+        return await loop.run_in_executor(get_render_pool(), render_chart, spec, data)
+
+
+async def warm_render_pool():
+    """
+    Start all render workers now instead of on the first chart request.
+    """
+    pool = get_render_pool()
+    await asyncio.gather(*[asyncio.wrap_future(pool.submit(os.getpid)) for _ in range(CHART_RENDER_WORKERS)])
+
+
+def shutdown_render_pool():
+    """
+    Stop the render workers.
+    """
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True)
@@ -0,0 +1,111 @@
+import asyncio
+import functools
+import inspect
+from collections.abc import Mapping
+from datetime import timedelta
+from decimal import Decimal
+from typing import Any, Literal
+
+import orjson
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.responses import JSONResponse, Response
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+
+# 接口返回的是 SQLAlchemy RowMapping 列表，默认由 jsonable_encoder 逐个值在 Python 中转换后再 json.dumps。
+# 这里改用 orjson 直接序列化：日期、numpy 数值等原生支持，其他类型由 _default 转换，
+# 输出与 jsonable_encoder 一致（Decimal 为数字、timedelta 为秒数）。
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+# 列表接口 format 查询参数的取值，见 as_format
+ResponseFormat = Literal['json', 'columnar']
+
+
+def _default(value):
+    if isinstance(value, Mapping):
+        return dict(value)
+    if isinstance(value, Decimal):
+        return int(value) if value.as_tuple().exponent >= 0 else float(value)
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode='json')
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if isinstance(value, bytes):
+        return value.decode()
+    # sqlalchemy Row 等序列
+    if hasattr(value, '__iter__') and not isinstance(value, str):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content) -> bytes:
+    """
+    Serialize `content` to JSON bytes with orjson (RowMappings, dates, Decimals included).
+    """
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response serialized with orjson; the app's default response class.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class FastJSONRoute(APIRoute):
+    """
+    Route whose endpoint result goes straight to FastJSONResponse, skipping
+    FastAPI's jsonable_encoder pass over every value.
+
+    Only applies to async endpoints without a response model (declared or
+    inferred from the return annotation) or an explicit response_class; the
+    others keep FastAPI's validation and serialization. Results that already
+    are a Response are returned as is.
+    """
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        if isinstance(kwargs.get('response_model'), DefaultPlaceholder) \
+                and isinstance(kwargs.get('response_class', DefaultPlaceholder(None)), DefaultPlaceholder) \
+                and inspect.signature(endpoint).return_annotation is inspect.Signature.empty \
+                and asyncio.iscoroutinefunction(endpoint):
+            endpoint = _respond_directly(endpoint, kwargs.get('status_code') or 200)
+        super().__init__(path, endpoint, **kwargs)
+
+
+def _respond_directly(endpoint, status_code: int):
+    # functools.wraps 保留原函数签名，FastAPI 仍按原参数解析查询参数和请求体
+    @functools.wraps(endpoint)
+    async def wrapper(*args, **kwargs):
+        content = await endpoint(*args, **kwargs)
+        if isinstance(content, Response):
+            return content
+        return FastJSONResponse(content, status_code=status_code)
+    return wrapper
+
+
+def as_format(result, format: str = 'json'):
+    """
+    Return a list endpoint result in the requested format.
+
+    - json: unchanged, one object per row
+    - columnar: {"columns": [...], "rows": [[...], ...]}, column names sent once
+      and each row as a plain list; a keyset page keeps its "next_cursor"
+
+    `result` is a list of row mappings or a {"data": [...], ...} page; it is not modified.
+    """
+    if format != 'columnar':
+        return result
+    if isinstance(result, Mapping) and 'data' in result:
+        page = {key: value for key, value in result.items() if key != 'data'}
+        return {**_columns_and_rows(result['data']), **page}
+    return _columns_and_rows(result)
+
+
+def _columns_and_rows(rows):
+    if not rows:
+        return {"columns": [], "rows": []}
+    return {"columns": list(rows[0].keys()), "rows": [list(row.values()) for row in rows]}
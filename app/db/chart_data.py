@@ -0,0 +1,183 @@
+import os
+from decimal import Decimal
+from sqlalchemy import text
+from .init import engine
+from .result_cache import cached
+
+# 仪表盘图表的数据：全部在 SQL 中聚合，每张图只返回几十行。
+# /charts/{id}/data 直接返回这些数据，/chart_N 的 PNG 也由同一份数据渲染。
+
+# --- Chart 1: Number of employees in each department ---
+chart_1_sql = """
+SELECT
+    d.dept_name,
+    COUNT(de.emp_no) AS num_employees
+FROM
+    dept_emp de
+JOIN
+    departments d ON de.dept_no = d.dept_no
+WHERE
+    de.to_date = '9999-01-01'
+GROUP BY
+    d.dept_name
+ORDER BY
+    num_employees DESC
+"""
+
+# --- Chart 2: Average salary over time BY JOB TITLE ---
+chart_2_sql = """
+SELECT
+    YEAR(s.from_date) AS salary_year,
+    t.title,
+    AVG(s.salary) AS avg_salary
+FROM
+    salaries s
+JOIN
+    titles t ON s.emp_no = t.emp_no
+    AND s.from_date BETWEEN t.from_date AND t.to_date
+GROUP BY
+    salary_year,
+    t.title
+ORDER BY
+    salary_year,
+    t.title
+"""
+
+# --- Chart 3: Gender diversity in roles ---
+chart_3_sql = """
+SELECT
+    t.title,
+    e.gender,
+    COUNT(e.emp_no) AS num_employees
+FROM
+    employees e
+JOIN
+    titles t ON e.emp_no = t.emp_no
+WHERE
+    t.to_date = '9999-01-01'
+GROUP BY
+    t.title,
+    e.gender
+ORDER BY
+    num_employees DESC
+"""
+
+# --- Chart 4: Employee tenure distribution per department ---
+# 五数概括在 SQL 中计算：ROW_NUMBER / COUNT 窗口取出分位点两侧的值再线性插值
+# （与 pandas describe() 的默认算法一致），须线取 1.5 倍 IQR 以内的最远值。
+# 当前在职记录的结束日期用数据集最后日期代替，MAX(to_date) 只在 CTE 中计算一次。
+chart_4_sql = """
+WITH last_date AS (
+    SELECT MAX(to_date) AS max_to_date
+    FROM dept_emp
+    WHERE to_date != '9999-01-01'
+),
+tenures AS (
+    SELECT
+        de.dept_no,
+        DATEDIFF(
+            IF(de.to_date = '9999-01-01', l.max_to_date, de.to_date),
+            de.from_date
+        ) / 365.25 AS tenure
+    FROM dept_emp de
+    CROSS JOIN last_date l
+),
+ranked AS (
+    SELECT
+        dept_no,
+        tenure,
+        ROW_NUMBER() OVER (PARTITION BY dept_no ORDER BY tenure) AS rn,
+        COUNT(*) OVER (PARTITION BY dept_no) AS cnt
+    FROM tenures
+),
+picks AS (
+    SELECT
+        dept_no,
+        cnt,
+        MIN(tenure) AS min_tenure,
+        MAX(tenure) AS max_tenure,
+        AVG(tenure) AS mean_tenure,
+        MAX(CASE WHEN rn = FLOOR((cnt - 1) * 0.25) + 1 THEN tenure END) AS q1_lo,
+        MAX(CASE WHEN rn = LEAST(FLOOR((cnt - 1) * 0.25) + 2, cnt) THEN tenure END) AS q1_hi,
+        MAX(CASE WHEN rn = FLOOR((cnt - 1) * 0.5) + 1 THEN tenure END) AS q2_lo,
+        MAX(CASE WHEN rn = LEAST(FLOOR((cnt - 1) * 0.5) + 2, cnt) THEN tenure END) AS q2_hi,
+        MAX(CASE WHEN rn = FLOOR((cnt - 1) * 0.75) + 1 THEN tenure END) AS q3_lo,
+        MAX(CASE WHEN rn = LEAST(FLOOR((cnt - 1) * 0.75) + 2, cnt) THEN tenure END) AS q3_hi
+    FROM ranked
+    GROUP BY dept_no, cnt
+),
+quartiles AS (
+    SELECT
+        dept_no,
+        cnt,
+        min_tenure,
+        max_tenure,
+        mean_tenure,
+        q1_lo + ((cnt - 1) * 0.25 - FLOOR((cnt - 1) * 0.25)) * (q1_hi - q1_lo) AS q1,
+        q2_lo + ((cnt - 1) * 0.5 - FLOOR((cnt - 1) * 0.5)) * (q2_hi - q2_lo) AS median,
+        q3_lo + ((cnt - 1) * 0.75 - FLOOR((cnt - 1) * 0.75)) * (q3_hi - q3_lo) AS q3
+    FROM picks
+)
+SELECT
+    d.dept_name,
+    q.cnt AS num_records,
+    q.min_tenure,
+    q.q1,
+    q.median,
+    q.q3,
+    q.max_tenure,
+    q.mean_tenure,
+    MIN(CASE WHEN t.tenure >= q.q1 - 1.5 * (q.q3 - q.q1) THEN t.tenure END) AS whisker_low,
+    MAX(CASE WHEN t.tenure <= q.q3 + 1.5 * (q.q3 - q.q1) THEN t.tenure END) AS whisker_high,
+    SUM(t.tenure < q.q1 - 1.5 * (q.q3 - q.q1) OR t.tenure > q.q3 + 1.5 * (q.q3 - q.q1)) AS num_outliers
+FROM quartiles q
+JOIN tenures t ON t.dept_no = q.dept_no
+JOIN departments d ON d.dept_no = q.dept_no
+GROUP BY d.dept_name, q.cnt, q.min_tenure, q.q1, q.median, q.q3, q.max_tenure, q.mean_tenure
+ORDER BY q.median DESC
+"""
+
+# 图表 -> (SQL, 依赖的基础表)
+CHARTS = {
+    'chart_1': (chart_1_sql, ('dept_emp', 'departments')),
+    'chart_2': (chart_2_sql, ('salaries', 'titles')),
+    'chart_3': (chart_3_sql, ('employees', 'titles')),
+    'chart_4': (chart_4_sql, ('dept_emp', 'departments')),
+}
+
+# 图表数据由结果缓存保存，写入依赖表后失效；/exec、重新导入数据等不经过写接口的修改由 TTL 兜底，
+# TTL 与图片缓存相同，图片过期后在后台重新渲染时数据也已过期，会重新查询
+CHART_DATA_TTL = int(os.getenv('CHART_CACHE_TTL', '600'))
+CHART_SOURCES = sorted({table for sql, tables in CHARTS.values() for table in tables})
+
+
+def _plain(value):
+    # DECIMAL 聚合结果转成 float，便于 JSON 输出和传给渲染进程
+    return float(value) if isinstance(value, Decimal) else value
+
+
+@cached(*CHART_SOURCES, ttl=CHART_DATA_TTL)
+def db_get_chart_data(chart_id: str):
+    """
+    Return the aggregated series behind a dashboard chart, computing it on a miss.
+
+    Args:
+        chart_id: 'chart_1' .. 'chart_4'
+
+    Returns:
+        list of row dicts, or None for an unknown chart
+    """
+    if chart_id not in CHARTS:
+        return None
+
+    sql = CHARTS[chart_id][0]
+    with engine.connect() as conn:
+        result = conn.execute(text(sql))
+        return [{key: _plain(value) for key, value in row.items()} for row in result.mappings()]
+
+
+def chart_tables(chart_id: str):
+    """
+    Base tables a chart is computed from.
+    """
+    return CHARTS[chart_id][1]
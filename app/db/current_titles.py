@@ -0,0 +1,157 @@
+import sys
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date
+from sqlalchemy import text, bindparam
+from .snapshots import ReloadingSnapshot
+from app.core.metrics import Gauge
+
+# 当前职称索引：每个员工最近一条职称记录（按 from_date 取最新），按职称开始日期排序存成紧凑数组。
+# "截至 D 在同一职称超过 N 天" 即 开始日期 <= D - N，二分查找得到匹配的前缀，分页只是取其中一段。
+# titles / employees 有写入时在后台线程只重新读取写入的员工，在索引的副本中替换他们的条目。
+
+# 依赖的基础表：写入这些表后更新
+CURRENT_TITLE_SOURCES = ('titles', 'employees')
+
+# 按员工、开始日期顺序读取全部职称记录，每个员工保留最后一条
+current_titles_sql = """
+    SELECT emp_no, title, from_date
+    FROM titles
+    ORDER BY emp_no, from_date
+    """
+
+# 同上，只读取部分员工（增量更新）
+employee_titles_sql = """
+    SELECT emp_no, title, from_date
+    FROM titles
+    WHERE emp_no IN :emp_nos
+    ORDER BY emp_no, from_date
+    """
+
+
+def _ordinal(value) -> int:
+    # MySQL 返回 date，SQLite 替身库返回 'YYYY-MM-DD' 字符串
+    return (value if isinstance(value, date) else date.fromisoformat(str(value))).toordinal()
+
+
+class CurrentTitles:
+    """
+    Latest title of every employee, ordered by (title start date, emp_no).
+
+    `start_days[i]` is the start date (as a date ordinal) of the i-th entry,
+    `emp_nos[i]` its employee and `titles[title_ids[i]]` its title.
+    """
+
+    __slots__ = ('start_days', 'emp_nos', 'title_ids', 'titles', 'loaded_at')
+
+    def __init__(self, entries):
+        entries.sort()
+        titles = sorted({title for day, emp_no, title in entries})
+        title_ids = {title: i for i, title in enumerate(titles)}
+        self.start_days = array('i', (day for day, emp_no, title in entries))
+        self.emp_nos = array('i', (emp_no for day, emp_no, title in entries))
+        self.title_ids = array('H', (title_ids[title] for day, emp_no, title in entries))
+        self.titles = tuple(sys.intern(title) for title in titles)
+        self.loaded_at = time.time()
+
+    def __len__(self):
+        return len(self.emp_nos)
+
+    def started_by(self, day: date) -> int:
+        """
+        Number of entries whose title started on or before `day` (they form a prefix).
+        """
+        return bisect_right(self.start_days, day.toordinal())
+
+    def entry(self, i: int):
+        """
+        (emp_no, title, start date) of the i-th entry.
+        """
+        return self.emp_nos[i], self.titles[self.title_ids[i]], date.fromordinal(self.start_days[i])
+
+    def replace(self, changed, entries) -> 'CurrentTitles':
+        """
+        Copy with the entries of the `changed` employees replaced by `entries`
+        ((start day ordinal, emp_no, title) triples); this index is left as it is.
+        """
+        start_days = array('i', self.start_days)
+        emp_nos = array('i', self.emp_nos)
+        title_ids = array('H', self.title_ids)
+        titles = list(self.titles)
+        for emp_no in changed:
+            # 数组按开始日期排序，按员工编号查找是线性的，但在 C 中完成
+            try:
+                i = emp_nos.index(emp_no)
+            except ValueError:
+                continue
+            del start_days[i], emp_nos[i], title_ids[i]
+
+        ids = {title: i for i, title in enumerate(titles)}
+        for day, emp_no, title in entries:
+            if title not in ids:
+                ids[title] = len(titles)
+                titles.append(sys.intern(title))
+            # 同一开始日期内按员工编号排序
+            lo = bisect_left(start_days, day)
+            i = bisect_left(emp_nos, emp_no, lo, bisect_right(start_days, day, lo))
+            start_days.insert(i, day)
+            emp_nos.insert(i, emp_no)
+            title_ids.insert(i, ids[title])
+
+        updated = CurrentTitles.__new__(CurrentTitles)
+        updated.start_days, updated.emp_nos, updated.title_ids = start_days, emp_nos, title_ids
+        updated.titles = tuple(titles)
+        updated.loaded_at = time.time()
+        return updated
+
+def _latest_entries(rows):
+    # rows 按员工、开始日期排序；同一员工后读到的记录更新
+    latest = {}
+    for emp_no, title, from_date in rows:
+        latest[emp_no] = (title, from_date)
+    return [(_ordinal(from_date), emp_no, title) for emp_no, (title, from_date) in latest.items()]
+
+
+def load_current_titles(conn) -> CurrentTitles:
+    """
+    Read the latest title of every employee into a new CurrentTitles.
+    """
+    # 记录数量大，流式读取
+    rows = conn.execution_options(stream_results=True).execute(text(current_titles_sql))
+    return CurrentTitles(_latest_entries(rows))
+
+
+def update_current_titles(conn, index: CurrentTitles, emp_nos) -> CurrentTitles:
+    """
+    Copy of `index` with the latest titles of `emp_nos` re-read.
+    """
+    sql = text(employee_titles_sql).bindparams(bindparam('emp_nos', expanding=True))
+    rows = conn.execute(sql, {"emp_nos": sorted(emp_nos)})
+    return index.replace(emp_nos, _latest_entries(rows))
+
+
+class CurrentTitleIndex(ReloadingSnapshot):
+    """
+    Holder of the current CurrentTitles, updated after writes to CURRENT_TITLE_SOURCES.
+    """
+
+    name = 'Current titles'
+
+    def load(self, conn) -> CurrentTitles:
+        return load_current_titles(conn)
+
+    def update(self, conn, snapshot: CurrentTitles, emp_nos, dept_nos) -> CurrentTitles:
+        # 只写了部门时没有员工的职称变化
+        return update_current_titles(conn, snapshot, emp_nos) if emp_nos else snapshot
+
+    def describe(self, snapshot: CurrentTitles) -> str:
+        return f"{len(snapshot)} employees"
+
+
+current_titles = CurrentTitleIndex(CURRENT_TITLE_SOURCES)
+
+Gauge('current_titles_employees', 'Employees in the in-memory current-title index.',
+      function=lambda: len(current_titles.current) if current_titles.loaded else 0)
+Gauge('current_titles_age_seconds', 'Seconds since the in-memory current-title index was loaded or updated.',
+      function=lambda: time.time() - current_titles.current.loaded_at if current_titles.loaded else 0)
@@ -1,8 +1,12 @@
 from sqlalchemy import text
 from .init import engine
+from .signals import tables_changed
+from .maintenance import sync_derived
+from .result_cache import cached
 from datetime import datetime
 from fastapi import HTTPException
 
+@cached('departments')
 def db_dept_list(Page_Number: int, Row_Count: int, Dept_ID: str, Dept_Name: str):
     """
     Query a department list with pagination and optional filtering conditions.
@@ -72,6 +76,7 @@ def db_add_dept(Dept_ID: str, Dept_Name: str):
             # 2. EXECUTE database logic inside its own try block
             result = conn.execute(text(sql), params)
             conn.commit()
+            tables_changed('departments', dept_nos=[Dept_ID])
             return {"rowcount": result.rowcount, "status": "success"}
         
         except Exception as e:
@@ -102,7 +107,9 @@ def db_update_dept(Dept_ID: str, Dept_Name: str):
         try:
             # 2. EXECUTE database logic
             result = conn.execute(text(sql), params)
+            sync_derived(conn, 'departments', dept_nos=[Dept_ID])
             conn.commit()
+            tables_changed('departments', dept_nos=[Dept_ID])
             
             if result.rowcount > 0:
                 return {"rowcount": result.rowcount, "status": "success"}
@@ -138,7 +145,9 @@ def db_del_dept(Dept_ID: str):
         try:
             # 1. EXECUTE database logic
             result = conn.execute(text(sql), params)
+            sync_derived(conn, 'departments', dept_nos=[Dept_ID])
             conn.commit()
+            tables_changed('departments', dept_nos=[Dept_ID])
 
             if result.rowcount > 0:
                 return {"rowcount": result.rowcount, "status": "success"}
@@ -151,6 +160,7 @@ def db_del_dept(Dept_ID: str):
             return {"rowcount": 0, "status": "error", "message": str(e)}
 
 
+@cached('departments')
 def db_get_dept_info(Dept_ID: str):
     """
     Query a department info with department ID.
@@ -1,12 +1,16 @@
 from sqlalchemy import text
 from .init import engine
+from .signals import tables_changed
+from .maintenance import sync_derived, capture_derived
+from .pagination import decode_cursor, keyset_where, next_page
 from datetime import datetime
 
-def db_dept_manager_list(Page_Number: int, Row_Count: int, Employee_ID: int, Dept_Number: str, From_Date: str, To_Date: str):
+def db_dept_manager_list(Page_Number: int, Row_Count: int, Employee_ID: int, Dept_Number: str, From_Date: str, To_Date: str, Cursor: str = None):
     """
     Query a department manager list with pagination and optional filtering conditions.
     Only shows current managers (where MAX(to_date) = '9999-01-01').
     And use a dictionary mapping to simplify the conditional concatenation logic.
+    Pass `Cursor` (empty for the first page) to page by primary key instead of OFFSET.
     """
     Page_Number = Page_Number or 1
     Row_Count = Row_Count or 10
@@ -49,23 +53,39 @@ def db_dept_manager_list(Page_Number: int, Row_Count: int, Employee_ID: int, Dep
                 else:
                     params[key] = value
         
+        # 游标模式：按主键 (emp_no, dept_no) 从上一页最后一行之后继续扫描
+        if Cursor is not None:
+            after = decode_cursor(Cursor, 2)
+            if after is not None:
+                clause, cursor_params = keyset_where(['dm.emp_no', 'dm.dept_no'], after)
+                where_clauses.append(clause)
+                params.update(cursor_params)
+
         if where_clauses:
             sql += ' AND ' + ' AND '.join(where_clauses)
 
-        sql += ' LIMIT :page_size OFFSET :offset'
-        params['page_size'] = Row_Count
-        params['offset'] = (Page_Number - 1) * Row_Count
+        if Cursor is not None:
+            # 多取一行用于判断是否还有下一页
+            sql += ' ORDER BY dm.emp_no, dm.dept_no LIMIT :page_size'
+            params['page_size'] = Row_Count + 1
+        else:
+            sql += ' LIMIT :page_size OFFSET :offset'
+            params['page_size'] = Row_Count
+            params['offset'] = (Page_Number - 1) * Row_Count
 
         # Execute the query by passing the SQL string and the parameters dictionary
         result = conn.execute(text(sql), params)
 
         data = result.mappings().all()
+        if Cursor is not None:
+            return next_page(data, ['emp_no', 'dept_no'], Row_Count)
         return data
 
-def db_dept_manager_list_all(Page_Number: int, Row_Count: int, Employee_ID: int, Dept_Number: str, From_Date: str, To_Date: str):
+def db_dept_manager_list_all(Page_Number: int, Row_Count: int, Employee_ID: int, Dept_Number: str, From_Date: str, To_Date: str, Cursor: str = None):
     """
     Query all department manager records (including historical) with pagination and optional filtering conditions.
     This is for viewing all managers, not just current ones.
+    Pass `Cursor` (empty for the first page) to page by primary key instead of OFFSET.
     """
     Page_Number = Page_Number or 1
     Row_Count = Row_Count or 10
@@ -99,17 +119,32 @@ def db_dept_manager_list_all(Page_Number: int, Row_Count: int, Employee_ID: int,
                 else:
                     params[key] = value
         
+        # 游标模式：按主键 (emp_no, dept_no) 从上一页最后一行之后继续扫描
+        if Cursor is not None:
+            after = decode_cursor(Cursor, 2)
+            if after is not None:
+                clause, cursor_params = keyset_where(['emp_no', 'dept_no'], after)
+                where_clauses.append(clause)
+                params.update(cursor_params)
+
         if where_clauses:
             sql += ' WHERE ' + ' AND '.join(where_clauses)
 
-        sql += ' LIMIT :page_size OFFSET :offset'
-        params['page_size'] = Row_Count
-        params['offset'] = (Page_Number - 1) * Row_Count
+        if Cursor is not None:
+            # 多取一行用于判断是否还有下一页
+            sql += ' ORDER BY emp_no, dept_no LIMIT :page_size'
+            params['page_size'] = Row_Count + 1
+        else:
+            sql += ' LIMIT :page_size OFFSET :offset'
+            params['page_size'] = Row_Count
+            params['offset'] = (Page_Number - 1) * Row_Count
 
         # Execute the query by passing the SQL string and the parameters dictionary
         result = conn.execute(text(sql), params)
 
         data = result.mappings().all()
+        if Cursor is not None:
+            return next_page(data, ['emp_no', 'dept_no'], Row_Count)
         return data
 
 def normalize_date_string(date_string: str) -> str:
@@ -177,7 +212,9 @@ def db_add_dept_manager(Employee_ID: int, Dept_Number: str, From_Date: str, To_D
         try:
             # 2. EXECUTE database logic inside its own try block
             result = conn.execute(text(sql), params)
+            sync_derived(conn, 'dept_manager', [Employee_ID], dept_nos=[Dept_Number])
             conn.commit()
+            tables_changed('dept_manager', emp_nos=[Employee_ID], dept_nos=[Dept_Number])
             return {"rowcount": result.rowcount, "status": "success"}
         
         except Exception as e:
@@ -218,8 +255,11 @@ def db_update_dept_manager(Employee_ID: int, Dept_Number: str, From_Date: str, T
 
         try:
             # 2. EXECUTE database logic
+            before = capture_derived(conn, 'dept_manager', [Employee_ID], [Dept_Number])
             result = conn.execute(text(sql), params)
+            sync_derived(conn, 'dept_manager', [Employee_ID], before, dept_nos=[Dept_Number])
             conn.commit()
+            tables_changed('dept_manager', emp_nos=[Employee_ID], dept_nos=[Dept_Number])
             
             if result.rowcount > 0:
                 return {"rowcount": result.rowcount, "status": "success"}
@@ -245,8 +285,11 @@ def db_del_dept_manager(Employee_ID: int, Dept_Number: str):
 
         try:
             # 1. EXECUTE database logic
+            before = capture_derived(conn, 'dept_manager', [Employee_ID], [Dept_Number])
             result = conn.execute(text(sql), params)
+            sync_derived(conn, 'dept_manager', [Employee_ID], before, dept_nos=[Dept_Number])
             conn.commit()
+            tables_changed('dept_manager', emp_nos=[Employee_ID], dept_nos=[Dept_Number])
 
             if result.rowcount > 0:
                 return {"rowcount": result.rowcount, "status": "success"}
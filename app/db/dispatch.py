@@ -0,0 +1,103 @@
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from app.core.metrics import Counter
+from .init import db_concurrency, exec_pool_size
+from .result_cache import normalize
+
+
+# 数据库访问函数都是同步的（SQLAlchemy + pymysql），直接在 async 接口里调用会阻塞事件循环。
+# 这里用一个有界线程池执行它们，线程数与连接池容量对应，超出的调用在队列中等待。
+db_executor = ThreadPoolExecutor(max_workers=db_concurrency, thread_name_prefix='db')
+# /exec 只读查询使用独立的线程池（与 exec_engine 的连接数一致），不占用接口的数据库线程
+exec_executor = ThreadPoolExecutor(max_workers=exec_pool_size, thread_name_prefix='db-exec')
+
+
+async def run_db(func, *args, executor=None, **kwargs):
+    """
+    Run a blocking app/db function on the bounded DB thread pool and await its result.
+
+    Args:
+        func: synchronous function from app/db
+        *args, **kwargs: passed through to func
+        executor: thread pool to use instead of db_executor (e.g. exec_executor)
+
+    Returns:
+        whatever func returns; exceptions are re-raised in the caller
+    """
+    loop = asyncio.get_running_loop()
+    # 把当前上下文（如请求路由，用于指标标签）带到线程中
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(executor or db_executor, context.run, partial(func, *args, **kwargs))
+
+
+coalesced_calls = Counter(
+    'db_coalesced_calls_total',
+    'Calls of run_db_shared that joined an identical call already in flight, by function.',
+    ('function',),
+)
+
+# 正在执行的 run_db_shared 调用：(函数, 参数) -> Future；每个工作进程一个事件循环，各自合并
+_in_flight = {}
+
+
+async def run_db_shared(func, *args, **kwargs):
+    """
+    Like run_db, but concurrent calls with the same function and arguments share
+    one execution: the first caller runs it on the DB thread pool, later callers
+    await the same result (or exception). For read-only functions only; the
+    result object is shared between the callers and must not be modified.
+
+    A caller that is cancelled (e.g. the client disconnected) does not cancel the
+    execution the other callers are waiting for.
+    """
+    key = (func.__module__, func.__qualname__, normalize(args), normalize(kwargs))
+    future = _in_flight.get(key)
+    if future is None:
+        future = asyncio.ensure_future(run_db(func, *args, **kwargs))
+        _in_flight[key] = future
+        future.add_done_callback(partial(_finish_shared, key))
+    else:
+        coalesced_calls.inc(function=func.__name__)
+    return await asyncio.shield(future)
+
+
+def _finish_shared(key, future):
+    _in_flight.pop(key, None)
+    # 所有调用方都已取消时，异常不再有人取走，这里取一次避免 "exception was never retrieved"
+    if not future.cancelled():
+        future.exception()
+
+
+_done = object()
+
+
+async def stream_db(batches, executor=None):
+    """
+    Iterate a blocking db generator from async code, pulling one item at a time
+    on the DB thread pool (for StreamingResponse). The generator is closed when
+    iteration stops, including when the client disconnects.
+    """
+    pending = None
+    try:
+        while True:
+            pending = asyncio.ensure_future(run_db(next, batches, _done, executor=executor))
+            # shield: 请求被取消时，正在线程中读取的这一批仍会读完，之后才能关闭生成器
+            batch = await asyncio.shield(pending)
+            if batch is _done:
+                break
+            yield batch
+    finally:
+        # 客户端断开时也要关闭生成器，释放连接和服务端游标
+        if pending is not None and not pending.done():
+            await asyncio.wait([pending])
+        await run_db(batches.close, executor=executor)
+
+
+def shutdown_db_executor():
+    """
+    Stop the DB thread pools, waiting for running calls to finish.
+    """
+    exec_executor.shutdown(wait=True)
+    db_executor.shutdown(wait=True)
@@ -1,8 +1,19 @@
 from sqlalchemy import text
 from .init import engine
+from .signals import tables_changed
+from .maintenance import sync_derived, capture_derived
+from .pagination import decode_cursor, next_page
+from .statements import (
+    insert_employees_sql, insert_current_sql, update_employee_sql, plan_current_changes, apply_current_changes,
+    CURRENT_TABLES
+)
+from fastapi import HTTPException
+import logging
 import random
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
 
 
 def format_timestamp_to_date(timestamp_str):
@@ -43,98 +54,68 @@ def format_timestamp_to_date(timestamp_str):
         # 如果转换失败，返回原始字符串
         return timestamp_str
 
-def db_get_emp_list(page: int, pageSize: int, gender: str = None, emp_no_min: int = None, emp_no_max: int = None, 
-                    birth_date_min: str = None, birth_date_max: str = None, hire_date_min: str = None, 
-                    hire_date_max: str = None, name: str = None, salary_min: int = None, salary_max: int = None, 
-                    dept_name: str = None, title: str = None):
-
-    """
-    Query an employee list with pagination and optional filtering conditions.
-    And use a dictionary mapping to simplify the conditional concatenation logic.
-    """
-    page = page or 1
-    pageSize = pageSize or 10
-    with engine.connect() as conn:
-        sql = """
+# 员工列表：读取 employee_current 快照表（每个员工一行，已包含最新部门/薪资/职称）
+emp_list_sql = """
             SELECT
-            e.emp_no,
-            e.first_name,
-            e.last_name,
-            e.gender,
-            e.birth_date,
-            e.hire_date,
-            ls.salary,
+            ec.emp_no,
+            ec.first_name,
+            ec.last_name,
+            ec.gender,
+            ec.birth_date,
+            ec.hire_date,
+            ec.salary,
             d.dept_name,
-            lt.title
-            FROM employees e
-
-            /* 优化最新部门查询 - 使用相关子查询 */
-            LEFT JOIN (
-                SELECT de1.emp_no, de1.dept_no
-                FROM dept_emp de1
-                WHERE de1.from_date = (
-                    SELECT MAX(from_date) 
-                    FROM dept_emp de2 
-                    WHERE de2.emp_no = de1.emp_no
-                )
-            ) ld ON ld.emp_no = e.emp_no
-            LEFT JOIN departments d ON d.dept_no = ld.dept_no
-
-            /* 优化最新薪资查询 - 使用相关子查询 */
-            LEFT JOIN (
-                SELECT s1.emp_no, s1.salary
-                FROM salaries s1
-                WHERE s1.from_date = (
-                    SELECT MAX(from_date) 
-                    FROM salaries s2 
-                    WHERE s2.emp_no = s1.emp_no
-                )
-            ) ls ON ls.emp_no = e.emp_no
-
-            /* 优化最新头衔查询 - 使用相关子查询 */
-            LEFT JOIN (
-                SELECT t1.emp_no, t1.title
-                FROM titles t1
-                WHERE t1.from_date = (
-                    SELECT MAX(from_date) 
-                    FROM titles t2 
-                    WHERE t2.emp_no = t1.emp_no
-                )
-            ) lt ON lt.emp_no = e.emp_no
+            ec.title
+            FROM employee_current ec
+            LEFT JOIN departments d ON d.dept_no = ec.dept_no
 
             WHERE
+            /* Business logic: Only show current employees (latest dept_emp to_date = '9999-01-01') */
+            ec.is_current = 1
             /* Range search for Employee ID */
-            (:emp_no_min      IS NULL OR e.emp_no     >= :emp_no_min)
-            AND (:emp_no_max  IS NULL OR e.emp_no     <= :emp_no_max)
+            AND (:emp_no_min  IS NULL OR ec.emp_no     >= :emp_no_min)
+            AND (:emp_no_max  IS NULL OR ec.emp_no     <= :emp_no_max)
             /* Name search (first_name and last_name) */
-            AND (:last_name   IS NULL OR e.last_name  LIKE CONCAT('%', :last_name,  '%'))
-            AND (:first_name  IS NULL OR e.first_name LIKE CONCAT('%', :first_name, '%'))
+            AND (:last_name   IS NULL OR ec.last_name  LIKE CONCAT('%', :last_name,  '%'))
+            AND (:first_name  IS NULL OR ec.first_name LIKE CONCAT('%', :first_name, '%'))
             /* Gender exact match */
-            AND (:gender      IS NULL OR e.gender     = :gender)
+            AND (:gender      IS NULL OR ec.gender     = :gender)
             /* Range search for Birth Date */
-            AND (:birth_date_min IS NULL OR e.birth_date >= :birth_date_min)
-            AND (:birth_date_max IS NULL OR e.birth_date <= :birth_date_max)
+            AND (:birth_date_min IS NULL OR ec.birth_date >= :birth_date_min)
+            AND (:birth_date_max IS NULL OR ec.birth_date <= :birth_date_max)
             /* Range search for Hire Date */
-            AND (:hire_date_min  IS NULL OR e.hire_date  >= :hire_date_min)
-            AND (:hire_date_max  IS NULL OR e.hire_date  <= :hire_date_max)
+            AND (:hire_date_min  IS NULL OR ec.hire_date  >= :hire_date_min)
+            AND (:hire_date_max  IS NULL OR ec.hire_date  <= :hire_date_max)
             /* Range search for Salary */
-            AND (:salary_min     IS NULL OR ls.salary    >= :salary_min)
-            AND (:salary_max     IS NULL OR ls.salary    <= :salary_max)
+            AND (:salary_min     IS NULL OR ec.salary     >= :salary_min)
+            AND (:salary_max     IS NULL OR ec.salary     <= :salary_max)
             /* Department name fuzzy search */
-            AND (:dept_name   IS NULL OR d.dept_name  LIKE CONCAT('%', :dept_name,  '%'))
+            AND (:dept_name   IS NULL OR d.dept_name   LIKE CONCAT('%', :dept_name,  '%'))
             /* Title fuzzy search */
-            AND (:title       IS NULL OR lt.title     LIKE CONCAT('%', :title,      '%'))
-            /* Business logic: Only show current employees - filter out employees where max end_date != '9999-01-01' */
-            AND (
-                SELECT MAX(de_check.to_date)
-                FROM dept_emp de_check
-                WHERE de_check.emp_no = e.emp_no
-            ) = '9999-01-01'
-
-            ORDER BY e.emp_no
+            AND (:title       IS NULL OR ec.title      LIKE CONCAT('%', :title,      '%'))
+            /* Keyset pagination: continue after the last emp_no of the previous page */
+            AND (:after_emp_no IS NULL OR ec.emp_no    > :after_emp_no)
+
+            ORDER BY ec.emp_no
             LIMIT :pageSize OFFSET :offset;
         """
 
+def db_get_emp_list(page: int, pageSize: int, gender: str = None, emp_no_min: int = None, emp_no_max: int = None, 
+                    birth_date_min: str = None, birth_date_max: str = None, hire_date_min: str = None, 
+                    hire_date_max: str = None, name: str = None, salary_min: int = None, salary_max: int = None, 
+                    dept_name: str = None, title: str = None, cursor: str = None):
+
+    """
+    Query an employee list with pagination and optional filtering conditions.
+    Reads from the employee_current snapshot, which the write paths keep up to date.
+
+    When `cursor` is given (an empty string means the first page) the page is located
+    by seeking past the last emp_no instead of OFFSET, and `next_cursor` is returned.
+    """
+    page = page or 1
+    pageSize = pageSize or 10
+    after = decode_cursor(cursor, 1) if cursor is not None else None
+    with engine.connect() as conn:
         # 处理姓名模糊查询：将输入的name按空格分割为first_name和last_name
         first_name_part = ""
         last_name_part = ""
@@ -157,12 +138,17 @@ def db_get_emp_list(page: int, pageSize: int, gender: str = None, emp_no_min: in
             "salary_max": salary_max,
             "dept_name": dept_name,
             "title": title,
+            "after_emp_no": after[0] if after else None,
             "pageSize": pageSize,
             "offset": (page - 1) * pageSize,
         }
+        if cursor is not None:
+            # 游标模式：多取一行用于判断是否还有下一页
+            params["pageSize"] = pageSize + 1
+            params["offset"] = 0
         
         # 执行主查询
-        result = conn.execute(text(sql), params)
+        result = conn.execute(text(emp_list_sql), params)
         
         # 执行计数查询
         # count_result = conn.execute(text(count_sql), params)
@@ -172,6 +158,8 @@ def db_get_emp_list(page: int, pageSize: int, gender: str = None, emp_no_min: in
         if result.returns_rows:
             # 将 Row 对象转成字典，便于 JSON 序列化
             data = result.mappings().all()
+            if cursor is not None:
+                return next_page(data, ['emp_no'], pageSize)
             return {'data': data}
         else:
             # 非查询语句，返回受影响行数
@@ -189,8 +177,7 @@ def get_emp_info(emp_no: int):
             WHERE E.emp_no = {emp_no}
         """
 
-        print('Execute SQL：')
-        print(sql)
+        logger.debug(f'Execute SQL: {sql}')
         result = conn.execute(text(sql))
         if result.returns_rows:
             # 将 Row 对象转成字典，便于 JSON 序列化
@@ -213,44 +200,31 @@ def db_add_emp(emp_no: int, gender: str, birth_date: str, hire_date: str, name:
         # hire_date = format_timestamp_to_date(hire_date)
         # birth_date = format_timestamp_to_date(birth_date)
 
-        sql = f'INSERT INTO employees (emp_no, birth_date, first_name, last_name, gender, hire_date) VALUES ({emp_no}, \'{birth_date}\', \'{first_name}\', \'{last_name}\', \'{gender}\', \'{hire_date}\')'
-        # INSERT INTO table_name (column1, column2, column3, ...)
-        # VALUES (value1, value2, value3, ...)
-
-        result = conn.execute(text(sql))
+        # 绑定参数插入，姓名等字段中的引号不会破坏语句
+        conn.execute(insert_employees_sql, {
+            "emp_no": emp_no, "birth_date": birth_date, "first_name": first_name,
+            "last_name": last_name, "gender": gender, "hire_date": hire_date
+        })
 
         # 使用当前日期作为from_date，to_date固定为9999-01-01
         current_date = datetime.now().strftime('%Y-%m-%d')
         to_date_fixed = '9999-01-01'
-        
-        # 更新部门关系表
-        dept_sql = f'INSERT INTO dept_emp (emp_no, dept_no, from_date, to_date) VALUES ({emp_no}, \'{dept_no}\', \'{current_date}\', \'{to_date_fixed}\')'
-        print('Execute SQL：')
-        print(dept_sql)
-        result = conn.execute(text(dept_sql))
-        
-        # 更新薪资表
-        salary_sql = f'INSERT INTO salaries (emp_no, salary, from_date, to_date) VALUES ({emp_no}, {salary}, \'{current_date}\', \'{to_date_fixed}\')'
-        print('Execute SQL：')
-        print(salary_sql)
-        result = conn.execute(text(salary_sql))
-        
-        # 更新职称表
-        title_sql = f'INSERT INTO titles (emp_no, title, from_date, to_date) VALUES ({emp_no}, \'{title}\', \'{current_date}\', \'{to_date_fixed}\')'
-        print('Execute SQL：')
-        print(title_sql)
-        result = conn.execute(text(title_sql))
+
+        # 更新部门关系表、薪资表、职称表
+        values = {'dept_emp': dept_no, 'salaries': salary, 'titles': title}
+        for table, column in CURRENT_TABLES.items():
+            params = {"emp_no": emp_no, column: values[table], "from_date": current_date, "to_date": to_date_fixed}
+            logger.debug(f'Insert into {table}: {params}')
+            result = conn.execute(insert_current_sql[table], params)
+
+        # 同步派生表（员工快照、人数汇总）
+        sync_derived(conn, 'employees', [emp_no])
         
         # 提交事务，确保操作生效
         conn.commit()
-        # 判断是否有查询内容返回（SELECT / RETURNING）
-        if result.returns_rows:
-            # 将 Row 对象转成字典，便于 JSON 序列化
-            data = result.mappings().all()
-            return data
-        else:
-            # 非查询语句，返回受影响行数
-            return {"rowcount": result.rowcount}
+        tables_changed('employees', 'dept_emp', 'salaries', 'titles', emp_nos=[emp_no])
+        # 返回最后一条插入语句的受影响行数
+        return {"rowcount": result.rowcount}
 
 
 # update employee's info
@@ -266,112 +240,63 @@ def db_update_emp(emp_no: str, gender: str, birth_date: str, hire_date: str, nam
     - dept_no: 部门编号（更新部门关系）
     - title: 职称（更新职称）
     - salary: 薪资（更新薪资）
-    - from_date: 开始日期（用于部门关系、职称、薪资）
-    - to_date: 结束日期（用于部门关系、职称、薪资）
+    - from_date: 生效日期（结束当前部门关系/职称/薪资并新增一行；默认今天）
+    - to_date: 新行的结束日期（默认 9999-01-01）
+
+    调回曾经所在的部门（dept_emp 主键为 emp_no, dept_no）或生效日期早于当前行时返回 409，不做任何修改
     """
+    # 1. employees 表：只更新传入的列
+    values = {}
+    if gender:
+        values['gender'] = gender
+    if name:
+        parts = name.split(' ', 1)
+        values['first_name'] = parts[0]
+        values['last_name'] = parts[1] if len(parts) > 1 else ''
+    if birth_date:
+        values['birth_date'] = birth_date
+    if hire_date:
+        values['hire_date'] = hire_date
+
+    # 2. dept_emp / titles / salaries：结束当前行并新增一行
+    changes = {table: value for table, value in (
+        ('dept_emp', dept_no), ('titles', title), ('salaries', salary),
+    ) if value is not None and value != ''}
+
+    if not values and not changes:
+        return {"rowcount": 0, "operations": 0}
+
+    params = {
+        'emp_no': emp_no,
+        'from_date': from_date or datetime.now().strftime('%Y-%m-%d'),
+        'to_date': to_date or '9999-01-01',
+    }
+    total_affected = 0
     with engine.begin() as conn:  # 使用事务，自动提交或回滚
-        
-        # 1. 更新 employees 表
-        update_operations = []
-        
-        parts = name.split(' ', 1) if name else ('', '')
-        first_name = parts[0]
-        last_name = parts[1] if len(parts) > 1 else ''
+        plans = {}
+        for table, value in changes.items():
+            plans[table], rejected = plan_current_changes(
+                conn, table, [{'emp_no': emp_no, CURRENT_TABLES[table]: value}], params['from_date'], params['to_date'])
+            if rejected:
+                raise HTTPException(status_code=409, detail=rejected[emp_no])
 
-        conditions = {}
+        before = capture_derived(conn, 'employees', [emp_no])
 
-        if gender:
-            conditions['gender'] = gender
-        if name:
-            conditions['first_name'] = first_name
-            conditions['last_name'] = last_name
-        if birth_date:
-            conditions['birth_date'] = birth_date
-        if hire_date:
-            conditions['hire_date'] = hire_date
-
-        if conditions:
-            set_map = {
-                'gender': "gender = '{value}'",
-                'birth_date': "birth_date = '{value}'",
-                'hire_date': "hire_date = '{value}'",
-                'first_name': "first_name = '{value}'",
-                'last_name': "last_name = '{value}'"
-            }
-
-            set_clauses = [
-                set_map[key].format(value=value)
-                for key, value in conditions.items()
-                if value and key in set_map
-            ]
-            
-            if set_clauses:
-                sql = f'UPDATE employees SET {", ".join(set_clauses)} WHERE emp_no = {emp_no}'
-                update_operations.append(sql)
+        if values:
+            result = conn.execute(update_employee_sql(tuple(values)), dict(values, emp_no=emp_no))
+            total_affected += result.rowcount
 
-        # 2. 更新 dept_emp 表（部门关系）
-        print('dept_nodept_nodept_nodept_nodept_no update', dept_no)
+        for table, plan in plans.items():
+            logger.debug(f'{table} update: {changes[table]}')
+            total_affected += apply_current_changes(conn, table, plan)
 
-        if dept_no:
-            
-            # 先结束当前部门关系
-            end_current_dept_sql = f"""
-                UPDATE dept_emp 
-                SET to_date = '{from_date or '9999-01-01'}' 
-                WHERE emp_no = {emp_no} AND to_date = '9999-01-01'
-            """
-            update_operations.append(end_current_dept_sql)
-            
-            # 添加新的部门关系
-            new_dept_sql = f"""
-                INSERT INTO dept_emp (emp_no, dept_no, from_date, to_date)
-                VALUES ({emp_no}, '{dept_no}', '{from_date or '9999-01-01'}', '{to_date or '9999-01-01'}')
-            """
-            update_operations.append(new_dept_sql)
-
-        # 3. 更新 titles 表（职称）
-        if title:
-            # 先结束当前职称
-            end_current_title_sql = f"""
-                UPDATE titles 
-                SET to_date = '{from_date or '9999-01-01'}' 
-                WHERE emp_no = {emp_no} AND to_date = '9999-01-01'
-            """
-            update_operations.append(end_current_title_sql)
-            
-            # 添加新的职称
-            new_title_sql = f"""
-                INSERT INTO titles (emp_no, title, from_date, to_date)
-                VALUES ({emp_no}, '{title}', '{from_date or '9999-01-01'}', '{to_date or '9999-01-01'}')
-            """
-            update_operations.append(new_title_sql)
-
-        # 4. 更新 salaries 表（薪资）
-        if salary is not None:
-            # 先结束当前薪资
-            end_current_salary_sql = f"""
-                UPDATE salaries 
-                SET to_date = '{from_date or '9999-01-01'}' 
-                WHERE emp_no = {emp_no} AND to_date = '9999-01-01'
-            """
-            update_operations.append(end_current_salary_sql)
-            
-            # 添加新的薪资
-            new_salary_sql = f"""
-                INSERT INTO salaries (emp_no, salary, from_date, to_date)
-                VALUES ({emp_no}, {salary}, '{from_date or '9999-01-01'}', '{to_date or '9999-01-01'}')
-            """
-            update_operations.append(new_salary_sql)
-
-        # 执行所有更新操作
-        total_affected = 0
-        for sql in update_operations:
-            print('Execute SQL：')
-            print(sql)
-            result = conn.execute(text(sql))
-            total_affected += result.rowcount
+        # 同步派生表（与上面的更新在同一事务中）
+        sync_derived(conn, 'employees', [emp_no], before)
+
+    # 事务已在 with 块结束时提交，通知订阅者（缓存等）
+    tables_changed(*(['employees'] if values else []), *changes, emp_nos=[emp_no])
 
-        return {"rowcount": total_affected, "operations": len(update_operations)}
+    return {"rowcount": total_affected, "operations": int(bool(values)) + len(changes)}
             
 # delete one or more employee's record
 def db_del_emp(emp_no: int):
@@ -379,12 +304,15 @@ def db_del_emp(emp_no: int):
 
         sql = f'DELETE from employees WHERE emp_no = {emp_no}'
 
-        print('Execute SQL Deletion：')
-        print(sql)
+        # 删除会级联删除部门关系，先记下它们影响的汇总期间
+        before = capture_derived(conn, 'employees', [emp_no])
+        logger.debug(f'Execute SQL Deletion: {sql}')
         result = conn.execute(text(sql))
+        sync_derived(conn, 'employees', [emp_no], before)
         
         # 提交事务，确保删除操作生效
         conn.commit()
+        tables_changed('employees', 'dept_emp', 'salaries', 'titles', 'dept_manager', emp_nos=[emp_no])
 
         # 返回受影响的行数
         return {"rowcount": result.rowcount}
@@ -0,0 +1,233 @@
+import logging
+from datetime import datetime
+from sqlalchemy import text, bindparam, exc
+from .init import engine
+from .signals import tables_changed
+from .maintenance import sync_derived, capture_derived
+from .statements import (
+    insert_employees_sql, insert_current_sql, update_employee_sql, plan_current_changes, apply_current_changes,
+    CURRENT_TABLES
+)
+
+logger = logging.getLogger(__name__)
+
+
+# 批量入职：按块写入，每块一个事务；四张表各用一次 executemany
+# （pymysql 会把它改写成多行 VALUES），块内某行出错时回退到逐行写入，只跳过出错的行。
+# 批量更新：整个请求一个事务，按块执行集合式的语句。
+BULK_CHUNK_SIZE = 1000
+
+# 表 -> (INSERT 语句, 行中必须有值的字段)；没有部门/薪资/职称的行不写对应的表
+INSERTS = (
+    ('employees', insert_employees_sql, None),
+    ('dept_emp', insert_current_sql['dept_emp'], 'dept_no'),
+    ('salaries', insert_current_sql['salaries'], 'salary'),
+    ('titles', insert_current_sql['titles'], 'title'),
+)
+
+
+def _insert_rows(conn, rows):
+    for table, statement, required in INSERTS:
+        params = rows if required is None else [row for row in rows if row[required] is not None]
+        if params:
+            conn.execute(statement, params)
+
+
+def _allocate_emp_nos(conn, rows):
+    # 锁住当前最大的 emp_no（及其后的间隙），并发的批量写入依次分配编号
+    next_emp_no = conn.execute(text("SELECT COALESCE(MAX(emp_no), 0) FROM employees FOR UPDATE")).scalar() + 1
+    taken = {row['emp_no'] for row in rows if row['emp_no'] is not None}
+    for row in rows:
+        if row['emp_no'] is None:
+            while next_emp_no in taken:
+                next_emp_no += 1
+            row['emp_no'] = next_emp_no
+            next_emp_no += 1
+
+
+def _error_message(error) -> str:
+    orig = getattr(error, 'orig', None)
+    args = getattr(orig, 'args', None)
+    if args and len(args) > 1:
+        return str(args[1])
+    return str(orig or error)
+
+
+def _write_chunk(chunk, from_date: str, to_date: str):
+    """
+    Insert one chunk in one transaction. Returns (inserted emp_nos, errors).
+    """
+    errors = []
+    with engine.begin() as conn:
+        # 部门编号每块只查一次
+        unknown = {row['dept_no'] for _, row in chunk if row['dept_no'] is not None}
+        if unknown:
+            unknown -= set(conn.execute(
+                text("SELECT dept_no FROM departments WHERE dept_no IN :dept_nos").bindparams(
+                    bindparam('dept_nos', expanding=True)),
+                {'dept_nos': sorted(unknown)},
+            ).scalars().all())
+
+        rows = []
+        for index, row in chunk:
+            if row['dept_no'] in unknown:
+                errors.append({'index': index, 'emp_no': row['emp_no'], 'error': f"Unknown department: {row['dept_no']}"})
+            else:
+                rows.append((index, dict(row, from_date=from_date, to_date=to_date)))
+        if not rows:
+            return [], errors
+
+        _allocate_emp_nos(conn, [row for _, row in rows])
+
+        try:
+            with conn.begin_nested():
+                _insert_rows(conn, [row for _, row in rows])
+            inserted = [row['emp_no'] for _, row in rows]
+        except exc.DBAPIError as e:
+            # 整块写入失败（如重复的 emp_no）：逐行重试，每行一个保存点，记录出错的行
+            logger.info(f"Bulk chunk failed ({_error_message(e)}), retrying row by row")
+            inserted = []
+            for index, row in rows:
+                try:
+                    with conn.begin_nested():
+                        _insert_rows(conn, [row])
+                    inserted.append(row['emp_no'])
+                except exc.DBAPIError as row_error:
+                    errors.append({'index': index, 'emp_no': row['emp_no'], 'error': _error_message(row_error)})
+
+        if inserted:
+            # 同步派生表（员工快照、人数汇总、员工履历）
+            sync_derived(conn, 'employees', inserted)
+    return inserted, errors
+
+
+def db_bulk_add_emps(rows, chunk_size: int = BULK_CHUNK_SIZE):
+    """
+    Insert many employees with their department, salary and title.
+
+    Args:
+        rows: list of (index, row) pairs; each row is a dict with emp_no (None to allocate
+              one), birth_date, first_name, last_name, gender, hire_date, dept_no, salary, title
+        chunk_size: rows per transaction
+
+    Returns:
+        {"inserted": n, "failed": m, "emp_nos": [...], "errors": [{"index", "emp_no", "error"}]}
+        Rows of a chunk that fail are skipped; the other rows of the chunk are still written.
+    """
+    # 与 db_add_emp 一致：部门/薪资/职称从今天开始，to_date 固定为 9999-01-01
+    from_date = datetime.now().strftime('%Y-%m-%d')
+    to_date = '9999-01-01'
+
+    emp_nos, errors = [], []
+    try:
+        for start in range(0, len(rows), chunk_size):
+            inserted, chunk_errors = _write_chunk(rows[start:start + chunk_size], from_date, to_date)
+            emp_nos.extend(inserted)
+            errors.extend(chunk_errors)
+    finally:
+        if emp_nos:
+            tables_changed('employees', 'dept_emp', 'salaries', 'titles', emp_nos=emp_nos)
+
+    return {"inserted": len(emp_nos), "failed": len(errors), "emp_nos": emp_nos, "errors": errors}
+
+
+def db_bulk_update_emps(rows, from_date: str = None, to_date: str = None, chunk_size: int = BULK_CHUNK_SIZE):
+    """
+    Apply many employee updates in one transaction (e.g. a salary review).
+
+    Per chunk, each history table takes a few statements whatever the chunk size: one
+    SELECT reads the current rows, one UPDATE ends them, one multi-row INSERT adds
+    the new rows (same-day changes restate the current row instead). Changes to
+    employees columns are grouped by the set of columns.
+
+    Args:
+        rows: list of (index, row) pairs; each row is a dict with emp_no, `values` (employees
+              columns to set, may be empty) and dept_no / title / salary (None to keep)
+        from_date: date the new department / title / salary take effect (default today)
+        to_date: end date of the new rows (default 9999-01-01)
+        chunk_size: rows per group of statements
+
+    Returns:
+        {"updated": n, "failed": m, "emp_nos": [...], "errors": [{"index", "emp_no", "error"}]}
+        Rows for unknown employees or departments, moves back to a department the employee
+        already has a record for and from_date before the current row are skipped; a
+        database error rolls back the whole request.
+    """
+    params = {
+        'from_date': from_date or datetime.now().strftime('%Y-%m-%d'),
+        'to_date': to_date or '9999-01-01',
+    }
+    emp_nos, errors, changed = [], [], set()
+
+    with engine.begin() as conn:
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+
+            # 员工、部门是否存在：每块各查一次
+            existing = set(conn.execute(
+                text("SELECT emp_no FROM employees WHERE emp_no IN :emp_nos").bindparams(
+                    bindparam('emp_nos', expanding=True)),
+                {'emp_nos': [row['emp_no'] for _, row in chunk]},
+            ).scalars().all())
+            unknown_depts = {row['dept_no'] for _, row in chunk if row['dept_no'] is not None}
+            if unknown_depts:
+                unknown_depts -= set(conn.execute(
+                    text("SELECT dept_no FROM departments WHERE dept_no IN :dept_nos").bindparams(
+                        bindparam('dept_nos', expanding=True)),
+                    {'dept_nos': sorted(unknown_depts)},
+                ).scalars().all())
+
+            valid = []
+            for index, row in chunk:
+                if row['emp_no'] not in existing:
+                    errors.append({'index': index, 'emp_no': row['emp_no'], 'error': "Employee not found"})
+                elif row['dept_no'] in unknown_depts:
+                    errors.append({'index': index, 'emp_no': row['emp_no'], 'error': f"Unknown department: {row['dept_no']}"})
+                else:
+                    valid.append(row)
+            if not valid:
+                continue
+
+            # dept_emp / titles / salaries：先检查，有表拒绝的行整行跳过
+            plans, rejected = {}, {}
+            for table, column in CURRENT_TABLES.items():
+                table_rows = [{'emp_no': row['emp_no'], column: row[column]} for row in valid if row[column] is not None]
+                if table_rows:
+                    plans[table], table_rejected = plan_current_changes(
+                        conn, table, table_rows, params['from_date'], params['to_date'])
+                    for emp_no, message in table_rejected.items():
+                        rejected.setdefault(emp_no, message)
+            if rejected:
+                checked = {id(row) for row in valid}
+                errors.extend({'index': index, 'emp_no': row['emp_no'], 'error': rejected[row['emp_no']]}
+                              for index, row in chunk if row['emp_no'] in rejected and id(row) in checked)
+                valid = [row for row in valid if row['emp_no'] not in rejected]
+                if not valid:
+                    continue
+
+            chunk_emp_nos = [row['emp_no'] for row in valid]
+            before = capture_derived(conn, 'employees', chunk_emp_nos)
+
+            # employees：相同列集合的更新共用一条语句
+            groups = {}
+            for row in valid:
+                if row['values']:
+                    groups.setdefault(tuple(row['values']), []).append(dict(row['values'], emp_no=row['emp_no']))
+            for columns, group in groups.items():
+                conn.execute(update_employee_sql(columns), group)
+                changed.add('employees')
+
+            # dept_emp / titles / salaries：一条 UPDATE 结束当前行，一条多行 INSERT 新增行
+            for table, plan in plans.items():
+                if apply_current_changes(conn, table, plan, skip=rejected):
+                    changed.add(table)
+
+            # 同步派生表（与更新在同一事务中）
+            sync_derived(conn, 'employees', chunk_emp_nos, before)
+            emp_nos.extend(chunk_emp_nos)
+
+    # 事务已提交，通知订阅者（缓存等）
+    if changed:
+        tables_changed(*changed, emp_nos=emp_nos)
+
+    return {"updated": len(emp_nos), "failed": len(errors), "emp_nos": emp_nos, "errors": errors}
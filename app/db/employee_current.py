@@ -0,0 +1,85 @@
+from sqlalchemy import text, bindparam
+from .init import engine
+
+
+# 员工当前状态快照表：每个员工一行，保存最新部门、薪资、职称以及是否在职
+create_table_sql = """
+CREATE TABLE IF NOT EXISTS employee_current (
+    emp_no      INT             NOT NULL,
+    first_name  VARCHAR(14)     NOT NULL,
+    last_name   VARCHAR(16)     NOT NULL,
+    gender      ENUM ('M','F')  NOT NULL,
+    birth_date  DATE            NOT NULL,
+    hire_date   DATE            NOT NULL,
+    dept_no     CHAR(4)         NULL,
+    salary      INT             NULL,
+    title       VARCHAR(50)     NULL,
+    is_current  TINYINT(1)      NOT NULL DEFAULT 0,
+    PRIMARY KEY (emp_no),
+    KEY idx_employee_current_is_current (is_current, emp_no),
+    KEY idx_employee_current_dept_no (dept_no, is_current, birth_date, emp_no),
+    KEY idx_employee_current_birth_date (is_current, birth_date, emp_no, dept_no),
+    KEY idx_employee_current_salary (salary),
+    FOREIGN KEY (emp_no) REFERENCES employees (emp_no) ON DELETE CASCADE
+)
+"""
+
+# 从基础表计算快照行。每个子查询都走 (emp_no, from_date) 索引，只取一行
+select_snapshot_sql = """
+SELECT
+    e.emp_no,
+    e.first_name,
+    e.last_name,
+    e.gender,
+    e.birth_date,
+    e.hire_date,
+    (SELECT de.dept_no FROM dept_emp de
+      WHERE de.emp_no = e.emp_no ORDER BY de.from_date DESC LIMIT 1) AS dept_no,
+    (SELECT s.salary FROM salaries s
+      WHERE s.emp_no = e.emp_no ORDER BY s.from_date DESC LIMIT 1) AS salary,
+    (SELECT t.title FROM titles t
+      WHERE t.emp_no = e.emp_no ORDER BY t.from_date DESC LIMIT 1) AS title,
+    COALESCE((SELECT MAX(de.to_date) FROM dept_emp de
+      WHERE de.emp_no = e.emp_no) = '9999-01-01', 0) AS is_current
+FROM employees e
+"""
+
+columns = "emp_no, first_name, last_name, gender, birth_date, hire_date, dept_no, salary, title, is_current"
+
+
+def create_employee_current_table():
+    """
+    Create the employee_current snapshot table if it does not exist yet.
+    """
+    with engine.begin() as conn:
+        conn.execute(text(create_table_sql))
+
+
+def rebuild_employee_current():
+    """
+    Rebuild the whole employee_current snapshot from the base tables.
+    Used once after loading data, or to repair the snapshot.
+    """
+    create_employee_current_table()
+    with engine.begin() as conn:
+        conn.execute(text('DELETE FROM employee_current'))
+        result = conn.execute(text(f'INSERT INTO employee_current ({columns}) {select_snapshot_sql}'))
+        return {"rowcount": result.rowcount}
+
+
+def refresh_employee_current(conn, emp_nos):
+    """
+    Recompute the snapshot rows of the given employees.
+    Runs on the caller's connection so it commits (or rolls back) together with the write.
+    Deleted employees are removed by the ON DELETE CASCADE foreign key.
+    """
+    emp_nos = sorted({int(emp_no) for emp_no in emp_nos if emp_no is not None})
+    if not emp_nos:
+        return 0
+
+    sql = text(
+        f'REPLACE INTO employee_current ({columns}) {select_snapshot_sql} WHERE e.emp_no IN :emp_nos'
+    ).bindparams(bindparam('emp_nos', expanding=True))
+
+    result = conn.execute(sql, {"emp_nos": emp_nos})
+    return result.rowcount
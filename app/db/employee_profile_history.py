@@ -0,0 +1,195 @@
+from sqlalchemy import text, bindparam
+from .init import engine
+
+
+# 员工履历表：原 employee_profile_history 视图的物化版本。
+# 每条薪资记录与当时的职称、部门以及任期重叠的部门经理组合成一行。
+# 由 materialize.py 全量构建，写接口按员工 / 部门增量维护。
+create_table_sql = """
+CREATE TABLE IF NOT EXISTS employee_profile_history (
+    emp_no               INT          NOT NULL,
+    employee_first_name  VARCHAR(14)  NOT NULL,
+    employee_last_name   VARCHAR(16)  NOT NULL,
+    title                VARCHAR(50)  NOT NULL,
+    salary               INT          NOT NULL,
+    dept_no              CHAR(4)      NOT NULL,
+    dept_name            VARCHAR(40)  NOT NULL,
+    manager_emp_no       INT          NOT NULL,
+    manager_first_name   VARCHAR(14)  NOT NULL,
+    manager_last_name    VARCHAR(16)  NOT NULL,
+    effective_date       DATE         NOT NULL,
+    end_date             DATE         NOT NULL,
+    PRIMARY KEY (emp_no, effective_date, dept_no, title, manager_emp_no),
+    KEY idx_profile_history_effective_date (effective_date),
+    KEY idx_profile_history_salary (salary),
+    KEY idx_profile_history_dept_no (dept_no, effective_date),
+    KEY idx_profile_history_manager (manager_emp_no),
+    FOREIGN KEY (emp_no) REFERENCES employees (emp_no) ON DELETE CASCADE,
+    FOREIGN KEY (manager_emp_no) REFERENCES employees (emp_no) ON DELETE CASCADE
+)
+"""
+
+columns = ("emp_no, employee_first_name, employee_last_name, title, salary, dept_no, dept_name, "
+           "manager_emp_no, manager_first_name, manager_last_name, effective_date, end_date")
+
+# 与原视图定义相同的五表区间连接。同一职称的两条记录在边界日期相接时会命中同一薪资记录两次，
+# 两行完全相同，DISTINCT 去重后可以直接 INSERT（不用 INSERT IGNORE 掩盖外键、截断等真实错误）
+select_history_sql = """
+SELECT DISTINCT
+    e.emp_no,
+    e.first_name AS employee_first_name,
+    e.last_name AS employee_last_name,
+    t.title,
+    s.salary,
+    d.dept_no,
+    d.dept_name,
+    dm.emp_no AS manager_emp_no,
+    m.first_name AS manager_first_name,
+    m.last_name AS manager_last_name,
+    s.from_date AS effective_date,
+    s.to_date AS end_date
+FROM
+    employees e
+JOIN salaries s ON e.emp_no = s.emp_no
+JOIN titles t ON e.emp_no = t.emp_no AND s.from_date BETWEEN t.from_date AND t.to_date
+JOIN dept_emp de ON e.emp_no = de.emp_no AND s.from_date BETWEEN de.from_date AND de.to_date
+JOIN departments d ON de.dept_no = d.dept_no
+JOIN dept_manager dm ON de.dept_no = dm.dept_no AND s.from_date <= dm.to_date AND dm.from_date <= s.to_date
+JOIN employees m ON dm.emp_no = m.emp_no
+"""
+
+
+def create_employee_profile_history_table():
+    """
+    Create the employee_profile_history table, replacing the old view of the same name.
+    """
+    with engine.begin() as conn:
+        conn.execute(text('DROP VIEW IF EXISTS employee_profile_history'))
+        conn.execute(text(create_table_sql))
+
+
+def rebuild_employee_profile_history():
+    """
+    Rebuild the whole employee_profile_history table from the base tables.
+    """
+    create_employee_profile_history_table()
+    with engine.begin() as conn:
+        conn.execute(text('DELETE FROM employee_profile_history'))
+        result = conn.execute(text(f'INSERT INTO employee_profile_history ({columns}) {select_history_sql}'))
+        return {"rowcount": result.rowcount}
+
+
+def _ids(values, cast):
+    return sorted({cast(value) for value in values if value is not None})
+
+
+def refresh_history_for_employees(conn, emp_nos):
+    """
+    Recompute the history rows of the given employees and the manager names shown
+    on rows where they are the manager. Runs on the caller's connection.
+    """
+    emp_nos = _ids(emp_nos, int)
+    if not emp_nos:
+        return 0
+
+    delete_sql = text(
+        'DELETE FROM employee_profile_history WHERE emp_no IN :emp_nos'
+    ).bindparams(bindparam('emp_nos', expanding=True))
+    insert_sql = text(
+        f'INSERT INTO employee_profile_history ({columns}) {select_history_sql} WHERE e.emp_no IN :emp_nos'
+    ).bindparams(bindparam('emp_nos', expanding=True))
+    manager_sql = text("""
+        UPDATE employee_profile_history h
+        JOIN employees m ON m.emp_no = h.manager_emp_no
+        SET h.manager_first_name = m.first_name, h.manager_last_name = m.last_name
+        WHERE h.manager_emp_no IN :emp_nos
+    """).bindparams(bindparam('emp_nos', expanding=True))
+
+    conn.execute(delete_sql, {"emp_nos": emp_nos})
+    result = conn.execute(insert_sql, {"emp_nos": emp_nos})
+    conn.execute(manager_sql, {"emp_nos": emp_nos})
+    return result.rowcount
+
+
+def manager_intervals(conn, emp_nos, dept_nos):
+    """
+    {dept_no: (first from_date, last to_date)} of the given managers' dept_manager
+    rows in the given departments.
+    """
+    emp_nos, dept_nos = _ids(emp_nos, int), _ids(dept_nos, str)
+    if not emp_nos or not dept_nos:
+        return {}
+    sql = text("""
+        SELECT dept_no, MIN(from_date) AS from_date, MAX(to_date) AS to_date
+        FROM dept_manager
+        WHERE emp_no IN :emp_nos AND dept_no IN :dept_nos
+        GROUP BY dept_no
+    """).bindparams(bindparam('emp_nos', expanding=True), bindparam('dept_nos', expanding=True))
+    rows = conn.execute(sql, {"emp_nos": emp_nos, "dept_nos": dept_nos})
+    return {row.dept_no: (row.from_date, row.to_date) for row in rows}
+
+
+def refresh_history_for_managers(conn, emp_nos, dept_nos, before=None):
+    """
+    Recompute the history rows a change of the given managers' dept_manager rows
+    can affect: rows of the given departments whose salary period overlaps the
+    manager's tenure before or after the write. Runs on the caller's connection.
+
+    Args:
+        before: manager_intervals taken before an update or delete
+    """
+    intervals = {}
+    for dept_no, (from_date, to_date) in [*(before or {}).items(), *manager_intervals(conn, emp_nos, dept_nos).items()]:
+        if dept_no in intervals:
+            low, high = intervals[dept_no]
+            from_date, to_date = min(low, from_date), max(high, to_date)
+        intervals[dept_no] = (from_date, to_date)
+
+    delete_sql = text("""
+        DELETE FROM employee_profile_history
+        WHERE dept_no = :dept_no AND effective_date <= :to_date AND end_date >= :from_date
+    """)
+    insert_sql = text(
+        f'INSERT INTO employee_profile_history ({columns}) {select_history_sql} '
+        'WHERE de.dept_no = :dept_no AND s.from_date <= :to_date AND s.to_date >= :from_date'
+    )
+
+    rowcount = 0
+    for dept_no, (from_date, to_date) in intervals.items():
+        params = {"dept_no": dept_no, "from_date": from_date, "to_date": to_date}
+        conn.execute(delete_sql, params)
+        rowcount += conn.execute(insert_sql, params).rowcount
+    return rowcount
+
+
+def rename_history_departments(conn, dept_nos):
+    """
+    Copy new department names into the history rows. Runs on the caller's connection.
+    """
+    dept_nos = _ids(dept_nos, str)
+    if not dept_nos:
+        return 0
+
+    sql = text("""
+        UPDATE employee_profile_history h
+        JOIN departments d ON d.dept_no = h.dept_no
+        SET h.dept_name = d.dept_name
+        WHERE h.dept_no IN :dept_nos
+    """).bindparams(bindparam('dept_nos', expanding=True))
+    return conn.execute(sql, {"dept_nos": dept_nos}).rowcount
+
+
+def remove_history_departments(conn, dept_nos):
+    """
+    Delete the history rows of departments that no longer exist. Runs on the caller's connection.
+    """
+    dept_nos = _ids(dept_nos, str)
+    if not dept_nos:
+        return 0
+
+    sql = text("""
+        DELETE FROM employee_profile_history
+        WHERE dept_no IN :dept_nos
+          AND dept_no NOT IN (SELECT dept_no FROM departments)
+    """).bindparams(bindparam('dept_nos', expanding=True))
+    return conn.execute(sql, {"dept_nos": dept_nos}).rowcount
@@ -0,0 +1,96 @@
+from sqlalchemy import text, bindparam
+from .init import engine
+
+
+# 员工变动记录表：每次部门调动 / 职称变化一行（前一条记录的值 -> 新记录的值，新记录的 from_date）。
+# 由 materialize.py 全量回填，写接口在同一事务中按员工追加新的变动；
+# /transfer/list、/promotion/* 直接按 (kind, at_date) 范围扫描，不再从 dept_emp / titles 推导。
+create_table_sql = """
+CREATE TABLE IF NOT EXISTS employee_transitions (
+    emp_no      INT                     NOT NULL,
+    kind        ENUM ('dept','title')   NOT NULL,
+    at_date     DATE                    NOT NULL,
+    from_value  VARCHAR(50)             NOT NULL,
+    to_value    VARCHAR(50)             NOT NULL,
+    PRIMARY KEY (emp_no, kind, at_date, to_value),
+    KEY idx_employee_transitions_kind_date (kind, at_date),
+    FOREIGN KEY (emp_no) REFERENCES employees (emp_no) ON DELETE CASCADE
+)
+"""
+
+columns = "emp_no, kind, at_date, from_value, to_value"
+
+# 按 from_date 排序取前一条记录（LAG），值不同即为一次变动；{where} 用于只计算部分员工
+select_transitions_sql = """
+SELECT emp_no, kind, at_date, from_value, to_value
+FROM (
+    SELECT emp_no, 'dept' AS kind, from_date AS at_date,
+           LAG(dept_no) OVER (PARTITION BY emp_no ORDER BY from_date) AS from_value,
+           dept_no AS to_value
+    FROM dept_emp
+    {where}
+    UNION ALL
+    SELECT emp_no, 'title' AS kind, from_date AS at_date,
+           LAG(title) OVER (PARTITION BY emp_no ORDER BY from_date) AS from_value,
+           title AS to_value
+    FROM titles
+    {where}
+) changes
+WHERE from_value IS NOT NULL AND from_value != to_value
+"""
+
+_employees_filter = 'WHERE emp_no IN :emp_nos'
+
+
+def create_employee_transitions_table():
+    """
+    Create the employee_transitions table if it does not exist yet.
+    """
+    with engine.begin() as conn:
+        conn.execute(text(create_table_sql))
+
+
+def rebuild_employee_transitions():
+    """
+    Backfill employee_transitions from the whole dept_emp and titles history.
+    """
+    create_employee_transitions_table()
+    with engine.begin() as conn:
+        conn.execute(text('DELETE FROM employee_transitions'))
+        result = conn.execute(text(f'INSERT INTO employee_transitions ({columns}) {select_transitions_sql.format(where="")}'))
+        return {"rowcount": result.rowcount}
+
+
+def refresh_transitions(conn, emp_nos):
+    """
+    Bring the transitions of the given employees in line with their dept_emp and
+    titles history. Runs on the caller's connection so it commits (or rolls back)
+    together with the write.
+
+    Rows that no longer follow from the history are deleted first, then the
+    missing ones are added, so a new row may reuse the key of a removed one
+    (e.g. d1 -> d2 -> d3 becoming d1 -> d3 after the d2 record is deleted).
+    New records only append rows; existing ones are kept as they are.
+    """
+    emp_nos = sorted({int(emp_no) for emp_no in emp_nos if emp_no is not None})
+    if not emp_nos:
+        return 0
+
+    derived = select_transitions_sql.format(where=_employees_filter)
+    prune_sql = text(f"""
+        DELETE FROM employee_transitions
+        WHERE emp_no IN :emp_nos
+          AND ({columns}) NOT IN (SELECT {columns} FROM ({derived}) current_transitions)
+    """).bindparams(bindparam('emp_nos', expanding=True))
+    # 只插入表中还没有的行；普通 INSERT，出错时整个写入回滚
+    insert_sql = text(f"""
+        INSERT INTO employee_transitions ({columns})
+        SELECT {columns} FROM ({derived}) current_transitions
+        WHERE ({columns}) NOT IN (
+            SELECT {columns} FROM employee_transitions WHERE emp_no IN :emp_nos
+        )
+    """).bindparams(bindparam('emp_nos', expanding=True))
+
+    conn.execute(prune_sql, {"emp_nos": emp_nos})
+    result = conn.execute(insert_sql, {"emp_nos": emp_nos})
+    return result.rowcount
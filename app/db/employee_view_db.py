@@ -3,45 +3,27 @@
 from sqlalchemy import text
 from typing import Optional
 from .init import engine
+from .pagination import decode_cursor, keyset_where, next_page
 
 def employee_profile(Page_Number: int, Row_Count: int, Employee_ID_min: Optional[int] = None, Employee_ID_max: Optional[int] = None, 
                     Employee_Name: Optional[str] = None, Title: Optional[str] = None, Salary_min: Optional[int] = None, 
                     Salary_max: Optional[int] = None, Department_Number: Optional[str] = None, Department: Optional[str] = None, 
                     Manager_Name: Optional[str] = None, Effective_Date_min: Optional[str] = None, Effective_Date_max: Optional[str] = None, 
-                    End_Date_min: Optional[str] = None, End_Date_max: Optional[str] = None):
+                    End_Date_min: Optional[str] = None, End_Date_max: Optional[str] = None,
+                    Cursor: Optional[str] = None):
+    """
+    Query the employee profile history with pagination and optional filtering conditions.
+    Pass `Cursor` (empty for the first page) to page by the table's primary key
+    (emp_no, effective_date, dept_no, title, manager_emp_no) instead of OFFSET;
+    the response then carries `next_cursor`.
+    """
     pageNo = Page_Number or 1
     pageSize = Row_Count or 10
 
     with engine.connect() as conn:
-        # Step 1: Create or replace the view.
-        # Note: Running this on every API call is inefficient. Consider creating it once when the app starts.
-        create_view_sql = """
-            CREATE OR REPLACE VIEW employee_profile_history AS
-            SELECT
-                e.emp_no,
-                e.first_name AS employee_first_name,
-                e.last_name AS employee_last_name,
-                t.title,
-                s.salary,
-                d.dept_no,
-                d.dept_name,
-                m.first_name AS manager_first_name,
-                m.last_name AS manager_last_name,
-                s.from_date AS effective_date,
-                s.to_date AS end_date
-            FROM
-                employees e
-            JOIN salaries s ON e.emp_no = s.emp_no
-            JOIN titles t ON e.emp_no = t.emp_no AND s.from_date BETWEEN t.from_date AND t.to_date
-            JOIN dept_emp de ON e.emp_no = de.emp_no AND s.from_date BETWEEN de.from_date AND de.to_date
-            JOIN departments d ON de.dept_no = d.dept_no
-            JOIN dept_manager dm ON de.dept_no = dm.dept_no AND s.from_date <= dm.to_date AND dm.from_date <= s.to_date
-            JOIN employees m ON dm.emp_no = m.emp_no;
-        """
-        conn.execute(text(create_view_sql))
-        conn.commit()
-
-        # Step 2: Build and execute a safe, parameterized SELECT query.
+        # employee_profile_history is a materialized table (app/db/employee_profile_history.py),
+        # built by materialize.py and kept current by the write endpoints.
+        # Filters on emp_no, effective_date, salary and dept_no use its indexes.
         sql = "SELECT * FROM employee_profile_history"
         
         params = {}
@@ -104,15 +86,31 @@ def employee_profile(Page_Number: int, Row_Count: int, Employee_ID_min: Optional
             where_clauses.append("end_date <= :End_Date_max")
             params['End_Date_max'] = End_Date_max
         
+        # Keyset pagination: continue after the last row of the previous page
+        key_columns = ['emp_no', 'effective_date', 'dept_no', 'title', 'manager_emp_no']
+        if Cursor is not None:
+            after = decode_cursor(Cursor, len(key_columns))
+            if after is not None:
+                clause, cursor_params = keyset_where(key_columns, after)
+                where_clauses.append(clause)
+                params.update(cursor_params)
+
         if where_clauses:
             sql += ' WHERE ' + ' AND '.join(where_clauses)
 
-        sql += ' LIMIT :page_size OFFSET :offset'
-        params['page_size'] = pageSize
-        params['offset'] = (pageNo - 1) * pageSize
+        if Cursor is not None:
+            # Fetch one extra row to know whether there is a next page
+            sql += ' ORDER BY emp_no, effective_date, dept_no, title, manager_emp_no LIMIT :page_size'
+            params['page_size'] = pageSize + 1
+        else:
+            sql += ' LIMIT :page_size OFFSET :offset'
+            params['page_size'] = pageSize
+            params['offset'] = (pageNo - 1) * pageSize
 
         # Execute the query by passing the SQL string and the parameters dictionary
         result = conn.execute(text(sql), params)
 
         data = result.mappings().all()
+        if Cursor is not None:
+            return next_page(data, key_columns, pageSize)
         return data
@@ -1,8 +1,13 @@
 from sqlalchemy import text
-from .init import engine
-# import json
+from .init import engine, exec_engine
 
+import json
 import logging
+import os
+import re
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from time import perf_counter
 
 # 配置日志
 logging.basicConfig(
@@ -47,4 +52,145 @@ def executor(sql: str):
         logger.error(f"SQL执行失败: {sql}")
         logger.error(f"错误信息: {str(e)}")
         # 将数据库异常向上抛出
-        raise e
\ No newline at end of file
+        raise e
+
+# ---- 只读模式 ----
+# 临时分析查询：只读事务、单语句执行时间上限、行数上限，结果流式返回，使用独立的小连接池
+
+EXEC_MAX_ROWS = int(os.getenv('EXEC_MAX_ROWS', '10000'))  # 行数上限的默认值与最大值
+EXEC_MAX_EXECUTION_MS = int(os.getenv('EXEC_MAX_EXECUTION_MS', '10000'))  # 执行时间上限的默认值与最大值
+EXEC_BATCH_SIZE = 500
+
+# 只读模式允许的语句类型
+READONLY_STATEMENTS = ('SELECT', 'WITH', 'SHOW', 'EXPLAIN', 'DESCRIBE', 'DESC', 'TABLE', 'VALUES')
+
+# 字符串、带引号的标识符和注释；检查语句时先把它们遮盖掉，其中的 ';' 等不算语句的一部分。
+# /*! ... */ 版本注释会被 MySQL 执行，不遮盖
+_LITERALS = re.compile(r"""
+    '(?:\\[\s\S]|''|[^'\\])*'
+  | "(?:\\[\s\S]|""|[^"\\])*"
+  | `(?:``|[^`])*`
+  | (?:--(?=\s|$)|\#)[^\n]*
+  | /\*(?!!)[\s\S]*?\*/
+""", re.X)
+
+# 写文件的 SELECT 在只读事务中同样可以执行
+_WRITES_FILE = re.compile(r'\bINTO\s+(OUTFILE|DUMPFILE)\b', re.I)
+
+
+def _mask_literals(sql: str) -> str:
+    """
+    `sql` with string literals, quoted identifiers and comments blanked out,
+    keeping the length so positions still match.
+    """
+    def blank(m):
+        token = m.group()
+        if token[0] in '\'"`':
+            return token[0] + ' ' * (len(token) - 2) + token[-1]
+        return re.sub(r'[^\n]', ' ', token)
+    return _LITERALS.sub(blank, sql)
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (date, datetime, time)):
+        return value.isoformat()
+    if isinstance(value, timedelta):
+        return str(value)
+    if isinstance(value, (bytes, bytearray)):
+        return value.hex()
+    return str(value)
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, default=_json_default, ensure_ascii=False, separators=(',', ':'))
+
+
+def check_readonly_sql(sql: str) -> str:
+    """
+    Validate a statement for read-only execution and return it without a trailing ';'.
+    Strings and comments are ignored when looking for ';' and the statement type.
+
+    Raises:
+        ValueError: empty, several statements, not a read statement, or writes a file
+    """
+    sql = sql or ''
+    masked = _mask_literals(sql)
+    # 去掉末尾的 ';'（以及其后的空白和注释）
+    end = len(masked.rstrip())
+    while end and masked[end - 1] == ';':
+        end = len(masked[:end - 1].rstrip())
+    statement, masked = sql[:end].strip(), masked[:end].strip()
+    if not masked:
+        raise ValueError("SQL query cannot be empty")
+    if ';' in masked:
+        raise ValueError("Only a single statement is allowed in read-only mode")
+    keyword = masked.lstrip('(').split(None, 1)[0].upper()
+    if keyword not in READONLY_STATEMENTS:
+        # DDL 会隐式提交并跳出只读事务，因此在执行前就拒绝
+        raise ValueError(f"Statement type {keyword} is not allowed in read-only mode")
+    if _WRITES_FILE.search(masked):
+        raise ValueError("SELECT ... INTO OUTFILE / DUMPFILE is not allowed in read-only mode")
+    return statement
+
+
+def executor_readonly(sql: str, max_rows: int = None, timeout_ms: int = None):
+    """
+    Run one read statement in a READ ONLY transaction on the exec pool and
+    stream the result as JSON text chunks:
+    {"columns": [...], "rows": [{...}, ...], "row_count": n, "truncated": bool, "elapsed_ms": t}
+
+    A generator; the statement is checked with check_readonly_sql before the
+    first chunk. At most `max_rows` rows are sent; if more exist, `truncated`
+    is true and the connection is dropped instead of reading the remaining rows.
+
+    Args:
+        sql: single SELECT / WITH / SHOW / EXPLAIN / DESCRIBE statement
+        max_rows: row cap (default and upper bound EXEC_MAX_ROWS)
+        timeout_ms: MAX_EXECUTION_TIME for the statement (default and upper bound EXEC_MAX_EXECUTION_MS)
+    """
+    statement = check_readonly_sql(sql)
+    max_rows = min(max_rows or EXEC_MAX_ROWS, EXEC_MAX_ROWS)
+    timeout_ms = min(timeout_ms or EXEC_MAX_EXECUTION_MS, EXEC_MAX_EXECUTION_MS)
+    started = perf_counter()
+
+    with exec_engine.connect() as conn:
+        conn.exec_driver_sql(f'SET SESSION max_execution_time = {int(timeout_ms)}')
+        conn.exec_driver_sql('START TRANSACTION READ ONLY')
+        logger.info(f'只读执行语句: {statement}')
+        result = conn.execution_options(stream_results=True).execute(text(statement))
+
+        if not result.returns_rows:
+            conn.rollback()
+            yield _dumps({"columns": [], "rows": [], "row_count": 0, "truncated": False,
+                          "elapsed_ms": round((perf_counter() - started) * 1000, 1)})
+            return
+
+        columns = list(result.keys())
+        yield '{"columns":' + _dumps(columns) + ',"rows":['
+
+        row_count = 0
+        truncated = False
+        while True:
+            rows = result.fetchmany(min(EXEC_BATCH_SIZE, max_rows - row_count + 1))
+            if not rows:
+                break
+            if row_count + len(rows) > max_rows:
+                rows = rows[:max_rows - row_count]
+                truncated = True
+            if rows:
+                chunk = ','.join(_dumps(dict(zip(columns, row))) for row in rows)
+                yield (',' if row_count else '') + chunk
+                row_count += len(rows)
+            if truncated:
+                break
+
+        if truncated:
+            # 服务端游标关闭时会读完剩余的行；直接丢弃连接，让服务器中止查询
+            conn.invalidate()
+        else:
+            conn.rollback()
+
+        yield '],"row_count":' + str(row_count) + ',"truncated":' + _dumps(truncated) + \
+            ',"elapsed_ms":' + _dumps(round((perf_counter() - started) * 1000, 1)) + '}'
@@ -0,0 +1,105 @@
+import csv
+import io
+import json
+from sqlalchemy import text
+from .init import engine
+
+
+# 大结果集导出：用服务端游标（stream_results）逐批读取，每批编码后立即交给响应，
+# 内存占用只与批大小有关，与结果总行数无关。
+EXPORT_BATCH_SIZE = 2000
+
+# 资源 -> (SELECT 语句, 按部门过滤的条件, 排序)
+RESOURCES = {
+    'employees': (
+        "SELECT emp_no, birth_date, first_name, last_name, gender, hire_date FROM employees",
+        "emp_no IN (SELECT emp_no FROM dept_emp WHERE dept_no = :dept_no)",
+        "emp_no",
+    ),
+    'salaries': (
+        "SELECT emp_no, salary, from_date, to_date FROM salaries",
+        "emp_no IN (SELECT emp_no FROM dept_emp WHERE dept_no = :dept_no)",
+        "emp_no, from_date",
+    ),
+    'titles': (
+        "SELECT emp_no, title, from_date, to_date FROM titles",
+        "emp_no IN (SELECT emp_no FROM dept_emp WHERE dept_no = :dept_no)",
+        "emp_no, title, from_date",
+    ),
+    'dept_emp': (
+        "SELECT emp_no, dept_no, from_date, to_date FROM dept_emp",
+        "dept_no = :dept_no",
+        "emp_no, dept_no",
+    ),
+    'profile_history': (
+        "SELECT * FROM employee_profile_history",
+        "dept_no = :dept_no",
+        "emp_no, effective_date, dept_no, title, manager_emp_no",
+    ),
+}
+
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+def _encode_ndjson(columns, rows, header):
+    lines = [json.dumps(dict(zip(columns, row)), default=str, ensure_ascii=False) for row in rows]
+    return '\n'.join(lines) + '\n'
+
+
+def _encode_csv(columns, rows, header):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(columns)
+    writer.writerows(rows)
+    return buffer.getvalue()
+
+
+def db_export(resource: str, fmt: str = 'ndjson', Employee_ID_min: int = None, Employee_ID_max: int = None,
+              Dept_Number: str = None):
+    """
+    Stream a whole table (optionally filtered) as encoded NDJSON / CSV chunks.
+
+    A generator: the connection and its server-side cursor stay open until it is
+    exhausted or closed. Each item is one encoded batch of EXPORT_BATCH_SIZE rows.
+
+    Args:
+        resource: key of RESOURCES
+        fmt: 'ndjson' or 'csv'
+        Employee_ID_min / Employee_ID_max: optional emp_no range
+        Dept_Number: optional department (employees who ever worked there, or rows of that department)
+    """
+    select_sql, dept_clause, order_by = RESOURCES[resource]
+    encode = _encode_csv if fmt == 'csv' else _encode_ndjson
+
+    params = {}
+    where_clauses = []
+    if Employee_ID_min is not None:
+        where_clauses.append("emp_no >= :Employee_ID_min")
+        params['Employee_ID_min'] = Employee_ID_min
+    if Employee_ID_max is not None:
+        where_clauses.append("emp_no <= :Employee_ID_max")
+        params['Employee_ID_max'] = Employee_ID_max
+    if Dept_Number is not None:
+        where_clauses.append(dept_clause)
+        params['dept_no'] = Dept_Number
+
+    sql = select_sql
+    if where_clauses:
+        sql += ' WHERE ' + ' AND '.join(where_clauses)
+    sql += f' ORDER BY {order_by}'
+
+    with engine.connect() as conn:
+        # stream_results 使用 pymysql 的 SSCursor，行在读取时才从服务器传输
+        result = conn.execution_options(stream_results=True, yield_per=EXPORT_BATCH_SIZE).execute(text(sql), params)
+        columns = list(result.keys())
+        header = True
+        for rows in result.partitions():
+            yield encode(columns, rows, header)
+            header = False
+        if header and fmt == 'csv':
+            # 空结果也输出表头
+            yield encode(columns, [], header)
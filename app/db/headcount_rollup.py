@@ -0,0 +1,196 @@
+from datetime import date
+from sqlalchemy import text, bindparam
+from .init import engine
+
+
+# 人数变化汇总表：按年/按月预先聚合入职、离开记录数和在职人数。
+# - hires:       该期间入职的员工数
+# - departures:  该期间结束部门关系的员工数（与原 /headcount/changes 口径一致，含转部门）
+# - separations: 最后一条部门关系在该期间结束的员工数（真正离职）
+# - active:      期末在职人数 = 截至该期间 hires - separations 的累计和
+create_table_sql = """
+CREATE TABLE IF NOT EXISTS headcount_rollup (
+    granularity  ENUM ('year','month')  NOT NULL,
+    period       DATE                   NOT NULL,
+    hires        INT                    NOT NULL DEFAULT 0,
+    departures   INT                    NOT NULL DEFAULT 0,
+    separations  INT                    NOT NULL DEFAULT 0,
+    active       INT                    NOT NULL DEFAULT 0,
+    PRIMARY KEY (granularity, period)
+)
+"""
+
+# 粒度 -> 期间起始日的 SQL 表达式（仅全量构建使用，增量更新用 period_start 在 Python 中计算）
+GRANULARITIES = {
+    'year': "MAKEDATE(YEAR({col}), 1)",
+    'month': "DATE_SUB({col}, INTERVAL DAYOFMONTH({col}) - 1 DAY)",
+}
+
+# 全量构建：整表扫描一次，按期间分组
+rebuild_sql = """
+INSERT INTO headcount_rollup (granularity, period, hires, departures, separations, active)
+WITH hires AS (
+    SELECT {hire_period} AS period, COUNT(*) AS hires
+    FROM employees
+    GROUP BY period
+),
+departures AS (
+    SELECT {to_period} AS period, COUNT(DISTINCT emp_no) AS departures
+    FROM dept_emp
+    WHERE to_date != '9999-01-01'
+    GROUP BY period
+),
+separations AS (
+    SELECT {last_period} AS period, COUNT(*) AS separations
+    FROM (
+        SELECT emp_no, MAX(to_date) AS last_date
+        FROM dept_emp
+        GROUP BY emp_no
+        HAVING last_date != '9999-01-01'
+    ) last_dates
+    GROUP BY period
+),
+periods AS (
+    SELECT period FROM hires
+    UNION
+    SELECT period FROM departures
+)
+SELECT
+    :granularity,
+    p.period,
+    COALESCE(h.hires, 0),
+    COALESCE(d.departures, 0),
+    COALESCE(s.separations, 0),
+    0
+FROM periods p
+LEFT JOIN hires h ON h.period = p.period
+LEFT JOIN departures d ON d.period = p.period
+LEFT JOIN separations s ON s.period = p.period
+"""
+
+# 增量更新：只重算一个期间，全部是 hire_date / to_date 上的范围扫描；active 随后统一重算
+refresh_period_sql = """
+REPLACE INTO headcount_rollup (granularity, period, hires, departures, separations, active)
+SELECT
+    :granularity,
+    :period_start,
+    (SELECT COUNT(*) FROM employees
+      WHERE hire_date >= :period_start AND hire_date < :period_end),
+    (SELECT COUNT(DISTINCT emp_no) FROM dept_emp
+      WHERE to_date >= :period_start AND to_date < :period_end AND to_date != '9999-01-01'),
+    (SELECT COUNT(DISTINCT de.emp_no) FROM dept_emp de
+      WHERE de.to_date >= :period_start AND de.to_date < :period_end AND de.to_date != '9999-01-01'
+        AND NOT EXISTS (SELECT 1 FROM dept_emp later
+                         WHERE later.emp_no = de.emp_no AND later.to_date > de.to_date)),
+    0
+"""
+
+delete_empty_sql = """
+DELETE FROM headcount_rollup
+WHERE granularity = :granularity AND period IN :periods
+    AND hires = 0 AND departures = 0 AND separations = 0
+"""
+
+# 从 from_period 开始重算在职人数的累计和（每种粒度只有几十到几百行）
+refresh_active_sql = """
+UPDATE headcount_rollup r
+JOIN (
+    SELECT period, SUM(hires - separations) OVER (ORDER BY period) AS active
+    FROM headcount_rollup
+    WHERE granularity = :granularity
+) totals ON totals.period = r.period
+SET r.active = totals.active
+WHERE r.granularity = :granularity AND r.period >= :from_period
+"""
+
+
+def period_start(granularity: str, day: date) -> date:
+    if granularity == 'year':
+        return date(day.year, 1, 1)
+    return date(day.year, day.month, 1)
+
+
+def period_end(granularity: str, start: date) -> date:
+    if granularity == 'year':
+        return date(start.year + 1, 1, 1)
+    if start.month == 12:
+        return date(start.year + 1, 1, 1)
+    return date(start.year, start.month + 1, 1)
+
+
+def create_headcount_rollup_table():
+    """
+    Create the headcount_rollup table if it does not exist yet.
+    """
+    with engine.begin() as conn:
+        conn.execute(text(create_table_sql))
+
+
+def rebuild_headcount_rollup():
+    """
+    Rebuild headcount_rollup for every granularity from employees and dept_emp.
+    """
+    create_headcount_rollup_table()
+    rowcount = 0
+    with engine.begin() as conn:
+        conn.execute(text('DELETE FROM headcount_rollup'))
+        for granularity, start_expr in GRANULARITIES.items():
+            sql = rebuild_sql.format(
+                hire_period=start_expr.format(col='hire_date'),
+                to_period=start_expr.format(col='to_date'),
+                last_period=start_expr.format(col='last_date'),
+            )
+            result = conn.execute(text(sql), {"granularity": granularity})
+            rowcount += result.rowcount
+            conn.execute(text(refresh_active_sql), {"granularity": granularity, "from_period": date.min})
+    return {"rowcount": rowcount}
+
+
+def headcount_dates(conn, emp_nos):
+    """
+    Hire dates and ended dept_emp dates of the given employees, i.e. the dates
+    whose periods their rows contribute to in headcount_rollup.
+    """
+    emp_nos = sorted({int(emp_no) for emp_no in emp_nos if emp_no is not None})
+    if not emp_nos:
+        return set()
+
+    sql = text("""
+    SELECT hire_date AS day FROM employees WHERE emp_no IN :emp_nos
+    UNION
+    SELECT to_date FROM dept_emp WHERE emp_no IN :emp_nos AND to_date != '9999-01-01'
+    """).bindparams(bindparam('emp_nos', expanding=True))
+    return {row.day for row in conn.execute(sql, {"emp_nos": emp_nos})}
+
+
+def refresh_headcount_rollup(conn, emp_nos, dates=()):
+    """
+    Recompute the rollup periods touched by a write, then the running active count.
+    Runs on the caller's connection so it commits (or rolls back) together with the write.
+
+    Args:
+        conn: connection that performed the write
+        emp_nos: employees whose rows were written
+        dates: dates the rows had before the write (see capture_derived), so
+               periods they no longer fall into are recomputed as well
+    """
+    days = set(dates) | headcount_dates(conn, emp_nos)
+    if not days:
+        return 0
+
+    refreshed = 0
+    for granularity in GRANULARITIES:
+        periods = sorted({period_start(granularity, day) for day in days})
+        for start in periods:
+            conn.execute(text(refresh_period_sql), {
+                "granularity": granularity,
+                "period_start": start,
+                "period_end": period_end(granularity, start),
+            })
+        conn.execute(
+            text(delete_empty_sql).bindparams(bindparam('periods', expanding=True)),
+            {"granularity": granularity, "periods": periods}
+        )
+        conn.execute(text(refresh_active_sql), {"granularity": granularity, "from_period": periods[0]})
+        refreshed += len(periods)
+    return refreshed
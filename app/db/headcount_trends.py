@@ -1,71 +1,69 @@
 from sqlalchemy import text
 from .init import engine
+from .result_cache import cached
 from typing import Optional
 
 
 
 
-def db_get_headcount_changes_by_year(start_year: Optional[int] = None, end_year: Optional[int] = None):
+@cached('employees', 'dept_emp')
+def db_get_headcount_changes(granularity: str = 'year', start_year: Optional[int] = None, end_year: Optional[int] = None):
     """
-    Get headcount changes by year (hires + departures + net changes)
+    Get headcount changes per year or per month (hires + departures + net changes + active headcount)
+    
+    Reads the pre-aggregated headcount_rollup table (see app/db/headcount_rollup.py),
+    so the cost depends on the number of periods, not on the number of employees.
     
     Parameters:
+        granularity: 'year' or 'month'
         start_year: Start year (None means from earliest year)
         end_year: End year (None means to latest year)
     
     Returns:
-        List of comprehensive headcount changes for each year
+        List of comprehensive headcount changes for each period
     """
     
     sql = """
-    WITH hires AS (
-        SELECT 
-            YEAR(hire_date) AS year,
-            COUNT(*) AS new_hires
-        FROM employees
-        WHERE (:start_year IS NULL OR YEAR(hire_date) >= :start_year)
-            AND (:end_year IS NULL OR YEAR(hire_date) <= :end_year)
-        GROUP BY YEAR(hire_date)
-    ),
-    departures AS (
-        SELECT 
-            YEAR(de.to_date) AS year,
-            COUNT(DISTINCT de.emp_no) AS departures
-        FROM dept_emp de
-        WHERE de.to_date != '9999-01-01'
-            AND (:start_year IS NULL OR YEAR(de.to_date) >= :start_year)
-            AND (:end_year IS NULL OR YEAR(de.to_date) <= :end_year)
-        GROUP BY YEAR(de.to_date)
-    ),
-    all_years AS (
-        SELECT year FROM hires
-        UNION
-        SELECT year FROM departures
-    )
     SELECT 
-        ay.year,
-        COALESCE(h.new_hires, 0) AS new_hires,
-        COALESCE(d.departures, 0) AS departures,
-        COALESCE(h.new_hires, 0) - COALESCE(d.departures, 0) AS net_change,
+        YEAR(period) AS year,
+        DATE_FORMAT(period, '%Y-%m') AS month,
+        hires AS new_hires,
+        departures,
+        hires - departures AS net_change,
         CASE 
-            WHEN COALESCE(d.departures, 0) = 0 THEN 0
-            ELSE ROUND(COALESCE(d.departures, 0) * 100.0 / COALESCE(h.new_hires, 1), 2)
-        END AS turnover_rate_percent
-    FROM all_years ay
-    LEFT JOIN hires h ON ay.year = h.year
-    LEFT JOIN departures d ON ay.year = d.year
-    ORDER BY ay.year
+            WHEN departures = 0 THEN 0
+            ELSE ROUND(departures * 100.0 / COALESCE(NULLIF(hires, 0), 1), 2)
+        END AS turnover_rate_percent,
+        active
+    FROM headcount_rollup
+    WHERE granularity = :granularity
+        AND (:start_year IS NULL OR period >= MAKEDATE(:start_year, 1))
+        AND (:end_year IS NULL OR period < MAKEDATE(:end_year + 1, 1))
+    ORDER BY period
     """
     
     with engine.connect() as conn:
         result = conn.execute(
             text(sql),
-            {"start_year": start_year, "end_year": end_year}
+            {"granularity": granularity, "start_year": start_year, "end_year": end_year}
         )
         
-        if result.returns_rows:
-            rows = result.mappings().all()
-            return [dict(row) for row in rows]
-        else:
-            return []
+        rows = [dict(row) for row in result.mappings().all()]
+        if granularity == 'year':
+            for row in rows:
+                del row["month"]
+        return rows
 
+
+def db_get_headcount_changes_by_year(start_year: Optional[int] = None, end_year: Optional[int] = None):
+    """
+    Get headcount changes by year (hires + departures + net changes)
+    
+    Parameters:
+        start_year: Start year (None means from earliest year)
+        end_year: End year (None means to latest year)
+    
+    Returns:
+        List of comprehensive headcount changes for each year
+    """
+    return db_get_headcount_changes('year', start_year, end_year)
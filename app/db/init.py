@@ -1,4 +1,6 @@
+import os
 from sqlalchemy import text, create_engine
+from .instrumentation import InstrumentedQueuePool, instrument_engine
 
 db_user = 'root'
 db_password = 'Qq742589'
@@ -6,15 +8,42 @@ db_name = 'employees'
 host = 'localhost'
 port = '3306'
 
-# 数据库连接配置
-DATABASE_URL = f"mysql+pymysql://{db_user}:{db_password}@{host}:{port}/{db_name}?charset=utf8mb4"
+# 数据库连接配置，可通过环境变量 DATABASE_URL 指向其他库（如基准测试用的库）
+DATABASE_URL = os.getenv('DATABASE_URL', f"mysql+pymysql://{db_user}:{db_password}@{host}:{port}/{db_name}?charset=utf8mb4")
+
+# 连接池与并发配置，可通过环境变量覆盖
+pool_size = int(os.getenv('DB_POOL_SIZE', '10'))  # 连接池大小
+max_overflow = int(os.getenv('DB_MAX_OVERFLOW', '20'))  # 连接池溢出大小
+# 同时在线程池中执行的数据库调用数，默认等于连接池最多可提供的连接数
+db_concurrency = int(os.getenv('DB_CONCURRENCY', str(pool_size + max_overflow)))
+# 调试时可设置 DB_ECHO=1 打印全部 SQL；平时只记录慢查询（见 instrumentation.py）
+db_echo = os.getenv('DB_ECHO', '0') == '1'
 
 
 engine = create_engine(
         DATABASE_URL,
-        echo=True,  # 打印SQL语句，便于调试
+        echo=db_echo,  # 打印SQL语句，便于调试
+        poolclass=InstrumentedQueuePool,  # 记录取连接的等待时间
         pool_pre_ping=True,  # 连接池预检查，确保连接有效
         pool_recycle=3600,  # 连接回收时间（秒）
-        max_overflow=20,  # 连接池溢出大小
-        pool_size=10  # 连接池大小
-    )
\ No newline at end of file
+        max_overflow=max_overflow,  # 连接池溢出大小
+        pool_size=pool_size  # 连接池大小
+    )
+instrument_engine(engine)
+
+# /exec 只读模式使用的独立小连接池，临时分析查询不会占满接口的连接池
+EXEC_DATABASE_URL = os.getenv('EXEC_DATABASE_URL', DATABASE_URL)  # 可配置为只读账号
+exec_pool_size = int(os.getenv('EXEC_POOL_SIZE', '2'))
+exec_pool_timeout = int(os.getenv('EXEC_POOL_TIMEOUT', '5'))  # 等待空闲连接的秒数，超时即报错
+
+exec_engine = create_engine(
+        EXEC_DATABASE_URL,
+        echo=db_echo,
+        poolclass=InstrumentedQueuePool,
+        pool_pre_ping=True,
+        pool_recycle=3600,
+        max_overflow=0,
+        pool_size=exec_pool_size,
+        pool_timeout=exec_pool_timeout
+    )
+instrument_engine(exec_engine, 'exec')
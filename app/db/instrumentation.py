@@ -0,0 +1,125 @@
+import logging
+import os
+import random
+import time
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+from app.core.metrics import Histogram, Gauge, Counter, current_route
+
+slow_query_logger = logging.getLogger('app.db.slow_query')
+
+# 慢查询日志：超过阈值（毫秒）的语句按采样比例记录，替代 echo=True 打印全部 SQL
+SLOW_QUERY_MS = float(os.getenv('DB_SLOW_QUERY_MS', '200'))
+SLOW_QUERY_SAMPLE = float(os.getenv('DB_SLOW_QUERY_SAMPLE', '1.0'))
+
+db_statement_duration = Histogram(
+    'db_statement_duration_seconds',
+    'SQL statement execution time by route and statement type.',
+    ('route', 'operation'),
+)
+db_slow_statements = Counter(
+    'db_slow_statements_total',
+    'Statements slower than DB_SLOW_QUERY_MS, by route and statement type.',
+    ('route', 'operation'),
+)
+db_pool_checkout_wait = Histogram(
+    'db_pool_checkout_seconds',
+    'Time spent obtaining a pooled connection (queueing for a free slot, pre-ping, connect), by route.',
+    ('route',),
+)
+db_pool_hold = Histogram(
+    'db_pool_connection_held_seconds',
+    'How long a connection stays checked out of the pool, by route.',
+    ('route',),
+)
+db_pool_timeouts = Counter(
+    'db_pool_checkout_timeouts_total',
+    'Checkouts that gave up waiting for a free connection, by route.',
+    ('route',),
+)
+
+# 已接入监控的引擎：名称 -> engine
+_engines = {}
+
+
+def _pool_stat(stat):
+    return lambda: {(name,): getattr(engine.pool, stat)() for name, engine in list(_engines.items())}
+
+
+# 连接池状态（抓取时读取）
+Gauge('db_pool_size', 'Configured pool size.', ('engine',), function=_pool_stat('size'))
+Gauge('db_pool_checked_out', 'Connections currently in use.', ('engine',), function=_pool_stat('checkedout'))
+Gauge('db_pool_checked_in', 'Idle connections in the pool.', ('engine',), function=_pool_stat('checkedin'))
+Gauge('db_pool_overflow', 'Connections open beyond pool_size (negative while the pool is not full yet).',
+      ('engine',), function=_pool_stat('overflow'))
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool that records how long each checkout waits, per route.
+    """
+
+    def connect(self):
+        route = current_route()
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            db_pool_timeouts.inc(route=route)
+            raise
+        finally:
+            db_pool_checkout_wait.observe(time.perf_counter() - start, route=route)
+
+
+def _operation(statement: str) -> str:
+    words = statement.lstrip(' \t\r\n(').split(None, 1)
+    return words[0].upper() if words else 'UNKNOWN'
+
+
+def instrument_engine(engine, name: str = 'main'):
+    """
+    Attach statement timing, slow-query logging and pool gauges to `engine`.
+    """
+    _engines[name] = engine
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get('query_start')
+        if not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        route = current_route()
+        operation = _operation(statement)
+        db_statement_duration.observe(elapsed, route=route, operation=operation)
+
+        if elapsed * 1000 >= SLOW_QUERY_MS:
+            db_slow_statements.inc(route=route, operation=operation)
+            if random.random() < SLOW_QUERY_SAMPLE:
+                slow_query_logger.warning(
+                    f"Slow query {elapsed * 1000:.1f} ms on {route}: "
+                    f"{' '.join(statement.split())[:2000]} | params={str(parameters)[:500]}"
+                )
+
+    @event.listens_for(engine, 'handle_error')
+    def handle_error(context):
+        # 出错的语句不会触发 after_cursor_execute，丢弃其开始时间
+        starts = context.connection.info.get('query_start') if context.connection is not None else None
+        if starts:
+            starts.pop()
+
+    @event.listens_for(engine, 'checkout')
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info['checked_out_at'] = (time.perf_counter(), current_route())
+
+    @event.listens_for(engine, 'checkin')
+    def on_checkin(dbapi_connection, connection_record):
+        checked_out = connection_record.info.pop('checked_out_at', None)
+        if checked_out is not None:
+            start, route = checked_out
+            db_pool_hold.observe(time.perf_counter() - start, route=route)
+
+    return engine
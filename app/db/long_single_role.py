@@ -1,14 +1,24 @@
-from sqlalchemy import text
+from sqlalchemy import text, bindparam
 from .init import engine
+from .current_titles import current_titles
 from datetime import date, timedelta
-from typing import Optional
+from typing import Optional, Union
 
 
 # 识别长时间处于同一职务的员工（候选人用于培训/晋升评估）
+# 匹配的员工在内存中的当前职称索引里是按职称开始日期排序的前缀：二分查找得到总数，
+# 分页取其中一段，只按 emp_no 查询这一页员工的姓名。
 
-def db_get_long_single_role(pageNo: int = 1, pageSize: int = 10, min_days: int = 1095, as_of_date: Optional[str] = None):
+names_sql = """
+	SELECT emp_no, first_name, last_name
+	FROM employees
+	WHERE emp_no IN :emp_nos
 	"""
-	查询在同一 title 下持续时间超过 min_days 的员工（支持分页，每页 pageSize，最大总数 100）。
+
+
+def db_get_long_single_role(pageNo: int = 1, pageSize: int = 10, min_days: int = 1095, as_of_date: Union[str, date, None] = None):
+	"""
+	查询在同一 title 下持续时间超过 min_days 的员工（支持分页，每页 pageSize）。
 
 	参数:
 		pageNo: 页码（从1开始，默认1）
@@ -18,7 +28,7 @@ def db_get_long_single_role(pageNo: int = 1, pageSize: int = 10, min_days: int =
 
 	返回:
 		字典：{"data": [...], "page": pageNo, "page_size": pageSize, "total": total}
-		total 为匹配的记录数上限（最多 100）
+		data 按在职天数从多到少排列，total 为匹配的员工总数
 	"""
 
 	# 参数保护
@@ -28,56 +38,33 @@ def db_get_long_single_role(pageNo: int = 1, pageSize: int = 10, min_days: int =
 		pageSize = 10
 
 	if as_of_date is None:
-		as_of_date = date.today().isoformat()
+		as_of_date = date.today()
+	elif not isinstance(as_of_date, date):
+		as_of_date = date.fromisoformat(as_of_date)
 
-	TOTAL_CAP = 100
+	index = current_titles.snapshot()
+	# DATEDIFF(as_of_date, from_date) >= min_days 即 from_date <= as_of_date - min_days
+	total = index.started_by(as_of_date - timedelta(days=min_days))
 
-	# 先计算匹配的总数（不超过 TOTAL_CAP）
-	count_sql = """
-	SELECT COUNT(*) AS cnt FROM (
-	  SELECT emp_no, MAX(from_date) AS last_from
-	  FROM titles
-	  GROUP BY emp_no
-	  HAVING DATEDIFF(:as_of_date, MAX(from_date)) >= :min_days
-	) AS sub
-	"""
+	offset = (pageNo - 1) * pageSize
+	entries = [index.entry(i) for i in range(offset, min(offset + pageSize, total))]
+	if not entries:
+		return {"data": [], "page": pageNo, "page_size": pageSize, "total": total}
 
 	with engine.connect() as conn:
-		cnt_result = conn.execute(text(count_sql), {"as_of_date": as_of_date, "min_days": min_days})
-		cnt_row = cnt_result.fetchone()
-		total_matches = int(cnt_row[0]) if cnt_row is not None else 0
-		total = total_matches if total_matches <= TOTAL_CAP else TOTAL_CAP
-
-		# 计算 offset 与 limit，保证不超过 TOTAL_CAP
-		offset = (pageNo - 1) * pageSize
-		if offset >= total:
-			return {"data": [], "page": pageNo, "page_size": pageSize, "total": total}
-
-		remaining = total - offset
-		fetch_limit = pageSize if pageSize <= remaining else remaining
-
-		sql = """
-	SELECT t_latest.emp_no, e.first_name, e.last_name,
-	       t_latest.title AS current_title, t_latest.from_date AS title_start_date,
-	       DATEDIFF(:as_of_date, t_latest.from_date) AS days_in_role
-	FROM (
-	  SELECT t.emp_no, t.title, t.from_date
-	  FROM titles t
-	  WHERE (t.emp_no, t.from_date) IN (
-	    SELECT emp_no, MAX(from_date) FROM titles GROUP BY emp_no
-	  )
-	) AS t_latest
-	JOIN employees e ON e.emp_no = t_latest.emp_no
-	WHERE DATEDIFF(:as_of_date, t_latest.from_date) >= :min_days
-	ORDER BY days_in_role DESC
-	LIMIT :limit OFFSET :offset
-	"""
-
-		result = conn.execute(text(sql), {"as_of_date": as_of_date, "min_days": min_days, "limit": fetch_limit, "offset": offset})
-
-		if result.returns_rows:
-			data = result.mappings().all()
-			return {"data": data, "page": pageNo, "page_size": pageSize, "total": total}
-		else:
-			return {"rowcount": result.rowcount}
-
+		sql = text(names_sql).bindparams(bindparam('emp_nos', expanding=True))
+		result = conn.execute(sql, {"emp_nos": [emp_no for emp_no, title, start in entries]})
+		names = {row.emp_no: row for row in result}
+
+	data = [
+		{
+			"emp_no": emp_no,
+			"first_name": names[emp_no].first_name if emp_no in names else None,
+			"last_name": names[emp_no].last_name if emp_no in names else None,
+			"current_title": title,
+			"title_start_date": start,
+			"days_in_role": (as_of_date - start).days,
+		}
+		for emp_no, title, start in entries
+	]
+	return {"data": data, "page": pageNo, "page_size": pageSize, "total": total}
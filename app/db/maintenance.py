@@ -0,0 +1,63 @@
+from .employee_current import refresh_employee_current
+from .headcount_rollup import refresh_headcount_rollup, headcount_dates
+from .employee_profile_history import (
+    refresh_history_for_employees, refresh_history_for_managers, manager_intervals,
+    rename_history_departments, remove_history_departments
+)
+from .employee_transitions import refresh_transitions
+
+
+# 这些表的写入会影响员工当前状态快照
+EMPLOYEE_CURRENT_SOURCES = ('employees', 'dept_emp', 'salaries', 'titles')
+# 这些表的写入会影响人数变化汇总表
+HEADCOUNT_ROLLUP_SOURCES = ('employees', 'dept_emp')
+# 这些表的写入会影响员工履历表中相关员工的行
+PROFILE_HISTORY_SOURCES = ('employees', 'dept_emp', 'salaries', 'titles')
+# 这些表的写入会产生员工变动记录（部门调动、职称变化）
+TRANSITION_SOURCES = ('employees', 'dept_emp', 'titles')
+
+
+def capture_derived(conn, table: str, emp_nos=(), dept_nos=()):
+    """
+    Read what the derived tables need to know about rows a write is about to
+    change or delete (e.g. their old dates). Call it before such a write and
+    pass the result to sync_derived as `before`.
+
+    Inserts do not need it: everything they affect is visible after the write.
+    """
+    before = {}
+    if table in HEADCOUNT_ROLLUP_SOURCES:
+        before['headcount_dates'] = headcount_dates(conn, emp_nos)
+    if table == 'dept_manager':
+        before['manager_intervals'] = manager_intervals(conn, emp_nos, dept_nos)
+    return before
+
+
+def sync_derived(conn, table: str, emp_nos=(), before=None, dept_nos=()):
+    """
+    Keep derived tables in step with a write to `table`.
+
+    Call it on the same connection as the write, before committing,
+    so the base table and the derived tables change in one transaction.
+
+    Args:
+        conn: connection that performed the write
+        table: name of the base table that was written
+        emp_nos: employees touched by the write
+        before: result of capture_derived taken before an update or delete
+        dept_nos: departments touched by the write (dept_manager / departments)
+    """
+    before = before or {}
+    if table in EMPLOYEE_CURRENT_SOURCES:
+        refresh_employee_current(conn, emp_nos)
+    if table in HEADCOUNT_ROLLUP_SOURCES:
+        refresh_headcount_rollup(conn, emp_nos, before.get('headcount_dates', ()))
+    if table in PROFILE_HISTORY_SOURCES:
+        refresh_history_for_employees(conn, emp_nos)
+    if table in TRANSITION_SOURCES:
+        refresh_transitions(conn, emp_nos)
+    if table == 'dept_manager':
+        refresh_history_for_managers(conn, emp_nos, dept_nos, before.get('manager_intervals'))
+    if table == 'departments':
+        rename_history_departments(conn, dept_nos)
+        remove_history_departments(conn, dept_nos)
@@ -1,156 +1,446 @@
-from sqlalchemy import text
-from .init import engine
+import sys
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from sqlalchemy import text, bindparam
+from .snapshots import ReloadingSnapshot
+from app.core.metrics import Gauge
 from typing import Optional
 
+# 组织架构树：第 1 层为各部门的当前经理，第 2 层为该部门的其他当前员工（上级为部门经理）。
+# 启动时从数据库载入内存，按部门存成按 emp_no 排序的紧凑数组；分页、子树和部门人数都直接在内存中计算。
+# 相关表有写入时在后台线程只更新写入的员工 / 部门所在的部门（其他部门与旧快照共用），
+# 写入没有给出行时整体重新载入；更新完成前继续使用旧的快照。
+
+# 依赖的基础表：写入这些表后更新
+ORG_TREE_SOURCES = ('dept_manager', 'dept_emp', 'departments', 'employees', 'titles')
+
+# 以下查询的 {where} 用于只读取部分员工 / 部门（增量更新），整体载入时为空
+_org_tree_departments_sql = """
+    SELECT dept_no, dept_name
+    FROM departments
+    {where}
+    ORDER BY dept_no
+    """
+
+_org_tree_managers_sql = """
+    SELECT
+        dm.dept_no,
+        dm.emp_no,
+        e.first_name,
+        e.last_name,
+        t.title
+    FROM dept_manager dm
+    JOIN employees e ON dm.emp_no = e.emp_no
+    LEFT JOIN titles t ON dm.emp_no = t.emp_no AND t.to_date = '9999-01-01'
+    WHERE dm.to_date = '9999-01-01' {where}
+    ORDER BY dm.dept_no, dm.emp_no
+    """
+
+_org_tree_members_sql = """
+    SELECT
+        de.dept_no,
+        de.emp_no,
+        e.first_name,
+        e.last_name,
+        t.title
+    FROM dept_emp de
+    JOIN employees e ON de.emp_no = e.emp_no
+    LEFT JOIN titles t ON de.emp_no = t.emp_no AND t.to_date = '9999-01-01'
+    WHERE de.to_date = '9999-01-01' {where}
+    ORDER BY de.dept_no, de.emp_no
+    """
+
+org_tree_departments_sql = _org_tree_departments_sql.format(where='')
+org_tree_managers_sql = _org_tree_managers_sql.format(where='')
+org_tree_members_sql = _org_tree_members_sql.format(where='')
+
+
+def _filtered(sql: str, where: str):
+    return text(sql.format(where=where)).bindparams(
+        *(bindparam(name, expanding=True) for name in ('emp_nos', 'dept_nos') if f':{name}' in where))
+
+
+def _intern(value):
+    # 姓名、职称重复很多，共用同一个字符串对象
+    return None if value is None else sys.intern(value)
+
+
+class OrgDepartment:
+    """
+    One department of the tree: its current managers and its current employees
+    as parallel arrays sorted by emp_no.
+
+    Level-2 rows are ordered by employee, then manager; `row_starts[i]` is the
+    index of the first row of employee i among them (an employee who is also a
+    manager of the department has no row under their own name).
+    """
+
+    __slots__ = ('dept_no', 'dept_name', 'managers', 'manager_emp_nos',
+                 'emp_nos', 'first_names', 'last_names', 'titles', 'row_starts')
+
+    def __init__(self, dept_no: str, dept_name: str):
+        self.dept_no = dept_no
+        self.dept_name = dept_name
+        self.managers = []          # (emp_no, first_name, last_name, title)，按 emp_no 排序
+        self.manager_emp_nos = ()
+        self.emp_nos = array('i')
+        self.first_names = []
+        self.last_names = []
+        self.titles = []
+        self.row_starts = array('q', [0])
+
+    def seal(self):
+        """
+        Compute the row offsets once all employees are added.
+        """
+        self.manager_emp_nos = tuple(manager[0] for manager in self.managers)
+        count = len(self.manager_emp_nos)
+        size = len(self.emp_nos)
+        if not count:
+            self.row_starts = array('q', [0]) * (size + 1)
+            return
+        # 员工 i 之前每人 count 行，减去排在其前面的经理本人（没有自己名下的行）：
+        # 相邻两个经理位置之间的起点是等差数列，整段生成
+        skips = sorted(i for i in map(self.find, set(self.manager_emp_nos)) if i >= 0)
+        starts = array('q')
+        lo = 0
+        for r, hi in enumerate(skips + [size]):
+            starts.extend(range(lo * count - r, hi * count - r + 1, count))
+            lo = hi + 1
+        self.row_starts = starts
+
+    def copy(self, dept_name: Optional[str] = None) -> 'OrgDepartment':
+        """
+        Unsealed copy of the department (optionally renamed) for an update.
+        """
+        department = OrgDepartment(self.dept_no, self.dept_name if dept_name is None else dept_name)
+        department.managers = list(self.managers)
+        department.emp_nos = array('i', self.emp_nos)
+        department.first_names = list(self.first_names)
+        department.last_names = list(self.last_names)
+        department.titles = list(self.titles)
+        return department
+
+    def add(self, emp_no: int, first_name, last_name, title):
+        """
+        Insert an employee in emp_no order (kept as is when already present).
+        """
+        i = bisect_left(self.emp_nos, emp_no)
+        if i < len(self.emp_nos) and self.emp_nos[i] == emp_no:
+            return
+        self.emp_nos.insert(i, emp_no)
+        self.first_names.insert(i, _intern(first_name))
+        self.last_names.insert(i, _intern(last_name))
+        self.titles.insert(i, _intern(title))
+
+    def discard(self, emp_no: int):
+        """
+        Remove an employee if present.
+        """
+        i = self.find(emp_no)
+        if i >= 0:
+            del self.emp_nos[i], self.first_names[i], self.last_names[i], self.titles[i]
+
+    @property
+    def rows(self) -> int:
+        # 没有当前经理的部门不出现在树中
+        return len(self.managers) + self.row_starts[-1] if self.managers else 0
+
+    def manager_row(self, i: int):
+        emp_no, first_name, last_name, title = self.managers[i]
+        return {
+            "emp_no": emp_no,
+            "first_name": first_name,
+            "last_name": last_name,
+            "title": title,
+            "dept_no": self.dept_no,
+            "dept_name": self.dept_name,
+            "manager_emp_no": None,
+            "role_type": "Manager",
+            "level": 1,
+            "path": f"{self.dept_no}-{emp_no}",
+        }
+
+    def member_row(self, i: int, manager_emp_no: int):
+        emp_no = self.emp_nos[i]
+        return {
+            "emp_no": emp_no,
+            "first_name": self.first_names[i],
+            "last_name": self.last_names[i],
+            "title": self.titles[i],
+            "dept_no": self.dept_no,
+            "dept_name": self.dept_name,
+            "manager_emp_no": manager_emp_no,
+            "role_type": "Employee",
+            "level": 2,
+            "path": f"{self.dept_no}-{manager_emp_no}-{emp_no}",
+        }
+
+    def row(self, k: int):
+        """
+        k-th row of the department in (level, emp_no) order.
+        """
+        if k < len(self.managers):
+            return self.manager_row(k)
+        k -= len(self.managers)
+        i = bisect_right(self.row_starts, k) - 1
+        emp_no = self.emp_nos[i]
+        managers = [m for m in self.manager_emp_nos if m != emp_no]
+        return self.member_row(i, managers[k - self.row_starts[i]])
+
+    def find(self, emp_no: int) -> int:
+        """
+        Index of `emp_no` among the department's employees, or -1.
+        """
+        i = bisect_left(self.emp_nos, emp_no)
+        return i if i < len(self.emp_nos) and self.emp_nos[i] == emp_no else -1
+
+
+class OrgSnapshot:
+    """
+    Immutable org tree loaded at one point in time. Departments are in dept_no
+    order; `starts[d]` is the index of the first row of department d in the full chart.
+    """
+
+    def __init__(self, departments):
+        self.departments = departments
+        self.by_dept_no = {department.dept_no: department for department in departments}
+        self.starts = array('q', [0])
+        for department in departments:
+            self.starts.append(self.starts[-1] + department.rows)
+        self.managed = {}           # 经理 emp_no -> 其管理的部门
+        for department in departments:
+            for emp_no in department.manager_emp_nos:
+                self.managed.setdefault(emp_no, []).append(department)
+        self.employees = sum(len(department.emp_nos) for department in departments)
+        self.loaded_at = time.time()
+
+    @property
+    def rows(self) -> int:
+        return self.starts[-1]
+
+
+def load_org_snapshot(conn) -> OrgSnapshot:
+    """
+    Read the current managers and department members into a new snapshot.
+    """
+    departments = {
+        row.dept_no: OrgDepartment(row.dept_no, row.dept_name)
+        for row in conn.execute(text(org_tree_departments_sql))
+    }
+    for dept_no, emp_no, first_name, last_name, title in conn.execute(text(org_tree_managers_sql)):
+        department = departments.get(dept_no)
+        if department is not None and not (department.managers and department.managers[-1][0] == emp_no):
+            department.managers.append((emp_no, _intern(first_name), _intern(last_name), _intern(title)))
+
+    # 员工数量大，流式读取，逐行追加到对应部门的数组
+    members = conn.execution_options(stream_results=True).execute(text(org_tree_members_sql))
+    for dept_no, emp_no, first_name, last_name, title in members:
+        department = departments.get(dept_no)
+        if department is None:
+            continue
+        # 同一员工有多个当前职称时只保留一行
+        if department.emp_nos and department.emp_nos[-1] == emp_no:
+            continue
+        department.emp_nos.append(emp_no)
+        department.first_names.append(_intern(first_name))
+        department.last_names.append(_intern(last_name))
+        department.titles.append(_intern(title))
+
+    for department in departments.values():
+        department.seal()
+    return OrgSnapshot(sorted(departments.values(), key=lambda department: department.dept_no))
+
+
+def update_org_snapshot(conn, snapshot: OrgSnapshot, emp_nos, dept_nos) -> OrgSnapshot:
+    """
+    New snapshot with the given employees and departments re-read. Only the
+    departments they are or were part of are copied and changed; the others
+    are shared with `snapshot`, which is left as it is.
+    """
+    params = {"emp_nos": sorted(emp_nos), "dept_nos": sorted(dept_nos)}
+    names = {
+        row.dept_no: row.dept_name
+        for row in conn.execute(_filtered(_org_tree_departments_sql, 'WHERE dept_no IN :dept_nos'), params)
+    }
+    managers = conn.execute(
+        _filtered(_org_tree_managers_sql, 'AND (dm.emp_no IN :emp_nos OR dm.dept_no IN :dept_nos)'), params).all()
+    members = conn.execute(_filtered(_org_tree_members_sql, 'AND de.emp_no IN :emp_nos'), params).all()
+
+    # 受影响的部门：写入的部门，以及这些员工原来、现在所在或管理的部门
+    affected = set(dept_nos)
+    affected.update(row.dept_no for row in managers)
+    affected.update(row.dept_no for row in members)
+    for department in snapshot.departments:
+        if not emp_nos.isdisjoint(department.manager_emp_nos) \
+                or any(department.find(emp_no) >= 0 for emp_no in emp_nos):
+            affected.add(department.dept_no)
+
+    departments = dict(snapshot.by_dept_no)
+    for dept_no in affected:
+        old = snapshot.by_dept_no.get(dept_no)
+        if dept_no in dept_nos:
+            # 部门本身有写入：名称以数据库为准，已删除的部门移出，经理全部重新读取
+            if dept_no not in names:
+                departments.pop(dept_no, None)
+                continue
+            department = old.copy(names[dept_no]) if old is not None else OrgDepartment(dept_no, names[dept_no])
+            department.managers = []
+        elif old is None:
+            continue
+        else:
+            department = old.copy()
+            department.managers = [manager for manager in department.managers if manager[0] not in emp_nos]
+
+        for row in managers:
+            if row.dept_no == dept_no and all(manager[0] != row.emp_no for manager in department.managers):
+                department.managers.append(
+                    (row.emp_no, _intern(row.first_name), _intern(row.last_name), _intern(row.title)))
+        department.managers.sort(key=lambda manager: manager[0])
+
+        for emp_no in emp_nos:
+            department.discard(emp_no)
+        for row in members:
+            if row.dept_no == dept_no:
+                department.add(row.emp_no, row.first_name, row.last_name, row.title)
+        department.seal()
+        departments[dept_no] = department
+
+    return OrgSnapshot(sorted(departments.values(), key=lambda department: department.dept_no))
+
+
+class OrgTree(ReloadingSnapshot):
+    """
+    Holder of the current org snapshot, updated after writes to ORG_TREE_SOURCES.
+    """
+
+    name = 'Org tree'
+
+    def load(self, conn) -> OrgSnapshot:
+        return load_org_snapshot(conn)
+
+    def update(self, conn, snapshot: OrgSnapshot, emp_nos, dept_nos) -> OrgSnapshot:
+        return update_org_snapshot(conn, snapshot, emp_nos, dept_nos)
+
+    def describe(self, snapshot: OrgSnapshot) -> str:
+        return f"{snapshot.employees} employees, {snapshot.rows} rows"
+
+
+org_tree = OrgTree(ORG_TREE_SOURCES)
+
+Gauge('org_tree_employees', 'Current employees in the in-memory org tree.',
+      function=lambda: org_tree.current.employees if org_tree.loaded else 0)
+Gauge('org_tree_age_seconds', 'Seconds since the in-memory org tree was loaded or updated.',
+      function=lambda: time.time() - org_tree.current.loaded_at if org_tree.loaded else 0)
+
+
+def _page(total: int, limit: int, page: int):
+    return {
+        "total_count": total,
+        "page": page,
+        "page_size": limit,
+        "total_pages": (total + limit - 1) // limit if total > 0 else 0,
+    }
+
 
 def db_get_organizational_chart(dept_no: Optional[str] = None, limit: int = 100, page: int = 1):
     """
-    Build organizational chart using recursive CTE with pagination
-    
+    Page of the organizational chart, served from the in-memory org tree
+
     Parameters:
         dept_no: Department number (None means all departments)
         limit: Number of records per page (default 100)
         page: Page number, starting from 1 (default 1)
-    
+
     Returns:
         Dictionary containing:
-        - data: List containing hierarchical structure of departments, managers and employees
+        - data: Managers (level 1) and their employees (level 2), ordered by department, level, emp_no
         - total_count: Total number of matching records
         - page: Current page number
         - page_size: Records per page
         - total_pages: Total number of pages
     """
-    
-    # Calucate OFFSET
+    snapshot = org_tree.snapshot()
+    if dept_no is None:
+        departments, starts = snapshot.departments, snapshot.starts
+    else:
+        department = snapshot.by_dept_no.get(dept_no)
+        departments = [department] if department is not None else []
+        starts = array('q', [0, department.rows if department is not None else 0])
+
+    total = starts[-1]
     offset = (page - 1) * limit
-    
-    # SQL for total count
-    count_sql = """
-    WITH RECURSIVE org_tree AS (
-        -- Base case (Level 1): Department managers
-        SELECT 
-            dm.emp_no,
-            d.dept_no,
-            1 AS level
-        FROM dept_manager dm
-        JOIN departments d ON dm.dept_no = d.dept_no
-        WHERE dm.to_date = '9999-01-01'
-            AND (:dept_no IS NULL OR d.dept_no = :dept_no)
-        
-        UNION ALL
-        
-        -- Recursive case (Level 2): Employees
-        SELECT 
-            de.emp_no,
-            ot.dept_no,
-            ot.level + 1 AS level
-        FROM org_tree ot
-        JOIN dept_emp de ON ot.dept_no = de.dept_no
-        WHERE de.to_date = '9999-01-01'
-            AND de.emp_no != ot.emp_no
-            AND ot.level = 1
-    )
-    SELECT COUNT(*) AS total
-    FROM org_tree
-    """
-    
-    # Order by department, then hierarchy level, then employee number for optimal indexed performance
-    data_sql = """
-    WITH RECURSIVE org_tree AS (
-        -- Base case (Level 1): Department managers who have no superiors in this database
-        SELECT 
-            dm.emp_no,
-            e.first_name,
-            e.last_name,
-            t.title,
-            d.dept_no,
-            d.dept_name,
-            CAST(NULL AS UNSIGNED) AS manager_emp_no,
-            CAST('Manager' AS CHAR(20)) AS role_type,
-            1 AS level,
-            CAST(CONCAT(d.dept_no, '-', dm.emp_no) AS CHAR(500)) AS path
-        FROM dept_manager dm
-        JOIN departments d ON dm.dept_no = d.dept_no
-        JOIN employees e ON dm.emp_no = e.emp_no
-        LEFT JOIN titles t ON dm.emp_no = t.emp_no AND t.to_date IS NULL
-        WHERE dm.to_date = '9999-01-01'
-            AND (:dept_no IS NULL OR d.dept_no = :dept_no)
-        
-        UNION ALL
-        
-        -- Recursive case (Level 2): Find subordinates from the previous level (department managers)
-        SELECT 
-            de.emp_no,
-            e.first_name,
-            e.last_name,
-            t.title,
-            ot.dept_no,
-            ot.dept_name,
-            ot.emp_no AS manager_emp_no,
-            CAST('Employee' AS CHAR(20)) AS role_type,
-            ot.level + 1 AS level,
-            CAST(CONCAT(ot.path, '-', de.emp_no) AS CHAR(500)) AS path
-        FROM org_tree ot
-        JOIN dept_emp de ON ot.dept_no = de.dept_no
-        JOIN employees e ON de.emp_no = e.emp_no
-        LEFT JOIN titles t ON de.emp_no = t.emp_no AND t.to_date IS NULL
-        WHERE de.to_date = '9999-01-01'
-            AND de.emp_no != ot.emp_no
-            AND ot.level = 1
-            AND ot.path NOT LIKE CONCAT('%', de.emp_no, '%')
-    )
-    SELECT 
-        emp_no,
-        first_name,
-        last_name,
-        title,
-        dept_no,
-        dept_name,
-        manager_emp_no,
-        role_type,
-        level,
-        path
-    FROM org_tree
-    ORDER BY dept_no, level, emp_no
-    LIMIT :limit OFFSET :offset
-    """
-    
-    with engine.connect() as conn:
-        # Get total count
-        count_result = conn.execute(
-            text(count_sql),
-            {"dept_no": dept_no}
-        )
-        total_count = count_result.scalar() or 0
-        
-        # Calculate total pages
-        total_pages = (total_count + limit - 1) // limit if total_count > 0 else 0
-        
-        # Get data
-        data_result = conn.execute(
-            text(data_sql),
-            {
-                "dept_no": dept_no,
-                "limit": limit,
-                "offset": offset
-            }
-        )
-        
-        if data_result.returns_rows:
-            rows = data_result.mappings().all()
-            return {
-                "data": [dict(row) for row in rows],
-                "total_count": total_count,
-                "page": page,
-                "page_size": limit,
-                "total_pages": total_pages
-            }
-        else:
-            return {
-                "data": [],
-                "total_count": 0,
-                "page": page,
-                "page_size": limit,
-                "total_pages": 0
+    data = []
+    d = bisect_right(starts, offset) - 1
+    for k in range(offset, min(offset + limit, total)):
+        while k >= starts[d + 1]:
+            d += 1
+        data.append(departments[d].row(k - starts[d]))
+    return {"data": data, **_page(total, limit, page)}
+
+
+def db_get_org_subtree(emp_no: int, limit: int = 100, page: int = 1):
+    """
+    Position of an employee in the org tree and a page of their direct reports
 
+    Returns:
+        Dictionary containing:
+        - nodes: the employee's rows in the chart (as manager and / or as employee)
+        - data: page of direct reports (only managers have any), ordered by department, emp_no
+        - total_count, page, page_size, total_pages: pagination of the reports
+        None when the employee is not in the tree
+    """
+    snapshot = org_tree.snapshot()
+    nodes = []
+    managed = snapshot.managed.get(emp_no, [])
+    for department in managed:
+        nodes.append(department.manager_row(department.manager_emp_nos.index(emp_no)))
+    for department in snapshot.departments:
+        i = department.find(emp_no)
+        if i >= 0 and department.managers:
+            nodes.extend(department.member_row(i, m) for m in department.manager_emp_nos if m != emp_no)
+    if not nodes:
+        return None
+
+    # 下属 = 所管理部门中除自己以外的员工
+    sizes = [len(department.emp_nos) - (department.find(emp_no) >= 0) for department in managed]
+    total = sum(sizes)
+    offset = (page - 1) * limit
+    data = []
+    for department, size in zip(managed, sizes):
+        if offset >= size:
+            offset -= size
+            continue
+        own = department.find(emp_no)
+        i = offset + (0 <= own <= offset)
+        while i < len(department.emp_nos) and len(data) < limit:
+            if i != own:
+                data.append(department.member_row(i, emp_no))
+            i += 1
+        offset = 0
+        if len(data) >= limit:
+            break
+    return {"emp_no": emp_no, "nodes": nodes, "data": data, **_page(total, limit, page)}
+
+
+def db_get_org_department_counts():
+    """
+    Per-department summary of the org tree: current managers, employees and chart rows.
+    """
+    snapshot = org_tree.snapshot()
+    return {
+        "loaded_at": snapshot.loaded_at,
+        "total_employees": snapshot.employees,
+        "total_rows": snapshot.rows,
+        "data": [
+            {
+                "dept_no": department.dept_no,
+                "dept_name": department.dept_name,
+                "manager_emp_nos": list(department.manager_emp_nos),
+                "employees": len(department.emp_nos),
+                "rows": department.rows,
             }
+            for department in snapshot.departments
+        ],
+    }
@@ -0,0 +1,72 @@
+import base64
+import json
+from datetime import date, datetime
+from fastapi import HTTPException
+
+
+# 键集（seek）分页工具：游标里保存上一页最后一行的主键值，
+# 下一页直接从索引上该位置之后开始扫描，不再 OFFSET 丢弃前面的行
+
+
+def encode_cursor(values) -> str:
+    """
+    Encode the key values of the last row into an opaque, URL-safe cursor.
+    """
+    plain = [v.isoformat() if isinstance(v, (date, datetime)) else v for v in values]
+    raw = json.dumps(plain, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str, size: int):
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Returns:
+        list: key values, or None for an empty cursor (first page)
+
+    Raises:
+        HTTPException: 400 when the cursor is malformed
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, UnicodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def keyset_where(columns, values, prefix: str = 'cursor_'):
+    """
+    Build the predicate "(c1, c2, ...) > (v1, v2, ...)".
+
+    It is expanded to `c1 >= :v1 AND (c1 > :v1 OR (...))` so that MySQL
+    can turn the leading column into an index range scan.
+
+    Returns:
+        (sql, params)
+    """
+    params = {f'{prefix}{i}': value for i, value in enumerate(values)}
+
+    sql = f'{columns[-1]} > :{prefix}{len(columns) - 1}'
+    for i in range(len(columns) - 2, -1, -1):
+        sql = f'{columns[i]} >= :{prefix}{i} AND ({columns[i]} > :{prefix}{i} OR ({sql}))'
+    return f'({sql})', params
+
+
+def next_page(rows, fields, page_size: int):
+    """
+    Cut the page out of `page_size + 1` fetched rows and build the next cursor.
+
+    Returns:
+        dict: {"data": [...], "next_cursor": str | None}
+    """
+    data = rows[:page_size]
+    next_cursor = None
+    if len(rows) > page_size and data:
+        last = data[-1]
+        next_cursor = encode_cursor([last[f] for f in fields])
+    return {"data": data, "next_cursor": next_cursor}
@@ -0,0 +1,384 @@
+import hashlib
+import json
+import os
+import re
+from sqlalchemy import text
+from .init import engine, exec_engine
+from .executor import check_readonly_sql, EXEC_MAX_EXECUTION_MS, _json_default
+from . import transitions, org_chart, employee, retirement, current_titles
+
+
+# 执行计划：/exec/explain 返回任意只读语句的 EXPLAIN FORMAT=JSON / EXPLAIN ANALYZE 结果和语句摘要；
+# 应用中的重点查询（APP_QUERIES）的计划按部署记录到 query_plans 表，
+# 不同部署之间可以比较，例如 dept_emp 丢失索引后访问方式从 ref 变成 ALL。
+
+# 部署标识：记录计划时写入，用于跨部署比较
+DEPLOYMENT_ID = os.getenv('DEPLOYMENT_ID', 'local')
+
+# 可以 EXPLAIN 的语句类型
+EXPLAINABLE_STATEMENTS = ('SELECT', 'WITH', 'TABLE', 'VALUES')
+
+# 应用查询名 -> (SQL, 具有代表性的参数)
+APP_QUERIES = {
+    'employee.emp_list': (employee.emp_list_sql, {
+        'emp_no_min': None, 'emp_no_max': None, 'last_name': None, 'first_name': None, 'gender': None,
+        'birth_date_min': None, 'birth_date_max': None, 'hire_date_min': None, 'hire_date_max': None,
+        'salary_min': None, 'salary_max': None, 'dept_name': None, 'title': None, 'after_emp_no': None,
+        'pageSize': 10, 'offset': 0,
+    }),
+    'transitions.dept': (transitions.dept_transitions_sql, {
+        'start_date': '2001-10-01', 'end_date': '2001-12-31', 'limit': 10, 'offset': 0,
+    }),
+    'transitions.title': (transitions.title_transitions_sql, {
+        'start_date': '2001-10-01', 'end_date': '9999-12-31', 'limit': 10, 'offset': 0,
+    }),
+    'transitions.count': (transitions.count_transitions_sql, {
+        'kind': 'dept', 'start_date': '2001-10-01', 'end_date': '2001-12-31',
+    }),
+    'retirement.candidates': (retirement.candidates_sql, {
+        'born_before': '1962-01-01', 'dept_no': None, 'limit': 10, 'offset': 0,
+    }),
+    'retirement.counts': (retirement.candidate_counts_sql, {'born_before': '1962-01-01'}),
+    'org_chart.tree_managers': (org_chart.org_tree_managers_sql, {}),
+    'org_chart.tree_members': (org_chart.org_tree_members_sql, {}),
+    'current_titles.load': (current_titles.current_titles_sql, {}),
+}
+
+create_table_sql = """
+CREATE TABLE IF NOT EXISTS query_plans (
+    id            INT AUTO_INCREMENT PRIMARY KEY,
+    query_name    VARCHAR(64)  NOT NULL,
+    deployment    VARCHAR(64)  NOT NULL,
+    query_digest  CHAR(64)     NOT NULL,
+    plan_digest   CHAR(64)     NOT NULL,
+    summary       JSON         NOT NULL,
+    plan          JSON         NOT NULL,
+    captured_at   DATETIME     NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    KEY idx_query_plans_name (query_name, captured_at)
+)
+"""
+
+# 访问方式从好到差（MySQL EXPLAIN 的 access_type）
+ACCESS_TYPE_RANK = {
+    'system': 0, 'const': 0, 'eq_ref': 1, 'ref': 2, 'fulltext': 3, 'ref_or_null': 3,
+    'unique_subquery': 4, 'index_subquery': 4, 'index_merge': 5, 'range': 6, 'index': 7, 'ALL': 8,
+}
+
+_normalize_patterns = [
+    (re.compile(r"'(?:[^'\\]|\\.|'')*'"), '?'),          # 字符串常量
+    (re.compile(r'"(?:[^"\\]|\\.)*"'), '?'),
+    (re.compile(r'/\*.*?\*/', re.S), ' '),                # 注释
+    (re.compile(r'(?:--|#)[^\n]*'), ' '),
+    (re.compile(r'(?<![\w:]):\w+'), '?'),                 # 绑定参数 :name
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),              # 数字常量
+    (re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)'), '(...)'),  # IN (?, ?, ...)
+    (re.compile(r'\s+'), ' '),
+    (re.compile(r' ?([=<>!,]) ?'), r'\1'),               # 运算符两侧的空白
+    (re.compile(r'\( | \)'), lambda m: m.group(0).strip()),
+]
+
+
+def normalize_statement(sql: str) -> str:
+    """
+    Normalized text of a statement: literals and bind parameters replaced by '?',
+    comments and redundant whitespace removed, lower case.
+    """
+    statement = sql.strip().rstrip(';')
+    for pattern, replacement in _normalize_patterns:
+        statement = pattern.sub(replacement, statement)
+    return statement.strip().lower()
+
+
+def statement_digest(sql: str) -> str:
+    """
+    SHA-256 digest of the normalized statement; equal for statements that differ only in literal values.
+    """
+    return hashlib.sha256(normalize_statement(sql).encode('utf-8')).hexdigest()
+
+
+def _walk(node, tables, operations):
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key == 'table' and isinstance(value, dict) and 'table_name' in value:
+                tables.append({
+                    'table': value['table_name'],
+                    'access_type': value.get('access_type'),
+                    'key': value.get('key'),
+                    'rows': value.get('rows_examined_per_scan'),
+                    'using_index': bool(value.get('using_index')),
+                })
+            elif key in ('using_filesort', 'using_temporary_table') and value is True:
+                operations.append(key)
+            _walk(value, tables, operations)
+    elif isinstance(node, list):
+        for item in node:
+            _walk(item, tables, operations)
+
+
+def plan_summary(plan: dict) -> dict:
+    """
+    Access path of an EXPLAIN FORMAT=JSON plan: each table in plan order with its
+    access type, chosen index and estimated rows, plus filesort / temporary table use.
+    """
+    tables, operations = [], []
+    _walk(plan, tables, operations)
+    return {'tables': tables, 'operations': sorted(set(operations))}
+
+
+def plan_digest(summary: dict) -> str:
+    """
+    Digest of the access path only (tables, access types, indexes, filesort / temporary),
+    so that row estimates and costs changing with the data do not count as a new plan.
+    """
+    shape = [[t['table'], t['access_type'], t['key'], t['using_index']] for t in summary['tables']]
+    shape.append(summary['operations'])
+    return hashlib.sha256(json.dumps(shape).encode('utf-8')).hexdigest()
+
+
+def _explain(conn, statement: str, params: dict, analyze: bool):
+    if analyze:
+        # EXPLAIN ANALYZE 会真正执行语句，输出树形文本（含实际行数和耗时）
+        return conn.execute(text('EXPLAIN ANALYZE ' + statement), params).scalar()
+    return json.loads(conn.execute(text('EXPLAIN FORMAT=JSON ' + statement), params).scalar())
+
+
+def db_explain(sql: str, analyze: bool = False, timeout_ms: int = None, params: dict = None):
+    """
+    EXPLAIN one read statement on the read-only exec pool.
+
+    Args:
+        sql: single SELECT / WITH statement
+        analyze: run EXPLAIN ANALYZE (executes the statement) instead of EXPLAIN FORMAT=JSON
+        timeout_ms: MAX_EXECUTION_TIME for EXPLAIN ANALYZE (default and upper bound EXEC_MAX_EXECUTION_MS)
+        params: bind parameters for :name placeholders
+
+    Returns:
+        {"digest", "normalized", "format", "plan", "summary", "plan_digest"};
+        summary / plan_digest only for FORMAT=JSON
+
+    Raises:
+        ValueError: the statement cannot be explained
+    """
+    statement = check_readonly_sql(sql)
+    keyword = statement.lstrip('(').split(None, 1)[0].upper()
+    if keyword not in EXPLAINABLE_STATEMENTS:
+        raise ValueError(f"Statement type {keyword} cannot be explained")
+    timeout_ms = min(timeout_ms or EXEC_MAX_EXECUTION_MS, EXEC_MAX_EXECUTION_MS)
+
+    with exec_engine.connect() as conn:
+        conn.exec_driver_sql(f'SET SESSION max_execution_time = {int(timeout_ms)}')
+        conn.exec_driver_sql('START TRANSACTION READ ONLY')
+        plan = _explain(conn, statement, params or {}, analyze)
+        conn.rollback()
+
+    result = {
+        'digest': statement_digest(statement),
+        'normalized': normalize_statement(statement),
+        'format': 'analyze' if analyze else 'json',
+        'plan': plan,
+    }
+    if not analyze:
+        summary = plan_summary(plan)
+        result['summary'] = summary
+        result['plan_digest'] = plan_digest(summary)
+    return result
+
+
+def create_query_plans_table():
+    with engine.begin() as conn:
+        conn.execute(text(create_table_sql))
+
+
+def capture_plans(names=None, deployment: str = None):
+    """
+    EXPLAIN the named app queries and record their plans for `deployment`.
+
+    Args:
+        names: APP_QUERIES keys (default: all)
+        deployment: deployment label (default DEPLOYMENT_ID)
+
+    Returns:
+        list of {"name", "query_digest", "plan_digest", "changed"}; `changed` compares
+        with the previous capture of the same query (None for the first one)
+
+    Raises:
+        KeyError: unknown query name
+    """
+    deployment = deployment or DEPLOYMENT_ID
+    names = list(names) if names else list(APP_QUERIES)
+    unknown = [name for name in names if name not in APP_QUERIES]
+    if unknown:
+        raise KeyError(f"Unknown query: {', '.join(unknown)}")
+
+    captured = []
+    for name in names:
+        sql, params = APP_QUERIES[name]
+        explained = db_explain(sql, params=params)
+        captured.append((name, explained))
+
+    create_query_plans_table()
+    results = []
+    with engine.begin() as conn:
+        for name, explained in captured:
+            previous = conn.execute(
+                text("SELECT plan_digest FROM query_plans WHERE query_name = :name ORDER BY captured_at DESC, id DESC LIMIT 1"),
+                {'name': name},
+            ).scalar()
+            conn.execute(text("""
+                INSERT INTO query_plans (query_name, deployment, query_digest, plan_digest, summary, plan)
+                VALUES (:name, :deployment, :query_digest, :plan_digest, :summary, :plan)
+            """), {
+                'name': name,
+                'deployment': deployment,
+                'query_digest': explained['digest'],
+                'plan_digest': explained['plan_digest'],
+                'summary': json.dumps(explained['summary'], default=_json_default),
+                'plan': json.dumps(explained['plan'], default=_json_default),
+            })
+            results.append({
+                'name': name,
+                'query_digest': explained['digest'],
+                'plan_digest': explained['plan_digest'],
+                'changed': None if previous is None else previous != explained['plan_digest'],
+            })
+    return results
+
+
+def _load(value):
+    return json.loads(value) if isinstance(value, (str, bytes)) else value
+
+
+def _capture(conn, name: str, deployment: str = None, exclude_id: int = None, other_than: str = None):
+    sql = "SELECT id, deployment, query_digest, plan_digest, summary, captured_at FROM query_plans WHERE query_name = :name"
+    params = {'name': name}
+    if deployment is not None:
+        sql += " AND deployment = :deployment"
+        params['deployment'] = deployment
+    if exclude_id is not None:
+        sql += " AND id != :exclude_id"
+        params['exclude_id'] = exclude_id
+    if other_than is not None:
+        sql += " AND deployment != :other_than"
+        params['other_than'] = other_than
+    sql += " ORDER BY captured_at DESC, id DESC LIMIT 1"
+    row = conn.execute(text(sql), params).mappings().first()
+    if row is None:
+        return None
+    row = dict(row)
+    row['summary'] = _load(row['summary'])
+    return row
+
+
+def db_list_plans():
+    """
+    Latest recorded plan of every named app query.
+
+    Returns:
+        list of {"name", "deployment", "query_digest", "plan_digest", "captured_at"};
+        the fields other than name are None for queries never captured
+    """
+    create_query_plans_table()
+    with engine.connect() as conn:
+        rows = conn.execute(text("""
+            SELECT q.query_name, q.deployment, q.query_digest, q.plan_digest, q.captured_at
+            FROM query_plans q
+            JOIN (SELECT query_name, MAX(id) AS id FROM query_plans GROUP BY query_name) latest ON latest.id = q.id
+        """)).mappings().all()
+    latest = {row['query_name']: row for row in rows}
+    return [
+        {
+            'name': name,
+            'deployment': latest[name]['deployment'] if name in latest else None,
+            'query_digest': latest[name]['query_digest'] if name in latest else None,
+            'plan_digest': latest[name]['plan_digest'] if name in latest else None,
+            'captured_at': latest[name]['captured_at'] if name in latest else None,
+        }
+        for name in APP_QUERIES
+    ]
+
+
+def diff_summaries(base: dict, target: dict):
+    """
+    Compare two plan summaries table by table.
+
+    Returns:
+        (changes, regressions): every difference, and the ones that make the plan worse
+        (worse access type, index no longer used, new filesort / temporary table)
+    """
+    changes, regressions = [], []
+
+    def occurrences(summary):
+        seen = {}
+        keyed = {}
+        for table in summary['tables']:
+            index = seen[table['table']] = seen.get(table['table'], -1) + 1
+            keyed[(table['table'], index)] = table
+        return keyed
+
+    base_tables, target_tables = occurrences(base), occurrences(target)
+    for key in list(base_tables) + [k for k in target_tables if k not in base_tables]:
+        old, new = base_tables.get(key), target_tables.get(key)
+        if old is None or new is None:
+            changes.append({'table': key[0], 'change': 'added' if old is None else 'removed'})
+            continue
+        for field in ('access_type', 'key', 'using_index'):
+            if old[field] != new[field]:
+                change = {'table': key[0], 'change': field, 'from': old[field], 'to': new[field]}
+                changes.append(change)
+                worse = (
+                    (field == 'access_type'
+                     and ACCESS_TYPE_RANK.get(new[field], 9) > ACCESS_TYPE_RANK.get(old[field], 9))
+                    or (field == 'key' and old[field] is not None and new[field] is None)
+                    or (field == 'using_index' and old[field] and not new[field])
+                )
+                if worse:
+                    regressions.append(change)
+
+    for operation in sorted(set(target['operations']) - set(base['operations'])):
+        change = {'table': None, 'change': operation, 'from': False, 'to': True}
+        changes.append(change)
+        regressions.append(change)
+    for operation in sorted(set(base['operations']) - set(target['operations'])):
+        changes.append({'table': None, 'change': operation, 'from': True, 'to': False})
+    return changes, regressions
+
+
+def db_diff_plans(name: str, base: str = None, target: str = None):
+    """
+    Diff the recorded plans of one named app query between two deployments.
+
+    Args:
+        name: APP_QUERIES key
+        base: deployment to compare against (default: latest capture from another
+              deployment than target, or the capture before target)
+        target: deployment to check (default: latest capture)
+
+    Returns:
+        {"name", "base", "target", "changed", "changes", "regressions"} or None when
+        there are not two captures to compare
+    """
+    with engine.connect() as conn:
+        target_row = _capture(conn, name, deployment=target)
+        if target_row is None:
+            return None
+        if base is not None:
+            base_row = _capture(conn, name, deployment=base, exclude_id=target_row['id'])
+        else:
+            base_row = (_capture(conn, name, other_than=target_row['deployment'])
+                        or _capture(conn, name, exclude_id=target_row['id']))
+    if base_row is None:
+        return None
+
+    changes, regressions = diff_summaries(base_row['summary'], target_row['summary'])
+
+    def describe(row):
+        return {key: row[key] for key in ('deployment', 'query_digest', 'plan_digest', 'captured_at')}
+
+    return {
+        'name': name,
+        'base': describe(base_row),
+        'target': describe(target_row),
+        'changed': base_row['plan_digest'] != target_row['plan_digest'],
+        'changes': changes,
+        'regressions': regressions,
+    }
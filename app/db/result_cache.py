@@ -0,0 +1,212 @@
+import functools
+import inspect
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from app.core.metrics import Counter, Gauge
+from .signals import on_tables_changed
+
+
+# 只读查询函数的结果缓存：相同（规范化后的）参数在没有写入时返回相同结果。
+# - LRU + TTL 淘汰，总大小不超过内存预算
+# - 写接口提交后调用 tables_changed，依赖这些表的函数的缓存全部失效
+# - 命中 / 未命中 / 淘汰次数与占用大小见 /metrics（db_result_cache_*）
+RESULT_CACHE_ENABLED = os.getenv('RESULT_CACHE', '1') != '0'
+RESULT_CACHE_TTL = float(os.getenv('RESULT_CACHE_TTL', '300'))  # 秒
+RESULT_CACHE_MAX_BYTES = int(os.getenv('RESULT_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+
+cache_requests = Counter(
+    'db_result_cache_requests_total',
+    'Calls of cached db functions, by function and result (hit / miss).',
+    ('function', 'result'),
+)
+cache_evictions = Counter(
+    'db_result_cache_evictions_total',
+    'Cached results dropped, by function and reason (lru / ttl / invalidated).',
+    ('function', 'reason'),
+)
+
+
+def _sizeof(value, seen=None) -> int:
+    """
+    Approximate memory size of a result (containers and their items).
+    """
+    if seen is None:
+        seen = set()
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, Mapping):
+        size += sum(_sizeof(k, seen) + _sizeof(v, seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(_sizeof(item, seen) for item in value)
+    return size
+
+
+def normalize(value):
+    """
+    Hashable, order-independent form of an argument value (dicts sorted, lists as tuples).
+    """
+    if isinstance(value, Mapping):
+        return tuple(sorted((str(k), normalize(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(normalize(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted(normalize(item) for item in value))
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return value
+
+
+class ResultCache:
+    """
+    LRU cache of db function results with a TTL and a memory budget, shared by all
+    @cached functions. Entries of a function are dropped when one of its tables is written.
+    """
+
+    def __init__(self, max_bytes: int = RESULT_CACHE_MAX_BYTES, ttl: float = RESULT_CACHE_TTL):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.bytes = 0
+        self._entries = OrderedDict()   # key -> (value, size, expires_at)
+        self._keys = {}                 # function -> set of keys
+        self._tables = {}               # table -> set of functions
+        self._generations = {}          # function -> 失效次数，用于丢弃失效前开始计算的结果
+        self._lock = threading.Lock()
+
+    def register(self, function: str, tables):
+        with self._lock:
+            self._keys.setdefault(function, set())
+            self._generations.setdefault(function, 0)
+            for table in tables:
+                self._tables.setdefault(table, set()).add(function)
+        on_tables_changed(tables, self.invalidate_tables)
+
+    def generation(self, function: str) -> int:
+        return self._generations.get(function, 0)
+
+    def get(self, key):
+        """
+        (True, value) for a live entry, else (False, None).
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            value, size, expires_at = entry
+            if expires_at <= time.monotonic():
+                self._drop(key, 'ttl')
+                return False, None
+            self._entries.move_to_end(key)
+            return True, value
+
+    def put(self, key, value, generation: int, ttl: float = None):
+        function = key[0]
+        size = _sizeof(value)
+        # 单个结果超过预算的四分之一时不缓存，避免把其他结果全部挤掉
+        if size > self.max_bytes // 4:
+            return
+        with self._lock:
+            # 计算期间有写入：结果可能是旧数据，不缓存
+            if self._generations.get(function, 0) != generation:
+                return
+            if key in self._entries:
+                self._drop(key, None)
+            self._entries[key] = (value, size, time.monotonic() + (self.ttl if ttl is None else ttl))
+            self._keys.setdefault(function, set()).add(key)
+            self.bytes += size
+            while self.bytes > self.max_bytes and self._entries:
+                self._drop(next(iter(self._entries)), 'lru')
+
+    def _drop(self, key, reason):
+        value, size, expires_at = self._entries.pop(key)
+        self._keys[key[0]].discard(key)
+        self.bytes -= size
+        if reason:
+            cache_evictions.inc(function=key[0], reason=reason)
+
+    def invalidate_tables(self, tables):
+        """
+        Drop the results of every function that reads one of `tables` (signals listener).
+        """
+        with self._lock:
+            functions = set().union(*(self._tables.get(table, ()) for table in tables))
+            for function in functions:
+                self._generations[function] = self._generations.get(function, 0) + 1
+                for key in list(self._keys.get(function, ())):
+                    self._drop(key, 'invalidated')
+
+    def clear(self, function: str = None):
+        with self._lock:
+            keys = list(self._entries) if function is None else list(self._keys.get(function, ()))
+            for key in keys:
+                self._drop(key, None)
+
+    def stats(self):
+        """
+        {function: (entries, bytes)} of the live cache content.
+        """
+        with self._lock:
+            return {
+                function: (len(keys), sum(self._entries[key][1] for key in keys))
+                for function, keys in self._keys.items()
+            }
+
+
+result_cache = ResultCache()
+
+Gauge('db_result_cache_entries', 'Cached results, by function.', ('function',),
+      function=lambda: {(name,): entries for name, (entries, size) in result_cache.stats().items()})
+Gauge('db_result_cache_bytes', 'Approximate memory used by cached results, by function.', ('function',),
+      function=lambda: {(name,): size for name, (entries, size) in result_cache.stats().items()})
+Gauge('db_result_cache_max_bytes', 'Memory budget of the result cache (RESULT_CACHE_MAX_BYTES).',
+      function=lambda: result_cache.max_bytes)
+
+
+def cached(*tables, ttl: float = None):
+    """
+    Cache the results of a read-only db function until one of `tables` is written
+    (tables_changed), the entry expires or it is evicted by the memory budget.
+
+    The key is the function name plus its arguments bound to parameter names with
+    defaults applied, so f(1, None) and f(page=1) share an entry. Cached results are
+    shared between callers and must not be modified.
+
+    Args:
+        *tables: base tables the function reads, e.g. 'departments'
+        ttl: seconds an entry lives (default RESULT_CACHE_TTL)
+
+    The undecorated function is available as `func.uncached`.
+    """
+    def decorator(func):
+        name = f'{func.__module__.rsplit(".", 1)[-1]}.{func.__name__}'
+        signature = inspect.signature(func)
+        result_cache.register(name, tables)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not RESULT_CACHE_ENABLED:
+                return func(*args, **kwargs)
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = (name, normalize(bound.arguments))
+
+            hit, value = result_cache.get(key)
+            cache_requests.inc(function=name, result='hit' if hit else 'miss')
+            if hit:
+                return value
+            generation = result_cache.generation(name)
+            value = func(*args, **kwargs)
+            result_cache.put(key, value, generation, ttl)
+            return value
+
+        wrapper.uncached = func
+        wrapper.cache_clear = lambda: result_cache.clear(name)
+        return wrapper
+    return decorator
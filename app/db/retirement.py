@@ -1,106 +1,186 @@
 from sqlalchemy import text
 from .init import engine
+from .result_cache import cached
 from typing import Optional
 from datetime import date
 
 
-def db_get_retirement_candidates(dept_no: Optional[str] = None, retirement_age: int = 65, limit: int = 100, page: int = 1):
+# 退休候选人：读取 employee_current 快照表（每个员工一行，已包含当前部门和职称）。
+# 出生日期用范围条件 birth_date < :born_before（不再用 YEAR(birth_date)），
+# 可以走 (is_current, birth_date, emp_no, dept_no) / (dept_no, is_current, birth_date, emp_no) 索引按出生日期顺序直接取一页；
+# 总数来自按部门缓存的候选人数，不再每页 COUNT(DISTINCT) 一次。
+
+# Order by birth_date to prioritize employees closest to retirement age (oldest first);
+# emp_no breaks ties so that pages do not overlap or skip employees born on the same day
+candidates_sql = """
+    SELECT
+        ec.emp_no,
+        ec.first_name,
+        ec.last_name,
+        ec.birth_date,
+        ec.gender,
+        ec.hire_date,
+        ec.dept_no,
+        d.dept_name,
+        ec.title
+    FROM employee_current ec
+    JOIN departments d ON d.dept_no = ec.dept_no
+    WHERE ec.is_current = 1
+      AND ec.birth_date < :born_before
+      AND (:dept_no IS NULL OR ec.dept_no = :dept_no)
+    ORDER BY ec.birth_date ASC, ec.emp_no ASC
+    LIMIT :limit OFFSET :offset
+    """
+
+# 各部门的候选人数，只读 (is_current, birth_date, emp_no, dept_no) 索引
+candidate_counts_sql = """
+    SELECT dept_no, COUNT(*) AS total
+    FROM employee_current
+    WHERE is_current = 1
+      AND birth_date < :born_before
+    GROUP BY dept_no
+    """
+
+# 出生日期落在窗口内的在职员工，按部门和出生日期汇总（行数只与天数和部门数有关）
+projection_sql = """
+    SELECT ec.dept_no, d.dept_name, ec.birth_date, COUNT(*) AS total
+    FROM employee_current ec
+    JOIN departments d ON d.dept_no = ec.dept_no
+    WHERE ec.is_current = 1
+      AND ec.birth_date >= :born_from
+      AND ec.birth_date < :born_before
+      AND (:dept_no IS NULL OR ec.dept_no = :dept_no)
+    GROUP BY ec.dept_no, d.dept_name, ec.birth_date
+    """
+
+
+def _years_before(day: date, years: int) -> date:
+    # 2 月 29 日在非闰年退到 2 月 28 日
+    try:
+        return day.replace(year=day.year - years)
+    except ValueError:
+        return day.replace(year=day.year - years, day=28)
+
+
+def _months_after(day: date, months: int) -> date:
+    year, month = divmod(day.month - 1 + months, 12)
+    return date(day.year + year, month + 1, 1)
+
+
+def retirement_cutoff(retirement_age: int) -> date:
+    """
+    Birth date before which a current employee counts as a retirement candidate.
+    """
+    # 出生年份 <= 今年 - 退休年龄，即出生日期早于 (今年 - 退休年龄 + 1) 年 1 月 1 日
+    return date(date.today().year - retirement_age + 1, 1, 1)
+
+
+@cached('employees', 'dept_emp')
+def db_get_retirement_counts(born_before: date):
+    """
+    Number of current employees born before `born_before`, by department.
+
+    Returns:
+        {dept_no: count}
+    """
+    with engine.connect() as conn:
+        rows = conn.execute(text(candidate_counts_sql), {"born_before": born_before}).all()
+    return {dept_no: int(total) for dept_no, total in rows}
+
+
+# 截止日期由调用方按当天计算后传入，是缓存键的一部分，跨年后不会返回旧结果
+@cached('employees', 'dept_emp', 'departments', 'titles')
+def db_get_retirement_candidates(born_before: date, dept_no: Optional[str] = None, limit: int = 100, page: int = 1):
     """
     Identify employees nearing retirement age based on configurable retirement age.
     
     Parameters:
+        born_before: Candidates are born before this date, see retirement_cutoff()
         dept_no: Department number (None means all departments)
-        retirement_age: Retirement age threshold (default 65)
         limit: Number of records per page (default 100)
         page: Page number, starting from 1 (default 1)
     
     Returns:
         Dictionary containing:
-        - data: List of employees with birth year <= (current year - retirement_age) and currently employed
+        - data: List of currently employed employees born before born_before
         - total_count: Total number of matching records
         - page: Current page number
         - page_size: Records per page
         - total_pages: Total number of pages
     """
-    current_year = date.today().year
-    birth_year_threshold = current_year - retirement_age
-    
     # Calculate OFFSET
     offset = (page - 1) * limit
     
-    # SQL for total count
-    count_sql = """
-    SELECT COUNT(DISTINCT e.emp_no) AS total
-    FROM employees e
-    JOIN dept_emp d ON e.emp_no = d.emp_no
-    WHERE YEAR(e.birth_date) <= :birth_year_threshold
-      AND d.to_date = '9999-01-01'
-      AND (:dept_no IS NULL OR d.dept_no = :dept_no)
-    """
+    # Total count from the cached per-department counts
+    counts = db_get_retirement_counts(born_before)
+    total_count = counts.get(dept_no, 0) if dept_no is not None else sum(counts.values())
     
-    # Order by birth_date to prioritize employees closest to retirement age (oldest first)
-    data_sql = """
-    SELECT 
-        e.emp_no,
-        e.first_name,
-        e.last_name,
-        e.birth_date,
-        e.gender,
-        e.hire_date,
-        d.dept_no,
-        dp.dept_name,
-        t.title
-    FROM employees e
-    JOIN dept_emp d ON e.emp_no = d.emp_no
-    JOIN departments dp ON d.dept_no = dp.dept_no
-    LEFT JOIN titles t ON e.emp_no = t.emp_no AND t.to_date = '9999-01-01'
-    WHERE YEAR(e.birth_date) <= :birth_year_threshold
-      AND d.to_date = '9999-01-01'
-      AND (:dept_no IS NULL OR d.dept_no = :dept_no)
-    ORDER BY e.birth_date ASC
-    LIMIT :limit OFFSET :offset
-    """
+    # Calculate total pages
+    total_pages = (total_count + limit - 1) // limit if total_count > 0 else 0
+    
+    rows = []
+    # 超出末页时不再查询
+    if offset < total_count:
+        with engine.connect() as conn:
+            rows = conn.execute(
+                text(candidates_sql),
+                {
+                    "born_before": born_before,
+                    "dept_no": dept_no,
+                    "limit": limit,
+                    "offset": offset
+                }
+            ).mappings().all()
     
+    return {
+        "data": [dict(row) for row in rows],
+        "total_count": total_count,
+        "page": page,
+        "page_size": limit,
+        "total_pages": total_pages
+    }
+
+
+# 窗口起点由调用方传入，同样作为缓存键的一部分
+@cached('employees', 'dept_emp', 'departments')
+def db_get_retirement_projection(today: date, months: int = 12, retirement_age: int = 65, dept_no: Optional[str] = None):
+    """
+    Current employees who reach `retirement_age` within the next `months` months
+    (from today to the end of the month `months - 1` months from now), counted by
+    month and by department.
+
+    Returns:
+        Dictionary containing:
+        - from_date / to_date: projection window (to_date excluded)
+        - total: number of employees retiring in the window
+        - by_month: [{"month": "YYYY-MM", "count": n}], every month of the window
+        - by_department: [{"dept_no", "dept_name", "count"}], largest first
+    """
+    end = _months_after(today, months)
+
     with engine.connect() as conn:
-        # Get total count
-        count_result = conn.execute(
-            text(count_sql),
+        rows = conn.execute(
+            text(projection_sql),
             {
-                "birth_year_threshold": birth_year_threshold,
+                "born_from": _years_before(today, retirement_age),
+                "born_before": _years_before(end, retirement_age),
                 "dept_no": dept_no
             }
-        )
-        total_count = count_result.scalar() or 0
-        
-        # Calculate total pages
-        total_pages = (total_count + limit - 1) // limit if total_count > 0 else 0
-        
-        # Get data
-        data_result = conn.execute(
-            text(data_sql),
-            {
-                "birth_year_threshold": birth_year_threshold,
-                "dept_no": dept_no,
-                "limit": limit,
-                "offset": offset
-            }
-        )
-        
-        if data_result.returns_rows:
-            rows = data_result.mappings().all()
-            return {
-                "data": [dict(row) for row in rows],
-                "total_count": total_count,
-                "page": page,
-                "page_size": limit,
-                "total_pages": total_pages
-            }
-        else:
-            return {
-                "data": [],
-                "total_count": 0,
-                "page": page,
-                "page_size": limit,
-                "total_pages": 0
+        ).all()
 
-            }
+    by_month = {_months_after(today, n).strftime('%Y-%m'): 0 for n in range(months)}
+    by_department = {}
+    for row_dept_no, dept_name, birth_date, total in rows:
+        # 达到退休年龄的月份即 出生月份 + retirement_age 年
+        year, month = str(birth_date)[:7].split('-')
+        by_month[f'{int(year) + retirement_age:04d}-{month}'] += total
+        department = by_department.setdefault(row_dept_no, {"dept_no": row_dept_no, "dept_name": dept_name, "count": 0})
+        department["count"] += total
+
+    return {
+        "from_date": today,
+        "to_date": end,
+        "total": sum(by_month.values()),
+        "by_month": [{"month": month, "count": count} for month, count in by_month.items()],
+        "by_department": sorted(by_department.values(), key=lambda item: (-item["count"], item["dept_no"]))
+    }
@@ -0,0 +1,59 @@
+import logging
+import threading
+from collections import defaultdict
+
+logger = logging.getLogger(__name__)
+
+
+# 表变更通知：写接口在提交事务后调用 tables_changed，
+# 缓存等内存结构通过 on_tables_changed 订阅并据此失效或刷新。
+# 写接口知道写了哪些员工 / 部门时一并传入，订阅时 rows=True 的内存快照据此只更新这些行。
+_listeners = defaultdict(list)
+_lock = threading.Lock()
+
+
+def on_tables_changed(tables, callback, rows: bool = False):
+    """
+    Subscribe `callback(changed_tables)` to committed writes on any of `tables`.
+
+    Args:
+        tables: iterable of base table names, e.g. ('salaries', 'titles')
+        callback: called with the set of changed tables; may run on a DB worker thread
+        rows: also pass the rows the writer reported, as
+              callback(changed_tables, emp_nos=..., dept_nos=...); both are None
+              when the writer did not say which rows it wrote
+    """
+    with _lock:
+        for table in tables:
+            _listeners[table].append((callback, rows))
+
+
+def tables_changed(*tables, emp_nos=None, dept_nos=None):
+    """
+    Notify subscribers that `tables` were written. Call after the commit.
+    Listener errors are logged and never break the write that triggered them.
+
+    Args:
+        tables: names of the base tables that were written
+        emp_nos, dept_nos: employees / departments whose rows were written, when
+            the writer knows them; giving either one means nothing else changed
+    """
+    changed = set(tables)
+    if emp_nos is not None or dept_nos is not None:
+        emp_nos = {int(emp_no) for emp_no in emp_nos or () if emp_no is not None}
+        dept_nos = {dept_no for dept_no in dept_nos or () if dept_no is not None}
+    with _lock:
+        callbacks = []
+        for table in changed:
+            for listener in _listeners.get(table, ()):
+                if listener not in callbacks:
+                    callbacks.append(listener)
+
+    for callback, rows in callbacks:
+        try:
+            if rows:
+                callback(changed, emp_nos=emp_nos, dept_nos=dept_nos)
+            else:
+                callback(changed)
+        except Exception as e:
+            logger.error(f"Table change listener failed for {sorted(changed)}: {e}")
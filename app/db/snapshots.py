@@ -0,0 +1,146 @@
+import logging
+import threading
+import time
+from .init import engine
+from .signals import on_tables_changed
+
+logger = logging.getLogger(__name__)
+
+# 从数据库载入内存的只读快照（组织架构树、当前职称索引等）的通用持有者：
+# 首次使用（或启动时）载入，依赖的表有写入后在后台线程更新，更新完成前继续使用旧的快照。
+# 写接口给出了写入的员工 / 部门时只重新读取这些行，在快照的副本上更新；否则整体重新载入。
+
+# 一次增量更新最多处理的员工数 + 部门数，超过时整体重新载入
+INCREMENTAL_LIMIT = 1000
+
+
+class ReloadingSnapshot:
+    """
+    Holder of an in-memory snapshot built from the database: loads it on first
+    use (or at startup) and brings it up to date in a background thread after
+    writes to `sources`. Readers always get a complete snapshot, the new one
+    replaces the old at once.
+
+    Subclasses implement load(conn), may implement update(conn, snapshot,
+    emp_nos, dept_nos) to apply the rows a write reported (see tables_changed)
+    and may override describe(snapshot) for the log.
+    """
+
+    name = 'Snapshot'
+
+    def __init__(self, sources):
+        self.sources = tuple(sources)
+        self._snapshot = None
+        self._load_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self._dirty = False
+        self._full = False          # 有写入没有给出行，或增量更新失败：需要整体重新载入
+        self._emp_nos = set()       # 待应用的员工 / 部门
+        self._dept_nos = set()
+        self._reloading = False
+        on_tables_changed(self.sources, self._on_tables_changed, rows=True)
+
+    def load(self, conn):
+        raise NotImplementedError
+
+    def update(self, conn, snapshot, emp_nos, dept_nos):
+        """
+        New snapshot with the rows of `emp_nos` / `dept_nos` re-read, built
+        without modifying `snapshot` (readers may still hold it).
+        Returns None when a full load is needed instead.
+        """
+        return None
+
+    def describe(self, snapshot) -> str:
+        return type(snapshot).__name__
+
+    @property
+    def loaded(self) -> bool:
+        return self._snapshot is not None
+
+    @property
+    def current(self):
+        """
+        Snapshot held right now, without loading it (None before the first load).
+        """
+        return self._snapshot
+
+    def refresh(self):
+        """
+        Load a new snapshot from the database and swap it in (blocking).
+        """
+        with self._load_lock:
+            return self._load()
+
+    def _load(self):
+        started = time.perf_counter()
+        with engine.connect() as conn:
+            snapshot = self.load(conn)
+        self._snapshot = snapshot
+        logger.info(f"{self.name} loaded: {self.describe(snapshot)} in {time.perf_counter() - started:.2f}s")
+        return snapshot
+
+    def apply(self, emp_nos, dept_nos):
+        """
+        Re-read the rows of `emp_nos` / `dept_nos` and swap in the updated snapshot
+        (blocking); loads the whole snapshot when update() cannot apply them.
+        """
+        with self._load_lock:
+            snapshot = self._snapshot
+            if snapshot is None:
+                return self._load()
+            started = time.perf_counter()
+            with engine.connect() as conn:
+                updated = self.update(conn, snapshot, emp_nos, dept_nos)
+            if updated is None:
+                return self._load()
+            self._snapshot = updated
+            logger.info(f"{self.name} updated: {len(emp_nos)} employees, {len(dept_nos)} departments "
+                        f"in {time.perf_counter() - started:.3f}s")
+            return updated
+
+    def snapshot(self):
+        """
+        Current snapshot, loading it first if needed (concurrent first calls load once).
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._load_lock:
+                snapshot = self._snapshot or self._load()
+        return snapshot
+
+    def _on_tables_changed(self, changed, emp_nos=None, dept_nos=None):
+        # 写接口在数据库线程池中调用，这里只记录并交给后台线程更新；多次写入合并为一次更新
+        if self._snapshot is None:
+            return
+        with self._state_lock:
+            self._dirty = True
+            if emp_nos is None:
+                self._full = True
+            else:
+                self._emp_nos |= emp_nos
+                self._dept_nos |= dept_nos
+            if self._reloading:
+                return
+            self._reloading = True
+        thread_name = f"{self.name.lower().replace(' ', '-')}-reload"
+        threading.Thread(target=self._reload, name=thread_name, daemon=True).start()
+
+    def _reload(self):
+        while True:
+            with self._state_lock:
+                if not self._dirty:
+                    self._reloading = False
+                    return
+                full, emp_nos, dept_nos = self._full, self._emp_nos, self._dept_nos
+                self._dirty, self._full, self._emp_nos, self._dept_nos = False, False, set(), set()
+            try:
+                if full or len(emp_nos) + len(dept_nos) > INCREMENTAL_LIMIT:
+                    self.refresh()
+                else:
+                    self.apply(emp_nos, dept_nos)
+            except Exception as e:
+                # 失败时保留旧快照，下次写入时整体重新载入
+                logger.error(f"{self.name} reload failed: {e}")
+                with self._state_lock:
+                    self._full = True
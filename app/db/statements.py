@@ -0,0 +1,132 @@
+from functools import lru_cache
+from sqlalchemy import text, bindparam
+
+
+# 员工写路径使用的预编译语句：全部使用绑定参数，text() 对象只构造一次并复用，
+# SQLAlchemy 按语句对象缓存编译结果，不再为每次调用拼接、解析新的 SQL 字符串。
+
+# 员工基本信息中可以更新的列
+EMPLOYEE_COLUMNS = ('gender', 'birth_date', 'hire_date', 'first_name', 'last_name')
+
+# 记录“当前值”的历史表 -> 值列；当前行的 to_date 为 9999-01-01
+CURRENT_TABLES = {
+    'dept_emp': 'dept_no',
+    'titles': 'title',
+    'salaries': 'salary',
+}
+
+insert_employees_sql = text("""
+    INSERT INTO employees (emp_no, birth_date, first_name, last_name, gender, hire_date)
+    VALUES (:emp_no, :birth_date, :first_name, :last_name, :gender, :hire_date)
+""")
+
+# 新增历史行（executemany 时 pymysql 会改写成多行 VALUES）。
+# 用普通 INSERT：主键冲突时报错，不会像 REPLACE 那样悄悄删掉已有的历史行
+insert_current_sql = {
+    table: text(f"""
+        INSERT INTO {table} (emp_no, {column}, from_date, to_date)
+        VALUES (:emp_no, :{column}, :from_date, :to_date)
+    """)
+    for table, column in CURRENT_TABLES.items()
+}
+
+# 一批员工的当前行
+current_rows_sql = {
+    table: text(f"""
+        SELECT emp_no, {column} AS value, from_date
+        FROM {table}
+        WHERE emp_no IN :emp_nos AND to_date = '9999-01-01'
+    """).bindparams(bindparam('emp_nos', expanding=True))
+    for table, column in CURRENT_TABLES.items()
+}
+
+# dept_emp 的主键是 (emp_no, dept_no)：每个员工在每个部门只能有一行
+dept_history_sql = text(
+    "SELECT emp_no, dept_no FROM dept_emp WHERE emp_no IN :emp_nos"
+).bindparams(bindparam('emp_nos', expanding=True))
+
+# 一条语句结束一批员工的当前行
+close_current_sql = {
+    table: text(f"""
+        UPDATE {table} SET to_date = :from_date
+        WHERE emp_no IN :emp_nos AND to_date = '9999-01-01'
+    """).bindparams(bindparam('emp_nos', expanding=True))
+    for table in CURRENT_TABLES
+}
+
+# 同一天内再次变更：当前行就是当天开始的，直接改写它的值，不再新增一行
+restate_current_sql = {
+    table: text(f"""
+        UPDATE {table} SET {column} = :{column}, to_date = :to_date
+        WHERE emp_no = :emp_no AND from_date = :from_date AND to_date = '9999-01-01'
+    """)
+    for table, column in CURRENT_TABLES.items()
+}
+
+
+def plan_current_changes(conn, table: str, rows, from_date: str, to_date: str):
+    """
+    Decide how to apply new current values of `table` for many employees, without writing.
+
+    Per employee the current row is ended at from_date and a new row added; when the
+    current row itself starts on from_date it is restated instead. Changes that the
+    primary key or the history cannot hold are rejected:
+    - dept_emp: a department the employee already has a row for (moving back);
+      moving to the current department is a no-op
+    - from_date before the start of the current row
+
+    Args:
+        rows: list of {"emp_no": ..., <value column>: ...}
+
+    Returns:
+        (plan, rejected): plan for apply_current_changes, {emp_no: error message}
+    """
+    column = CURRENT_TABLES[table]
+    emp_nos = [row['emp_no'] for row in rows]
+    current = {row.emp_no: row for row in conn.execute(current_rows_sql[table], {'emp_nos': emp_nos})}
+    history = set()
+    if table == 'dept_emp':
+        history = {tuple(row) for row in conn.execute(dept_history_sql, {'emp_nos': emp_nos})}
+
+    plan, rejected = [], {}
+    for row in rows:
+        emp_no, value = row['emp_no'], row[column]
+        now = current.get(emp_no)
+        if table == 'dept_emp' and now is not None and now.value == value:
+            continue
+        if table == 'dept_emp' and (emp_no, value) in history:
+            rejected[emp_no] = f"Employee {emp_no} already has a department record for {value}"
+            continue
+        if now is not None and str(now.from_date) > from_date:
+            rejected[emp_no] = f"Current {table} row of employee {emp_no} starts after {from_date}"
+            continue
+        action = 'restate' if now is not None and str(now.from_date) == from_date else 'insert'
+        plan.append((emp_no, action, {'emp_no': emp_no, column: value, 'from_date': from_date, 'to_date': to_date}))
+    return plan, rejected
+
+
+def apply_current_changes(conn, table: str, plan, skip=()):
+    """
+    Write a plan of plan_current_changes: one UPDATE ends the current rows, one
+    multi-row INSERT adds the new ones, same-day changes are restated in place.
+    Employees in `skip` are left out. Returns the number of rows written.
+    """
+    inserts = [params for emp_no, action, params in plan if action == 'insert' and emp_no not in skip]
+    restates = [params for emp_no, action, params in plan if action == 'restate' and emp_no not in skip]
+    rowcount = 0
+    if inserts:
+        conn.execute(close_current_sql[table],
+                     {'from_date': inserts[0]['from_date'], 'emp_nos': [params['emp_no'] for params in inserts]})
+        rowcount += conn.execute(insert_current_sql[table], inserts).rowcount
+    if restates:
+        rowcount += conn.execute(restate_current_sql[table], restates).rowcount
+    return rowcount
+
+
+@lru_cache(maxsize=None)
+def update_employee_sql(columns: tuple):
+    """
+    UPDATE employees statement setting `columns` (a tuple from EMPLOYEE_COLUMNS), built once per column set.
+    """
+    assignments = ', '.join(f'{column} = :{column}' for column in columns if column in EMPLOYEE_COLUMNS)
+    return text(f'UPDATE employees SET {assignments} WHERE emp_no = :emp_no')
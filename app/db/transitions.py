@@ -0,0 +1,73 @@
+from sqlalchemy import text
+from .init import engine
+
+
+# 员工记录变动（部门调动、职称变化）的统一查询，读取 employee_transitions 变动记录表：
+# 变动在写入时已经算好，这里只是按 (kind, at_date) 索引做范围扫描取一页，总数也只数索引范围。
+# /promotion/internal_mobility、/transfer/list 使用部门变动，/promotion/recent 使用职称变动。
+
+# 部门变动
+dept_transitions_sql = """
+    SELECT t.emp_no, e.first_name, e.last_name,
+           t.from_value AS from_dept, t.to_value AS to_dept,
+           dp.dept_name AS from_dept_name, dn.dept_name AS to_dept_name,
+           t.at_date AS from_date
+    FROM employee_transitions t
+    JOIN employees e ON e.emp_no = t.emp_no
+    LEFT JOIN departments dp ON dp.dept_no = t.from_value
+    LEFT JOIN departments dn ON dn.dept_no = t.to_value
+    WHERE t.kind = 'dept' AND t.at_date BETWEEN :start_date AND :end_date
+    ORDER BY t.at_date DESC, t.emp_no
+    LIMIT :limit OFFSET :offset
+    """
+
+# 职称变动
+title_transitions_sql = """
+    SELECT t.emp_no, e.first_name, e.last_name,
+           t.from_value AS old_title, t.to_value AS new_title,
+           t.at_date AS from_date
+    FROM employee_transitions t
+    JOIN employees e ON e.emp_no = t.emp_no
+    WHERE t.kind = 'title' AND t.at_date BETWEEN :start_date AND :end_date
+    ORDER BY t.at_date DESC, t.emp_no
+    LIMIT :limit OFFSET :offset
+    """
+
+count_transitions_sql = """
+    SELECT COUNT(*)
+    FROM employee_transitions
+    WHERE kind = :kind AND at_date BETWEEN :start_date AND :end_date
+    """
+
+TRANSITIONS = {
+    'dept': dept_transitions_sql,
+    'title': title_transitions_sql,
+}
+
+# 没有结束日期时使用的上限
+OPEN_END_DATE = '9999-12-31'
+
+
+def db_get_transitions(kind: str, start_date: str, end_date: str, pageNo: int, pageSize: int, fields: dict):
+    """
+    Page of department ('dept') or title ('title') changes whose new record
+    starts between start_date and end_date, newest first.
+
+    Args:
+        fields: output key -> query column, e.g. {"move_date": "from_date"}
+
+    Returns:
+        {"data": [...], "page": pageNo, "page_size": pageSize, "total": total}
+    """
+    params = {"start_date": start_date, "end_date": end_date or OPEN_END_DATE}
+    offset = (pageNo - 1) * pageSize
+
+    with engine.connect() as conn:
+        total = conn.execute(text(count_transitions_sql), {**params, "kind": kind}).scalar()
+        rows = []
+        # 超出末页时不再查询
+        if offset < total:
+            rows = conn.execute(text(TRANSITIONS[kind]), {**params, "limit": pageSize, "offset": offset}).mappings().all()
+
+    data = [{key: row[column] for key, column in fields.items()} for row in rows]
+    return {"data": data, "page": pageNo, "page_size": pageSize, "total": int(total)}
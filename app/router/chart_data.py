@@ -0,0 +1,23 @@
+from fastapi import APIRouter, HTTPException
+from app.db.chart_data import db_get_chart_data, CHARTS
+from app.db.dispatch import run_db_shared
+from app.core.responses import FastJSONRoute
+
+router = APIRouter(route_class=FastJSONRoute)
+
+
+@router.get('/charts/{chart_id}/data', tags=['Visualizations'])
+async def get_chart_data(chart_id: str):
+    """
+    Return the aggregated series behind a dashboard chart (chart_1 .. chart_4) as JSON,
+    so the frontend can draw it client-side. These are the same rows the /chart_N PNGs are rendered from.
+
+    - chart_1: current employees per department
+    - chart_2: average salary per year and title
+    - chart_3: current employees per title and gender
+    - chart_4: tenure five-number summary per department (quartiles, whiskers, mean)
+    """
+    if chart_id not in CHARTS:
+        raise HTTPException(status_code=404, detail=f"Unknown chart: {chart_id}")
+    data = await run_db_shared(db_get_chart_data, chart_id)
+    return {"chart": chart_id, "data": data}
@@ -2,8 +2,10 @@ from fastapi import APIRouter, Query, Body
 from pydantic import BaseModel, Field, AliasChoices
 # from sqlalchemy import text, create_engine
 from app.db.dept_emp_db import db_dept_emp_list, db_add_dept_emp, db_update_dept_emp, db_del_dept_emp
+from app.core.responses import FastJSONRoute, ResponseFormat, as_format
+from app.db.dispatch import run_db, run_db_shared
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 class DeptEmpCreate(BaseModel):
     """
@@ -43,11 +45,14 @@ async def get_dept_emp_list(
     Dept_Number: str | None = Query(None, description="Optional"),
     From_Date: str | None = Query(None, description="Optional"),
     To_Date: str | None = Query(None, description="Optional"),
+    Cursor: str | None = Query(None, description="Optional, keyset cursor (`next_cursor` of the previous page, empty for the first page)"),
+    format: ResponseFormat = Query('json', description="Optional, `columnar` returns {columns, rows} with one array per row"),
 ):
     """
     Obtain department employee information and feed to the frontend.
     """
-    return db_dept_emp_list(**locals())
+    params = {name: value for name, value in locals().items() if name != 'format'}
+    return as_format(await run_db_shared(db_dept_emp_list, **params), format)
 
 @router.post('/dept_emp/addition', tags=['Department Employees'])
 async def add_dept_emp(payload: DeptEmpCreate = Body(..., description="Department employee creation information, pass as JSON")):
@@ -55,18 +60,18 @@ async def add_dept_emp(payload: DeptEmpCreate = Body(..., description="Departmen
     Create a new department employee record.
     """
     effective_to_date = '9999-01-01' if payload.to_date is None else payload.to_date
-    return db_add_dept_emp(Employee_ID=payload.emp_no, Dept_Number=payload.dept_no, From_Date=payload.from_date, To_Date=effective_to_date)
+    return await run_db(db_add_dept_emp, Employee_ID=payload.emp_no, Dept_Number=payload.dept_no, From_Date=payload.from_date, To_Date=effective_to_date)
 
 @router.put('/dept_emp/update', tags=['Department Employees'])
 async def update_dept_emp(payload: DeptEmpUpdate = Body(..., description="Department employee update information, pass as JSON")):
     """
     Update employee's department assignment and date range (commonly used to update `to_date`).
     """
-    return db_update_dept_emp(Employee_ID=payload.emp_no, Dept_Number=payload.dept_no, From_Date=payload.from_date, To_Date=payload.to_date)
+    return await run_db(db_update_dept_emp, Employee_ID=payload.emp_no, Dept_Number=payload.dept_no, From_Date=payload.from_date, To_Date=payload.to_date)
 
 @router.delete('/dept_emp/deletion', tags=['Department Employees'])
 async def delete_dept_emp(payload: DeptEmpDelete = Body(..., description="Department employee deletion information, pass as JSON")):
     """
     Delete department employee record.
     """
-    return db_del_dept_emp(Employee_ID=payload.emp_no, Dept_Number=payload.dept_no)
\ No newline at end of file
+    return await run_db(db_del_dept_emp, Employee_ID=payload.emp_no, Dept_Number=payload.dept_no)
\ No newline at end of file
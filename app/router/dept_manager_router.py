@@ -2,8 +2,10 @@ from fastapi import APIRouter, Query, Body
 from pydantic import BaseModel, Field, AliasChoices
 # from sqlalchemy import text, create_engine
 from app.db.dept_manager_db import db_dept_manager_list, db_dept_manager_list_all, db_add_dept_manager, db_update_dept_manager, db_del_dept_manager
+from app.core.responses import FastJSONRoute, ResponseFormat, as_format
+from app.db.dispatch import run_db, run_db_shared
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 class DeptManagerCreate(BaseModel):
     """
@@ -43,11 +45,14 @@ async def get_dept_manager_list(
     Dept_Number: str | None = Query(None, description="Optional"),
     From_Date: str | None = Query(None, description="Optional"),
     To_Date: str | None = Query(None, description="Optional"),
+    Cursor: str | None = Query(None, description="Optional, keyset cursor (`next_cursor` of the previous page, empty for the first page)"),
+    format: ResponseFormat = Query('json', description="Optional, `columnar` returns {columns, rows} with one array per row"),
 ):
     """
     Obtain current department manager information (only managers with MAX(to_date) = '9999-01-01').
     """
-    return db_dept_manager_list(**locals())
+    params = {name: value for name, value in locals().items() if name != 'format'}
+    return as_format(await run_db_shared(db_dept_manager_list, **params), format)
 
 @router.get('/dept_manager/list/all', tags=['Department Managers'])
 async def get_dept_manager_list_all(
@@ -57,11 +62,14 @@ async def get_dept_manager_list_all(
     Dept_Number: str | None = Query(None, description="Optional"),
     From_Date: str | None = Query(None, description="Optional"),
     To_Date: str | None = Query(None, description="Optional"),
+    Cursor: str | None = Query(None, description="Optional, keyset cursor (`next_cursor` of the previous page, empty for the first page)"),
+    format: ResponseFormat = Query('json', description="Optional, `columnar` returns {columns, rows} with one array per row"),
 ):
     """
     Obtain all department manager information (including historical records).
     """
-    return db_dept_manager_list_all(**locals())
+    params = {name: value for name, value in locals().items() if name != 'format'}
+    return as_format(await run_db_shared(db_dept_manager_list_all, **params), format)
 
 @router.post('/dept_manager/addition', tags=['Department Managers'])
 async def add_dept_manager(payload: DeptManagerCreate = Body(..., description="Department manager creation information, pass as JSON")):
@@ -69,18 +77,18 @@ async def add_dept_manager(payload: DeptManagerCreate = Body(..., description="D
     Create a new department manager record.
     """
     effective_to_date = '9999-01-01' if payload.to_date is None else payload.to_date
-    return db_add_dept_manager(Employee_ID=payload.emp_no, Dept_Number=payload.dept_no, From_Date=payload.from_date, To_Date=effective_to_date)
+    return await run_db(db_add_dept_manager, Employee_ID=payload.emp_no, Dept_Number=payload.dept_no, From_Date=payload.from_date, To_Date=effective_to_date)
 
 @router.put('/dept_manager/update', tags=['Department Managers'])
 async def update_dept_manager(payload: DeptManagerUpdate = Body(..., description="Department manager update information, pass as JSON")):
     """
     Update department manager's department assignment and date range (commonly used to update `to_date`).
     """
-    return db_update_dept_manager(Employee_ID=payload.emp_no, Dept_Number=payload.dept_no, From_Date=payload.from_date, To_Date=payload.to_date)
+    return await run_db(db_update_dept_manager, Employee_ID=payload.emp_no, Dept_Number=payload.dept_no, From_Date=payload.from_date, To_Date=payload.to_date)
 
 @router.delete('/dept_manager/deletion', tags=['Department Managers'])
 async def delete_dept_manager(payload: DeptManagerDelete = Body(..., description="Department manager deletion information, pass as JSON")):
     """
     Delete department manager record.
     """
-    return db_del_dept_manager(Employee_ID=payload.emp_no, Dept_Number=payload.dept_no)
\ No newline at end of file
+    return await run_db(db_del_dept_manager, Employee_ID=payload.emp_no, Dept_Number=payload.dept_no)
\ No newline at end of file
@@ -2,8 +2,10 @@ from fastapi import APIRouter, Query, Body
 from pydantic import BaseModel, Field, AliasChoices
 # from sqlalchemy import text, create_engine
 from app.db.dept_db import db_dept_list, db_add_dept, db_update_dept, db_del_dept, db_get_dept_info
+from app.core.responses import FastJSONRoute, ResponseFormat, as_format
+from app.db.dispatch import run_db, run_db_shared
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 class DepartmentCreate(BaseModel):
     """
@@ -35,36 +37,38 @@ async def get_dept_list(
     Row_Count: int = Query(..., description="Mandatory"),
     Dept_ID: str | None = Query(None, description="Optional"),
     Dept_Name: str | None = Query(None, description="Optional"),
+    format: ResponseFormat = Query('json', description="Optional, `columnar` returns {columns, rows} with one array per row"),
 ):
     """
     Obtain department information and feed to the frontend.
     """
-    return db_dept_list(**locals())
+    params = {name: value for name, value in locals().items() if name != 'format'}
+    return as_format(await run_db_shared(db_dept_list, **params), format)
 
 @router.post('/departments/addition', tags=['Departments'])
 async def add_dept(payload: DepartmentCreate = Body(..., description="Department creation information, pass as JSON")):
     """
     Create a new department.
     """
-    return db_add_dept(Dept_ID=payload.dept_no, Dept_Name=payload.dept_name)
+    return await run_db(db_add_dept, Dept_ID=payload.dept_no, Dept_Name=payload.dept_name)
 
 @router.put('/departments/update', tags=['Departments'])
 async def update_dept(payload: DepartmentUpdate = Body(..., description="Department update information, pass as JSON")):
     """
     Update department information.
     """
-    return db_update_dept(Dept_ID=payload.dept_no, Dept_Name=payload.dept_name)
+    return await run_db(db_update_dept, Dept_ID=payload.dept_no, Dept_Name=payload.dept_name)
 
 @router.delete('/departments/deletion', tags=['Departments'])
 async def delete_dept(payload: DepartmentDelete = Body(..., description="Department deletion information, pass as JSON")):
     """
     Delete department record.
     """
-    return db_del_dept(Dept_ID=payload.dept_no)
+    return await run_db(db_del_dept, Dept_ID=payload.dept_no)
 
 @router.get('/departments/detail', tags=['Departments'])
 async def get_dept_info(Dept_ID: str = Query(..., description="Mandatory")):
     """
     Obtain department information by department ID.
     """
-    return db_get_dept_info(Dept_ID)
\ No newline at end of file
+    return await run_db_shared(db_get_dept_info, Dept_ID)
\ No newline at end of file
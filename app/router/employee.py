@@ -1,10 +1,15 @@
-from fastapi import APIRouter, Query, Body
-from pydantic import BaseModel
-from typing import Optional
+import json
+from datetime import date
+from fastapi import APIRouter, Query, Body, Request, HTTPException
+from pydantic import BaseModel, Field, ValidationError
+from typing import Optional, Literal
 # from sqlalchemy import text, create_engine
 from app.db.employee import db_get_emp_list, db_add_emp, db_del_emp, db_update_emp, get_emp_info
+from app.db.employee_bulk import db_bulk_add_emps, db_bulk_update_emps
+from app.core.responses import FastJSONRoute, ResponseFormat, as_format
+from app.db.dispatch import run_db, run_db_shared
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 
 class EmployeeUpdate(BaseModel):
@@ -44,6 +49,150 @@ class EmployeeCreate(BaseModel):
     title: Optional[str] = None
 
 
+class EmployeeBulkItem(BaseModel):
+    """
+    One row of a bulk creation request (stricter than EmployeeCreate, checked before any write)
+    - Required fields: `birth_date`, `hire_date` (YYYY-MM-DD), `gender` (M / F)
+    - `emp_no` is allocated when omitted
+    - `dept_no`, `salary` and `title` are optional; the matching row is only written when given
+    """
+    birth_date: date
+    hire_date: date
+    gender: Literal['M', 'F']
+    emp_no: Optional[int] = Field(None, gt=0)
+    name: Optional[str] = None
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    dept_no: Optional[str] = Field(None, max_length=4)
+    salary: Optional[int] = Field(None, ge=0)
+    title: Optional[str] = Field(None, max_length=50)
+
+
+class EmployeeBulkUpdate(BaseModel):
+    """
+    One row of a bulk update request
+    - Required field: `emp_no`
+    - Only the fields given are changed; `dept_no`, `title` and `salary` end the current row and add a new one
+    """
+    emp_no: int = Field(..., gt=0)
+    birth_date: Optional[date] = None
+    hire_date: Optional[date] = None
+    gender: Optional[Literal['M', 'F']] = None
+    name: Optional[str] = None
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    dept_no: Optional[str] = Field(None, max_length=4)
+    salary: Optional[int] = Field(None, ge=0)
+    title: Optional[str] = Field(None, max_length=50)
+
+
+# 单次批量请求的最大行数
+BULK_MAX_ROWS = 50000
+
+
+def _parse_bulk_body(body: bytes, content_type: str):
+    """
+    JSON array, or NDJSON (one object per line) when the content type says so.
+    """
+    if 'ndjson' in content_type or 'jsonl' in content_type:
+        return [json.loads(line) for line in body.splitlines() if line.strip()]
+    items = json.loads(body)
+    if not isinstance(items, list):
+        raise ValueError("Body must be a JSON array of employees")
+    return items
+
+
+def _validate_bulk_item(item) -> dict:
+    payload = EmployeeBulkItem.model_validate(item)
+    # Normalize name: prioritize name; otherwise concatenate first_name + last_name
+    if payload.name:
+        parts = payload.name.split(' ', 1)
+        first_name, last_name = parts[0], parts[1] if len(parts) > 1 else ''
+    else:
+        first_name, last_name = payload.first_name or '', payload.last_name or ''
+    if not first_name:
+        raise ValueError("name or first_name is required")
+    # employees 表：first_name VARCHAR(14)，last_name VARCHAR(16)
+    if len(first_name) > 14 or len(last_name) > 16:
+        raise ValueError("first_name is limited to 14 and last_name to 16 characters")
+    return {
+        'emp_no': payload.emp_no,
+        'birth_date': payload.birth_date.isoformat(),
+        'first_name': first_name,
+        'last_name': last_name,
+        'gender': payload.gender,
+        'hire_date': payload.hire_date.isoformat(),
+        'dept_no': payload.dept_no,
+        'salary': payload.salary,
+        'title': payload.title,
+    }
+
+
+def _validate_bulk_update(item) -> dict:
+    payload = EmployeeBulkUpdate.model_validate(item)
+    values = {}
+    if payload.gender:
+        values['gender'] = payload.gender
+    # Normalize name: prioritize name; otherwise concatenate first_name + last_name
+    resolved_name = payload.name
+    if not resolved_name and (payload.first_name or payload.last_name):
+        resolved_name = (payload.first_name or '') + (' ' + payload.last_name if payload.last_name else '')
+    if resolved_name:
+        parts = resolved_name.split(' ', 1)
+        values['first_name'], values['last_name'] = parts[0], parts[1] if len(parts) > 1 else ''
+        if len(values['first_name']) > 14 or len(values['last_name']) > 16:
+            raise ValueError("first_name is limited to 14 and last_name to 16 characters")
+    if payload.birth_date:
+        values['birth_date'] = payload.birth_date.isoformat()
+    if payload.hire_date:
+        values['hire_date'] = payload.hire_date.isoformat()
+
+    row = {
+        'emp_no': payload.emp_no,
+        'values': values,
+        'dept_no': payload.dept_no or None,
+        'title': payload.title or None,
+        'salary': payload.salary,
+    }
+    if not values and row['dept_no'] is None and row['title'] is None and row['salary'] is None:
+        raise ValueError("Nothing to update")
+    return row
+
+
+def _validate_bulk(items, validate):
+    """
+    Validate every item; returns ([(index, row)], errors). An emp_no may appear only once.
+    """
+    rows, errors, seen = [], [], set()
+    for index, item in enumerate(items):
+        emp_no = item.get('emp_no') if isinstance(item, dict) else None
+        try:
+            row = validate(item)
+        except ValidationError as e:
+            message = '; '.join(f"{'.'.join(str(p) for p in err['loc']) or 'row'}: {err['msg']}" for err in e.errors())
+            errors.append({'index': index, 'emp_no': emp_no, 'error': message})
+            continue
+        except ValueError as e:
+            errors.append({'index': index, 'emp_no': emp_no, 'error': str(e)})
+            continue
+        if row['emp_no'] is not None:
+            if row['emp_no'] in seen:
+                errors.append({'index': index, 'emp_no': emp_no, 'error': "Duplicate emp_no in request"})
+                continue
+            seen.add(row['emp_no'])
+        rows.append((index, row))
+    return rows, errors
+
+
+async def _read_bulk_body(request: Request):
+    try:
+        items = _parse_bulk_body(await request.body(), request.headers.get('content-type', ''))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid body: {e}")
+    if len(items) > BULK_MAX_ROWS:
+        raise HTTPException(status_code=413, detail=f"At most {BULK_MAX_ROWS} employees per request")
+    return items
+
 
 @router.get('/employees/list', tags=['Employees'])
 async def get_employees_list(
@@ -61,11 +210,14 @@ async def get_employees_list(
     salary_max: Optional[int] = Query(None, description="Optional"),
     dept_name: Optional[str] = Query(None, description="Optional"),
     title: Optional[str] = Query(None, description="Optional"),
+    cursor: Optional[str] = Query(None, description="Optional, keyset cursor (`next_cursor` of the previous page, empty for the first page)"),
+    format: ResponseFormat = Query('json', description="Optional, `columnar` returns {columns, rows} with one array per row"),
 ):
     """
     Obtain employee information and feed to the frontend.
     """
-    return db_get_emp_list(**locals())
+    params = {name: value for name, value in locals().items() if name != 'format'}
+    return as_format(await run_db_shared(db_get_emp_list, **params), format)
 
 @router.post('/employees', tags=['Employees'])
 async def add_employee(payload: EmployeeCreate = Body(..., description="Employee creation information, pass as JSON")):
@@ -79,7 +231,8 @@ async def add_employee(payload: EmployeeCreate = Body(..., description="Employee
         last = payload.last_name or ""
         resolved_name = (first + (" " + last if last else "")) or ""
 
-    return db_add_emp(
+    return await run_db(
+        db_add_emp,
         emp_no=payload.emp_no,
         gender=payload.gender,
         birth_date=payload.birth_date,
@@ -90,6 +243,53 @@ async def add_employee(payload: EmployeeCreate = Body(..., description="Employee
         title=payload.title,
     )
 
+@router.post('/employees/bulk', tags=['Employees'])
+async def add_employees_bulk(request: Request):
+    """
+    Create many employees at once (onboarding).
+
+    The body is a JSON array of employees (same fields as `POST /employees`), or NDJSON
+    with `Content-Type: application/x-ndjson`. Every row is validated first; valid rows are
+    written in chunks, one transaction per chunk, with multi-row inserts.
+    Invalid or failing rows are skipped and reported in `errors` by their index in the body.
+    """
+    rows, errors = _validate_bulk(await _read_bulk_body(request), _validate_bulk_item)
+
+    result = await run_db(db_bulk_add_emps, rows) if rows else {"inserted": 0, "failed": 0, "emp_nos": [], "errors": []}
+    result['errors'] = sorted(errors + result['errors'], key=lambda error: error['index'])
+    result['failed'] = len(result['errors'])
+    return result
+
+@router.patch('/employees/bulk', tags=['Employees'])
+async def update_employees_bulk(
+    request: Request,
+    from_date: Optional[date] = Query(None, description="Optional, date the new department / title / salary take effect (default today)"),
+    to_date: Optional[date] = Query(None, description="Optional, end date of the new rows (default 9999-01-01)"),
+):
+    """
+    Update many employees in one transaction (e.g. a salary review).
+
+    The body is a JSON array of updates (`emp_no` plus the fields of `PUT /employees/{emp_no}`
+    to change), or NDJSON with `Content-Type: application/x-ndjson`. Invalid rows and unknown
+    employees / departments are skipped and reported in `errors` by their index in the body;
+    the other rows are applied together, or not at all if the database rejects the batch.
+    """
+    rows, errors = _validate_bulk(await _read_bulk_body(request), _validate_bulk_update)
+
+    result = {"updated": 0, "failed": 0, "emp_nos": [], "errors": []}
+    if rows:
+        try:
+            result = await run_db(
+                db_bulk_update_emps, rows,
+                from_date.isoformat() if from_date else None,
+                to_date.isoformat() if to_date else None,
+            )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"No update was applied: {e}")
+    result['errors'] = sorted(errors + result['errors'], key=lambda error: error['index'])
+    result['failed'] = len(result['errors'])
+    return result
+
 @router.put('/employees/{emp_no}', tags=['Employees'])
 async def update_employee(
     emp_no: int,
@@ -105,7 +305,8 @@ async def update_employee(
         last = payload.last_name or ""
         resolved_name = (first + (" " + last if last else "")) or None
 
-    return db_update_emp(
+    return await run_db(
+        db_update_emp,
         emp_no=emp_no,
         gender=payload.gender,
         birth_date=payload.birth_date,
@@ -121,11 +322,11 @@ async def delete_employee(emp_no: int):
     """
     Delete employee record by employee number.
     """
-    return db_del_emp(emp_no=emp_no)
+    return await run_db(db_del_emp, emp_no=emp_no)
 
 @router.get('/employees/{emp_no}', tags=['Employees'])
 async def get_employee_info(emp_no: int):
     """
     Obtain employee information by employee number.
     """
-    return get_emp_info(emp_no=emp_no)
\ No newline at end of file
+    return await run_db_shared(get_emp_info, emp_no=emp_no)
\ No newline at end of file
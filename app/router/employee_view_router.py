@@ -3,8 +3,10 @@
 from fastapi import APIRouter, Query
 from typing import Optional
 from app.db.employee_view_db import employee_profile
+from app.core.responses import FastJSONRoute, ResponseFormat, as_format
+from app.db.dispatch import run_db_shared
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 @router.get('/employees/view', tags=['Employees'])
 async def get_employees_view(
@@ -23,6 +25,8 @@ async def get_employees_view(
     Effective_Date_max: Optional[str] = Query(None, description="Optional"),
     End_Date_min: Optional[str] = Query(None, description="Optional"),
     End_Date_max: Optional[str] = Query(None, description="Optional"),
+    Cursor: Optional[str] = Query(None, description="Optional, keyset cursor (`next_cursor` of the previous page, empty for the first page)"),
+    format: ResponseFormat = Query('json', description="Optional, `columnar` returns {columns, rows} with one array per row"),
 ):
     """
     Obtain employee history/profile information and feed to the frontend.
@@ -43,6 +47,7 @@ async def get_employees_view(
         'Effective_Date_min': Effective_Date_min,
         'Effective_Date_max': Effective_Date_max,
         'End_Date_min': End_Date_min,
-        'End_Date_max': End_Date_max
+        'End_Date_max': End_Date_max,
+        'Cursor': Cursor
     }
-    return employee_profile(**params)
+    return as_format(await run_db_shared(employee_profile, **params), format)
@@ -1,11 +1,12 @@
 from fastapi import APIRouter, Query
 from fastapi.responses import StreamingResponse
 from app.db.example import db_get_emp_list
+from app.core.responses import FastJSONRoute
 import matplotlib.pyplot as plt
 import io
 import base64
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 # 较简单的写法。下方的注释是更复杂的写法，可以提供更多的能力。
 # 第一行定义接口。把下方的方法包装成接口提供给前端调用。
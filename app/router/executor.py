@@ -1,12 +1,129 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import exc
 # from sqlalchemy import text, create_engine
-from app.db.executor import executor
+from app.db.executor import executor, executor_readonly, check_readonly_sql, EXEC_MAX_ROWS, EXEC_MAX_EXECUTION_MS
+from app.db.query_plans import db_explain, capture_plans, db_list_plans, db_diff_plans, APP_QUERIES
+from app.db.dispatch import run_db, stream_db, exec_executor
+from app.core.responses import FastJSONRoute
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 @router.get("/exec", tags=["Exec"])
 async def get_dept_name(sql):
     try:
-        return executor(sql)
+        return await run_db(executor, sql)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+async def _prepend(first, rest):
+    yield first
+    async for chunk in rest:
+        yield chunk
+
+
+@router.get("/exec/readonly", tags=["Exec"])
+async def exec_readonly(
+    sql: str,
+    max_rows: int | None = Query(None, ge=1, le=EXEC_MAX_ROWS, description=f"Optional, row cap (max {EXEC_MAX_ROWS})"),
+    timeout_ms: int | None = Query(None, ge=1, le=EXEC_MAX_EXECUTION_MS, description=f"Optional, MAX_EXECUTION_TIME in ms (max {EXEC_MAX_EXECUTION_MS})"),
+):
+    """
+    Run one read statement (SELECT / WITH / SHOW / EXPLAIN / DESCRIBE) for ad-hoc analysis.
+
+    - runs in a READ ONLY transaction with a per-statement MAX_EXECUTION_TIME
+    - returns at most `max_rows` rows; `truncated` tells whether there were more
+    - streams the JSON result as rows are read
+    - uses its own small connection pool and threads, so it cannot starve the API
+    """
+    try:
+        check_readonly_sql(sql)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    chunks = executor_readonly(sql, max_rows, timeout_ms)
+    try:
+        # 先执行语句并取得第一段输出，SQL 错误可以作为普通错误响应返回
+        first = await run_db(next, chunks, executor=exec_executor)
+    except exc.TimeoutError:
+        await run_db(chunks.close, executor=exec_executor)
+        raise HTTPException(status_code=503, detail="All read-only exec connections are busy, retry later")
+    except Exception as e:
+        await run_db(chunks.close, executor=exec_executor)
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return StreamingResponse(
+        _prepend(first, stream_db(chunks, executor=exec_executor)),
+        media_type='application/json',
+    )
+
+
+@router.get("/exec/explain", tags=["Exec"])
+async def exec_explain(
+    sql: str,
+    analyze: bool = Query(False, description="EXPLAIN ANALYZE (executes the statement) instead of EXPLAIN FORMAT=JSON"),
+    timeout_ms: int | None = Query(None, ge=1, le=EXEC_MAX_EXECUTION_MS, description=f"Optional, MAX_EXECUTION_TIME in ms (max {EXEC_MAX_EXECUTION_MS})"),
+):
+    """
+    Query plan of one SELECT / WITH statement, with a digest of the normalized statement
+    (literals replaced by '?'). For FORMAT=JSON the response also has the access path
+    summary (tables, access types, indexes) and its plan_digest.
+    """
+    try:
+        return await run_db(db_explain, sql, analyze, timeout_ms, executor=exec_executor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except exc.TimeoutError:
+        raise HTTPException(status_code=503, detail="All read-only exec connections are busy, retry later")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/exec/plans", tags=["Exec"])
+async def list_plans():
+    """
+    Named app queries and their latest recorded plan.
+    """
+    try:
+        return {"data": await run_db(db_list_plans)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/exec/plans/capture", tags=["Exec"])
+async def capture_query_plans(
+    deployment: str | None = Query(None, max_length=64, description="Optional, deployment label (default DEPLOYMENT_ID)"),
+    name: list[str] | None = Query(None, description="Optional, query names (default all)"),
+):
+    """
+    EXPLAIN the named app queries and record their plans for this deployment.
+    `changed` tells whether the access path differs from the previous capture.
+    """
+    try:
+        return {"data": await run_db(capture_plans, name, deployment)}
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/exec/plans/{name}/diff", tags=["Exec"])
+async def diff_query_plans(
+    name: str,
+    base: str | None = Query(None, description="Optional, deployment to compare against"),
+    target: str | None = Query(None, description="Optional, deployment to check (default latest capture)"),
+):
+    """
+    Differences between two recorded plans of a named app query. `regressions` lists the
+    changes that make the plan worse (e.g. ref -> ALL on dept_emp, index no longer used).
+    """
+    if name not in APP_QUERIES:
+        raise HTTPException(status_code=404, detail=f"Unknown query: {name}")
+    try:
+        result = await run_db(db_diff_plans, name, base, target)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if result is None:
+        raise HTTPException(status_code=404, detail="Not enough recorded plans to compare")
+    return result
@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Query, HTTPException
+from fastapi.responses import StreamingResponse
+from app.db.export import db_export, RESOURCES, FORMATS
+from app.db.dispatch import stream_db
+from app.core.responses import FastJSONRoute
+
+router = APIRouter(route_class=FastJSONRoute)
+
+
+@router.get('/export/{resource}', tags=['Export'])
+async def export_resource(
+    resource: str,
+    format: str = Query('ndjson', pattern='^(ndjson|csv)$', description="ndjson or csv"),
+    Employee_ID_min: int | None = Query(None, description="Optional"),
+    Employee_ID_max: int | None = Query(None, description="Optional"),
+    Dept_Number: str | None = Query(None, description="Optional, e.g. d005"),
+):
+    """
+    Export a whole resource as a stream (NDJSON or CSV), in constant memory.
+
+    Resources: employees, salaries, titles, dept_emp, profile_history.
+    Rows are read through a server-side cursor in batches and sent as they are read.
+    """
+    if resource not in RESOURCES:
+        raise HTTPException(status_code=404, detail=f"Unknown resource: {resource}")
+
+    batches = db_export(resource, format, Employee_ID_min, Employee_ID_max, Dept_Number)
+    return StreamingResponse(
+        stream_db(batches),
+        media_type=FORMATS[format],
+        headers={'Content-Disposition': f'attachment; filename="{resource}.{format}"'},
+    )
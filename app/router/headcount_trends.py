@@ -1,29 +1,33 @@
 from fastapi import APIRouter, Query, HTTPException
-from app.db.headcount_trends import db_get_headcount_changes_by_year
+from app.db.headcount_trends import db_get_headcount_changes
+from app.db.dispatch import run_db_shared
+from app.core.responses import FastJSONRoute
 
 
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 
 
 @router.get('/headcount/changes', tags=['headcount'])
 async def get_headcount_changes(
     start_year: int | None = Query(None, ge=1985, le=2025, description="Start year"),
-    end_year: int | None = Query(None, ge=1985, le=2025, description="End year")
+    end_year: int | None = Query(None, ge=1985, le=2025, description="End year"),
+    granularity: str = Query('year', pattern='^(year|month)$', description="year or month")
 ):
     """
     Get comprehensive headcount changes by year
     
-    Returns for each year:
+    Returns for each year (or each month with granularity=month):
     - Number of new hires
     - Number of departures
     - Net change (hires - departures)
     - Turnover rate percentage
+    - Active headcount at the end of the period
     
     **This is the core interface for monitoring hiring trends and employee turnover**
     """
-    result = db_get_headcount_changes_by_year(start_year, end_year)
+    result = await run_db_shared(db_get_headcount_changes, granularity, start_year, end_year)
     
     if not result:
         raise HTTPException(status_code=404, detail="Headcount change data not found")
@@ -32,9 +36,11 @@ async def get_headcount_changes(
     total_departures = sum(row["departures"] for row in result)
     
     return {
+        "granularity": granularity,
         "start_year": start_year or result[0]["year"],
         "end_year": end_year or result[-1]["year"],
-        "total_years": len(result),
+        "total_years": len({row["year"] for row in result}),
+        "total_periods": len(result),
         "summary": {
             "total_hires": total_hires,
             "total_departures": total_departures,
@@ -1,82 +1,38 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib.ticker import MaxNLocator
-import seaborn as sns
-import io
-from fastapi import APIRouter
-from starlette.responses import StreamingResponse
-from app.db.init import engine 
-import warnings
-
-warnings.filterwarnings("ignore", category=UserWarning)
+from fastapi import APIRouter, Request
+from app.db.chart_data import db_get_chart_data, chart_tables
+from app.db.dispatch import run_db_shared
+from app.core.chart_cache import chart_cache
+from app.core.render_pool import render_png
+from app.core.responses import FastJSONRoute
 
 # --- FastAPI Router ---
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
+
+async def render_chart() -> bytes:
+    """
+    Query the data and render the Current Employees per Department chart to PNG bytes.
+    """
+    # Aggregated in SQL (app/db/chart_data.py); the same rows back /charts/chart_1/data
+    rows = await run_db_shared(db_get_chart_data, 'chart_1')
+
+    # Plotting is CPU-bound; render in the chart process pool (app/core/charts.py)
+    return await render_png('chart_1', rows)
+
+
+# Writes to these tables invalidate the cached image
+chart_cache.register('chart_1', chart_tables('chart_1'))
 
-# Set a professional plot style globally
-sns.set_style("whitegrid")
-plt.rcParams['font.family'] = 'sans-serif'
-plt.rcParams['font.sans-serif'] = 'DejaVu Sans'
 
 @router.get('/chart_1', tags=['Visualizations'])
-async def get_dashboard_stream():
+async def get_dashboard_stream(request: Request):
     """
     Generate the dashboard of Current Employees per Department.
+    Served from the chart cache with ETag / Last-Modified; re-rendered in the background when stale.
     """
-    # Switch backend to 'Agg' for non-GUI server environments
-    plt.switch_backend('Agg')
-
     try:
-        with engine.connect() as conn:
-            print("Database connection successful for dashboard.")
+        # Method 2: Return image stream (can be used directly as <img src="endpoint_url">)
+        return await chart_cache.respond(request, 'chart_1', render_chart)
     except Exception as e:
         print(f"Error connecting to database: {e}")
         # Return the error directly
         return {"error": f"Database connection error: {e}"}
-
-    fig, axes = plt.subplots(1, 1, figsize=(12, 7))
-
-    # --- Plot: Number of employees in each department ---
-    query1 = """
-    SELECT
-        d.dept_name,
-        COUNT(de.emp_no) AS num_employees
-    FROM
-        dept_emp de
-    JOIN
-        departments d ON de.dept_no = d.dept_no
-    WHERE
-        de.to_date = '9999-01-01'
-    GROUP BY
-        d.dept_name
-    ORDER BY
-        num_employees DESC;
-    """
-    df1 = pd.read_sql(query1, engine)
-    sns.barplot(ax=axes, x='num_employees', y='dept_name', data=df1, palette='viridis', orient='h', hue='dept_name', legend=False)
-    axes.set_title('Current Employees per Department', fontsize=22, fontweight='bold')
-    axes.set_xlabel('Number of Employees', fontsize=12)
-    axes.set_ylabel('Department', fontsize=12)
-
-    for p in axes.patches:
-        width = p.get_width()
-        axes.annotate(
-            f'{width:.0f}',  # The text to display
-            (width, p.get_y() + p.get_height() / 2.),  # The (x, y) position
-            ha='left',          # Horizontal alignment
-            va='center',        # Vertical alignment
-            xytext=(5, 0),      # 5-point horizontal offset
-            textcoords='offset points'
-        )
-
-    # --- Final Touches ---
-    plt.tight_layout(rect=[0, 0, 1, 0.96])
-    
-    # --- End of your plotting logic ---
-    img_buffer = io.BytesIO()
-    plt.savefig(img_buffer, format='png', bbox_inches='tight')
-    img_buffer.seek(0)
-    plt.close()
-    
-    # Method 2: Return image stream (can be used directly as <img src="endpoint_url">)
-    return StreamingResponse(img_buffer, media_type="image/png")
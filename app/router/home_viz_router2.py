@@ -1,77 +1,38 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib.ticker import MaxNLocator
-import seaborn as sns
-import io
-from fastapi import APIRouter
-from starlette.responses import StreamingResponse
-from app.db.init import engine 
-import warnings
-
-warnings.filterwarnings("ignore", category=UserWarning)
+from fastapi import APIRouter, Request
+from app.db.chart_data import db_get_chart_data, chart_tables
+from app.db.dispatch import run_db_shared
+from app.core.chart_cache import chart_cache
+from app.core.render_pool import render_png
+from app.core.responses import FastJSONRoute
 
 # --- FastAPI Router ---
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
+
+async def render_chart() -> bytes:
+    """
+    Query the data and render the Average Salary by Job Title Over Time chart to PNG bytes.
+    """
+    # Aggregated in SQL (app/db/chart_data.py); the same rows back /charts/chart_2/data
+    rows = await run_db_shared(db_get_chart_data, 'chart_2')
+
+    # Plotting is CPU-bound; render in the chart process pool (app/core/charts.py)
+    return await render_png('chart_2', rows)
+
+
+# Writes to these tables invalidate the cached image
+chart_cache.register('chart_2', chart_tables('chart_2'))
 
-# Set a professional plot style globally
-sns.set_style("whitegrid")
-plt.rcParams['font.family'] = 'sans-serif'
-plt.rcParams['font.sans-serif'] = 'DejaVu Sans'
 
 @router.get('/chart_2', tags=['Visualizations'])
-async def get_dashboard_stream():
+async def get_dashboard_stream(request: Request):
     """
     Generate the dashboard of Average Salary by Job Title Over Time.
+    Served from the chart cache with ETag / Last-Modified; re-rendered in the background when stale.
     """
-    # Switch backend to 'Agg' for non-GUI server environments
-    plt.switch_backend('Agg')
-
     try:
-        with engine.connect() as conn:
-            print("Database connection successful for dashboard.")
+        # 方式2：返回图片流（可直接作为 <img src="接口地址"> 使用）
+        return await chart_cache.respond(request, 'chart_2', render_chart)
     except Exception as e:
         print(f"Error connecting to database: {e}")
         # Return the error directly
         return {"error": f"Database connection error: {e}"}
-
-    fig, axes = plt.subplots(1, 1, figsize=(12, 7))
-
-    # --- Plot: Average salary over time BY JOB TITLE ---
-    query2 = """
-    SELECT
-        YEAR(s.from_date) AS salary_year,
-        t.title,
-        AVG(s.salary) AS avg_salary
-    FROM
-        salaries s
-    JOIN
-        titles t ON s.emp_no = t.emp_no
-        AND s.from_date BETWEEN t.from_date AND t.to_date
-    GROUP BY
-        salary_year,
-        t.title
-    ORDER BY
-        salary_year,
-        t.title;
-    """
-    df2 = pd.read_sql(query2, engine)
-    sns.lineplot(ax=axes, x='salary_year', y='avg_salary', hue='title', data=df2, marker='o', errorbar=None)
-    axes.xaxis.set_major_locator(MaxNLocator(integer=True))
-    plt.setp(axes.get_xticklabels(), rotation=0, ha="right")
-    axes.set_title('Average Salary by Job Title Over Time', fontsize=22, fontweight='bold')
-    axes.set_xlabel('Year', fontsize=12)
-    axes.set_ylabel('Average Salary ($)', fontsize=12)
-    axes.ticklabel_format(style='plain', axis='y')
-    axes.legend(title='Job Title')
-
-    # --- Final Touches ---
-    plt.tight_layout(rect=[0, 0, 1, 0.96])
-    
-    # --- End of your plotting logic ---
-    img_buffer = io.BytesIO()
-    plt.savefig(img_buffer, format='png', bbox_inches='tight')
-    img_buffer.seek(0)
-    plt.close()
-    
-    # 方式2：返回图片流（可直接作为 <img src="接口地址"> 使用）
-    return StreamingResponse(img_buffer, media_type="image/png")
@@ -0,0 +1,15 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.core.metrics import render_metrics
+from app.core.responses import FastJSONRoute
+
+router = APIRouter(route_class=FastJSONRoute)
+
+
+@router.get('/metrics', tags=['System Health Check'], response_class=PlainTextResponse)
+async def get_metrics():
+    """
+    Prometheus metrics: request latency per route, SQL statement latency,
+    pool checkout wait / hold time per route, and pool usage gauges.
+    """
+    return PlainTextResponse(render_metrics(), media_type='text/plain; version=0.0.4')
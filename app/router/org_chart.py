@@ -1,7 +1,15 @@
 from fastapi import APIRouter, Query, Path, HTTPException
-from app.db.org_chart import db_get_organizational_chart
+from app.db.org_chart import org_tree, db_get_organizational_chart, db_get_org_subtree, db_get_org_department_counts
+from app.db.dispatch import run_db
+from app.core.responses import FastJSONRoute
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
+
+
+async def _org_tree_ready():
+    # 组织架构树在内存中计算，只有首次载入需要访问数据库（放到数据库线程池中执行）
+    if not org_tree.loaded:
+        await run_db(org_tree.snapshot)
 
 
 @router.get('/org_chart/full', tags=['org_chart'])
@@ -11,15 +19,15 @@ async def get_organizational_chart(
     page_size: int = Query(10, ge=1, le=100, description="Number of records per page, default is 10, max is 100")
 ):
     """
-    Retrieve organizational chart (using recursive CTE with pagination)
+    Retrieve organizational chart (served from the in-memory org tree, with pagination)
     
-    **True recursive implementation**:
+    **Hierarchy**:
     - Level 1: Current department managers (manager_emp_no = NULL)
     - Level 2: Department employees (manager_emp_no = manager's emp_no)
     
     **Pagination Support:**
     - page: Page number (starting from 1)
-    - page_size: Records per page (default 100, max 500)
+    - page_size: Records per page (default 10, max 100)
     
     **Example:**
     - Page 1: GET /org_chart/full?page=1&page_size=100 (records 1-100)
@@ -31,6 +39,7 @@ async def get_organizational_chart(
     **Note**: Only includes current managers (to_date = '9999-01-01')
     """
     try:
+        await _org_tree_ready()
         result = db_get_organizational_chart(dept_no=dept_no, limit=page_size, page=page)
         
         if not result or not result.get("data"):
@@ -56,5 +65,51 @@ async def get_organizational_chart(
             "note": "The manager_emp_no field indicates each employee's direct supervisor (current manager)",
             "hierarchy": result["data"]
         }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Query failed: {str(e)}")
+
+
+@router.get('/org_chart/subtree/{emp_no}', tags=['org_chart'])
+async def get_org_subtree(
+    emp_no: int = Path(..., description="Employee number"),
+    page: int = Query(1, ge=1, description="Page number of the direct reports, starting from 1"),
+    page_size: int = Query(100, ge=1, le=1000, description="Direct reports per page, default is 100, max is 1000")
+):
+    """
+    Retrieve an employee's place in the organizational chart and their direct reports
+    
+    - nodes: the employee's rows in the chart (Manager and / or Employee)
+    - reports: a page of direct reports (current employees of the departments the employee manages)
+    """
+    try:
+        await _org_tree_ready()
+        result = db_get_org_subtree(emp_no, limit=page_size, page=page)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Query failed: {str(e)}")
+    if result is None:
+        raise HTTPException(status_code=404, detail=f"Employee {emp_no} is not in the current organizational chart")
+    return {
+        "emp_no": emp_no,
+        "nodes": result["nodes"],
+        "pagination": {
+            "current_page": result["page"],
+            "page_size": result["page_size"],
+            "total_pages": result["total_pages"],
+            "total_records": result["total_count"]
+        },
+        "reports": result["data"]
+    }
+
+
+@router.get('/org_chart/departments', tags=['org_chart'])
+async def get_org_department_counts():
+    """
+    Retrieve the current managers, employee count and chart rows of every department
+    """
+    try:
+        await _org_tree_ready()
+        return db_get_org_department_counts()
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Query failed: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Query failed: {str(e)}")
@@ -1,7 +1,9 @@
 from fastapi import APIRouter, Query
 from app.db.promotion import db_get_internal_mobility, db_get_recent_promotions
+from app.db.dispatch import run_db_shared
+from app.core.responses import FastJSONRoute
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 
 @router.get('/promotion/internal_mobility', tags=['promotion'])
@@ -13,7 +15,7 @@ async def get_internal_mobility(
     """
     查询指定时间段内发生部门变动的员工（内部流动）。
     """
-    return db_get_internal_mobility(pageNo=page, pageSize=10,start_date=start_date, end_date=end_date)
+    return await run_db_shared(db_get_internal_mobility, pageNo=page, pageSize=10,start_date=start_date, end_date=end_date)
 
 
 @router.get('/promotion/recent', tags=['promotion'])
@@ -24,5 +26,5 @@ async def get_recent_promotions(
     """
     查询最近一段时间内发生职称变化（视为晋升）的员工。
     """
-    return db_get_recent_promotions(pageNo=page, pageSize=10,window_days=window_days)
+    return await run_db_shared(db_get_recent_promotions, pageNo=page, pageSize=10,window_days=window_days)
 
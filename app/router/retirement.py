@@ -1,7 +1,10 @@
+from datetime import date
 from fastapi import APIRouter, Query, HTTPException
-from app.db.retirement import db_get_retirement_candidates
+from app.db.retirement import db_get_retirement_candidates, db_get_retirement_projection, retirement_cutoff
+from app.db.dispatch import run_db_shared
+from app.core.responses import FastJSONRoute
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 @router.get('/retirement/age', tags=['retirement'])
 async def get_retirement_candidates(
@@ -26,9 +29,10 @@ async def get_retirement_candidates(
     """
 
     try:
-        result = db_get_retirement_candidates(
+        result = await run_db_shared(
+            db_get_retirement_candidates,
+            born_before=retirement_cutoff(retirement_age),
             dept_no=dept_no, 
-            retirement_age=retirement_age, 
             limit=page_size,
             page=page
         )
@@ -47,5 +51,42 @@ async def get_retirement_candidates(
             },
             "retirement_candidates": result["data"]
         }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Query failed: {str(e)}")
+
+
+@router.get('/retirement/projection', tags=['retirement'])
+async def get_retirement_projection(
+    months: int = Query(12, ge=1, le=120, description="Number of months to project, starting with the current month"),
+    retirement_age: int = Query(65, ge=60, le=70, description="Retirement age threshold. Use 60 for early retirement, 65 for normal retirement"),
+    dept_no: str | None = Query(None, description="Department number (e.g., 'd005'), returns all departments if not specified")
+):
+    """
+    Project how many current employees reach the retirement age within the next N months.
+
+    **Returns:**
+    - total: employees retiring from today until the end of the last projected month
+    - by_month: count per month ("YYYY-MM"), months without retirements included
+    - by_department: count per department, largest first
+
+    **Example:**
+    - GET /retirement/projection?months=6&retirement_age=60&dept_no=d005
+    """
+    try:
+        result = await run_db_shared(
+            db_get_retirement_projection,
+            today=date.today(),
+            months=months,
+            retirement_age=retirement_age,
+            dept_no=dept_no
+        )
+        return {
+            "retirement_age": retirement_age,
+            "months": months,
+            "dept_no_filter": dept_no,
+            **result
+        }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Query failed: {str(e)}")
\ No newline at end of file
@@ -2,8 +2,10 @@ from fastapi import APIRouter, Query, Body
 from pydantic import BaseModel, Field, AliasChoices
 # from sqlalchemy import text, create_engine
 from app.db.salary_db import db_salary_list, db_add_salary, db_update_salary, db_del_salary
+from app.core.responses import FastJSONRoute, ResponseFormat, as_format
+from app.db.dispatch import run_db, run_db_shared
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 class SalaryCreate(BaseModel):
     """
@@ -45,11 +47,14 @@ async def get_salary_list(
     Salary: int | None = Query(None, description="Optional"),
     From_Date: str | None = Query(None, description="Optional"),
     To_Date: str | None = Query(None, description="Optional"),
+    Cursor: str | None = Query(None, description="Optional, keyset cursor (`next_cursor` of the previous page, empty for the first page)"),
+    format: ResponseFormat = Query('json', description="Optional, `columnar` returns {columns, rows} with one array per row"),
 ):
     """
     Obtain salary information and feed to the frontend.
     """
-    return db_salary_list(**locals())
+    params = {name: value for name, value in locals().items() if name != 'format'}
+    return as_format(await run_db_shared(db_salary_list, **params), format)
 
 @router.post('/salary/addition', tags=['Salaries'])
 async def add_salary(payload: SalaryCreate = Body(..., description="Salary creation information, pass as JSON")):
@@ -57,18 +62,18 @@ async def add_salary(payload: SalaryCreate = Body(..., description="Salary creat
     Create a new salary record.
     """
     effective_to_date = '9999-01-01' if payload.to_date is None else payload.to_date
-    return db_add_salary(Employee_ID=payload.emp_no, Salary=payload.salary, From_Date=payload.from_date, To_Date=effective_to_date)
+    return await run_db(db_add_salary, Employee_ID=payload.emp_no, Salary=payload.salary, From_Date=payload.from_date, To_Date=effective_to_date)
 
 @router.put('/salary/update', tags=['Salaries'])
 async def update_dept_emp(payload: SalaryUpdate = Body(..., description="Salary update information, pass as JSON")):
     """
     Update employee salary record end date.
     """
-    return db_update_salary(Employee_ID=payload.emp_no, Salary=payload.salary, From_Date=payload.from_date, To_Date=payload.to_date)
+    return await run_db(db_update_salary, Employee_ID=payload.emp_no, Salary=payload.salary, From_Date=payload.from_date, To_Date=payload.to_date)
 
 @router.delete('/salary/deletion', tags=['Salaries'])
 async def delete_salary(payload: SalaryDelete = Body(..., description="Salary deletion information, pass as JSON")):
     """
     Delete employee salary record.
     """
-    return db_del_salary(Employee_ID=payload.emp_no, Salary=payload.salary)
\ No newline at end of file
+    return await run_db(db_del_salary, Employee_ID=payload.emp_no, Salary=payload.salary)
\ No newline at end of file
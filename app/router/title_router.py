@@ -2,8 +2,10 @@ from fastapi import APIRouter, Query, Body, HTTPException
 from pydantic import BaseModel, Field, AliasChoices, AliasPath
 # from sqlalchemy import text, create_engine
 from app.db.title_db import db_title_list, db_add_title, db_update_title, db_del_title
+from app.core.responses import FastJSONRoute, ResponseFormat, as_format
+from app.db.dispatch import run_db, run_db_shared
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 
 class TitleUpdate(BaseModel):
@@ -70,11 +72,14 @@ async def get_titles_list(
     Title: str | None = Query(None, description="Optional"),
     From_Date: str | None = Query(None, description="Optional"),
     To_Date: str | None = Query(None, description="Optional"),
+    Cursor: str | None = Query(None, description="Optional, keyset cursor (`next_cursor` of the previous page, empty for the first page)"),
+    format: ResponseFormat = Query('json', description="Optional, `columnar` returns {columns, rows} with one array per row"),
 ):
     """
     Obtain title information and feed to the frontend.
     """
-    return db_title_list(**locals())
+    params = {name: value for name, value in locals().items() if name != 'format'}
+    return as_format(await run_db_shared(db_title_list, **params), format)
 
 @router.post('/titles/addition', tags=['Titles'])
 async def add_title(payload: TitleCreate = Body(..., description="Title creation information, pass as JSON")):
@@ -82,7 +87,7 @@ async def add_title(payload: TitleCreate = Body(..., description="Title creation
     Create a new employee title record.
     """
     effective_to_date = '9999-01-01' if payload.to_date is None else payload.to_date
-    return db_add_title(Employee_ID=payload.emp_no, Title=payload.title, From_Date=payload.from_date, To_Date=effective_to_date)
+    return await run_db(db_add_title, Employee_ID=payload.emp_no, Title=payload.title, From_Date=payload.from_date, To_Date=effective_to_date)
 
 @router.put('/titles/update', tags=['Titles'])
 async def update_title(payload: dict = Body(..., description="Title update information, pass as JSON (can be nested in payload)")):
@@ -114,7 +119,8 @@ async def update_title(payload: dict = Body(..., description="Title update infor
             'missing': missing
         })
 
-    return db_update_title(
+    return await run_db(
+        db_update_title,
         Employee_ID=emp_no,
         Title=title,
         From_Date=from_date,
@@ -126,4 +132,4 @@ async def delete_title(payload: TitleDelete = Body(..., description="Title delet
     """
     Delete employee title record.
     """
-    return db_del_title(Employee_ID=payload.emp_no, Title=payload.title)
+    return await run_db(db_del_title, Employee_ID=payload.emp_no, Title=payload.title)
@@ -1,7 +1,9 @@
 from fastapi import APIRouter, Query
 from app.db.transfer import db_get_transfers
+from app.db.dispatch import run_db_shared
+from app.core.responses import FastJSONRoute
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 
 @router.get('/transfer/list', tags=['transfer'])
@@ -13,4 +15,4 @@ async def get_transfers(
     """
     获取部门间调动记录，用于分析内部流动模式。
     """
-    return db_get_transfers(pageNo=page, pageSize=10,start_date=start_date, end_date=end_date)
+    return await run_db_shared(db_get_transfers, pageNo=page, pageSize=10,start_date=start_date, end_date=end_date)
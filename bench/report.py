@@ -0,0 +1,90 @@
+"""
+基准结果的统计与比较：每个场景的 p50/p95/p99 延迟与吞吐，以及与基线的回归判断。
+"""
+
+# 默认比较的指标与容忍度：p95 比基线慢 25% 以上、且至少慢 MIN_DELTA_MS 毫秒才算回归，
+# 避免几毫秒的接口因为抖动误报
+GATE_METRIC = 'p95_ms'
+TOLERANCE = 0.25
+MIN_DELTA_MS = 2.0
+
+
+def percentile(sorted_values, q: float):
+    """
+    q-th percentile (0-100) of an ascending list, with linear interpolation.
+    """
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def summarize(route: str, latencies, errors: int, elapsed: float):
+    """
+    Summary of one scenario run. `latencies` are the seconds of the successful
+    requests; throughput counts every request over the wall time of the run.
+    """
+    values = sorted(latencies)
+    requests = len(values) + errors
+
+    def ms(value):
+        return None if value is None else round(value * 1000, 3)
+
+    return {
+        "route": route,
+        "requests": requests,
+        "errors": errors,
+        "p50_ms": ms(percentile(values, 50)),
+        "p95_ms": ms(percentile(values, 95)),
+        "p99_ms": ms(percentile(values, 99)),
+        "mean_ms": ms(sum(values) / len(values)) if values else None,
+        "throughput_rps": round(requests / elapsed, 2) if elapsed > 0 else None,
+    }
+
+
+def all_failed(result: dict) -> bool:
+    """
+    True when every request of a scenario summary failed.
+    """
+    return result['requests'] > 0 and result['errors'] == result['requests']
+
+
+def compare(baseline: dict, current: dict, metric: str = GATE_METRIC,
+            tolerance: float = TOLERANCE, min_delta_ms: float = MIN_DELTA_MS, names=None):
+    """
+    Compare a run with a baseline (both as written by bench.run).
+
+    A scenario regresses when all its requests fail (in the run or in the
+    baseline, which then has nothing to compare with), when it errors but did
+    not in the baseline, when it is missing from the run, or when `metric` exceeds the baseline by more than
+    `tolerance` (a fraction) and `min_delta_ms`. `names` limits the check to
+    the scenarios that were run. Returns a list of regression messages.
+    """
+    regressions = []
+    for name, base in baseline.get('scenarios', {}).items():
+        if names is not None and name not in names:
+            continue
+        result = current.get('scenarios', {}).get(name)
+        if result is None:
+            regressions.append(f"{name}: not run (in the baseline)")
+            continue
+        if all_failed(result):
+            regressions.append(f"{name}: all {result['requests']} requests failed")
+            continue
+        if all_failed(base):
+            regressions.append(f"{name}: all requests failed in the baseline, nothing to compare with")
+            continue
+        if result['errors'] and not base['errors']:
+            regressions.append(f"{name}: {result['errors']}/{result['requests']} requests failed (none in the baseline)")
+            continue
+        before, after = base.get(metric), result.get(metric)
+        if before is None or after is None:
+            continue
+        if after > before * (1 + tolerance) and after - before > min_delta_ms:
+            regressions.append(
+                f"{name}: {metric} {after:.1f} ms vs {before:.1f} ms in the baseline "
+                f"(+{(after / before - 1) * 100 if before else float('inf'):.0f}%, tolerance {tolerance * 100:.0f}%)"
+            )
+    return regressions
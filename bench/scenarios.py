@@ -0,0 +1,122 @@
+"""
+基准测试的请求场景：每个场景是一个 GET 路由加若干组参数，压测时轮流使用这些参数，
+覆盖列表接口的不同筛选条件、图表、/exec、组织架构、人数变化等。
+写接口会修改数据，不在这里压测（批量写入的性能另行评估）。
+"""
+
+# 样例库里存在的员工编号 / 部门，生成的数据集（data/generate_dataset.py）同样从 10001 开始
+EMP_NO = 10001
+DEPT_NO = 'd005'
+
+# 场景名 -> (路由模板, 参数组列表)；路由模板与 FastAPI 注册的 path 一致，用于检查覆盖情况
+SCENARIOS = {
+    'root': ('/', [{}]),
+    'metrics': ('/metrics', [{}]),
+
+    # 列表接口：首页、深分页、各种筛选条件
+    'employees.list': ('/employees/list', [
+        {'page': 1, 'pageSize': 20},
+        {'page': 50, 'pageSize': 20},
+        {'page': 1, 'pageSize': 20, 'dept_name': 'Development'},
+        {'page': 1, 'pageSize': 20, 'title': 'Senior Engineer', 'gender': 'F'},
+        {'page': 1, 'pageSize': 20, 'salary_min': 60000, 'salary_max': 80000},
+        {'page': 1, 'pageSize': 20, 'hire_date_min': '1990-01-01', 'hire_date_max': '1990-12-31'},
+        {'page': 1, 'pageSize': 20, 'name': 'Georgi'},
+    ]),
+    'employees.detail': ('/employees/{emp_no}', [{'emp_no': EMP_NO}, {'emp_no': EMP_NO + 1000}]),
+    'employees.view': ('/employees/view', [
+        {'Page_Number': 1, 'Row_Count': 20},
+        {'Page_Number': 1, 'Row_Count': 20, 'Department_Number': DEPT_NO},
+        {'Page_Number': 1, 'Row_Count': 20, 'Title': 'Staff', 'Salary_min': 50000},
+        {'Page_Number': 1, 'Row_Count': 20, 'Employee_ID_min': EMP_NO, 'Employee_ID_max': EMP_NO + 5000},
+    ]),
+    'titles.list': ('/titles/list', [
+        {'Page_Number': 1, 'Row_Count': 20},
+        {'Page_Number': 1, 'Row_Count': 20, 'Title': 'Engineer'},
+        {'Page_Number': 1, 'Row_Count': 20, 'Employee_ID': EMP_NO},
+    ]),
+    'dept.list': ('/dept/list', [{'Page_Number': 1, 'Row_Count': 20}, {'Page_Number': 1, 'Row_Count': 20, 'Dept_Name': 'Sales'}]),
+    'departments.detail': ('/departments/detail', [{'Dept_ID': DEPT_NO}]),
+    'dept_manager.list': ('/dept_manager/list', [{'Page_Number': 1, 'Row_Count': 20}]),
+    'dept_manager.list_all': ('/dept_manager/list/all', [
+        {'Page_Number': 1, 'Row_Count': 20},
+        {'Page_Number': 1, 'Row_Count': 20, 'Dept_Number': DEPT_NO},
+    ]),
+    'dept_emp.list': ('/dept_emp/list', [
+        {'Page_Number': 1, 'Row_Count': 20},
+        {'Page_Number': 1, 'Row_Count': 20, 'Dept_Number': DEPT_NO},
+        {'Page_Number': 1, 'Row_Count': 20, 'From_Date': '1995-01-01'},
+    ]),
+    'salary.list': ('/salary/list', [
+        {'Page_Number': 1, 'Row_Count': 20},
+        {'Page_Number': 1, 'Row_Count': 20, 'Employee_ID': EMP_NO},
+        {'Page_Number': 1, 'Row_Count': 20, 'From_Date': '2000-01-01'},
+    ]),
+    # 1000 行的大页：逐行对象与 format=columnar 的序列化开销对比
+    'salary.list.1000': ('/salary/list', [{'Page_Number': 1, 'Row_Count': 1000}]),
+    'salary.list.1000.columnar': ('/salary/list', [{'Page_Number': 1, 'Row_Count': 1000, 'format': 'columnar'}]),
+
+    # 图表（PNG 与 JSON 数据）
+    'chart_1': ('/chart_1', [{}]),
+    'chart_2': ('/chart_2', [{}]),
+    'chart_3': ('/chart_3', [{}]),
+    'chart_4': ('/chart_4', [{}]),
+    'charts.data': ('/charts/{chart_id}/data', [{'chart_id': f'chart_{n}'} for n in range(1, 5)]),
+
+    # /exec
+    'exec': ('/exec', [{'sql': 'SELECT COUNT(*) FROM departments'}]),
+    'exec.readonly': ('/exec/readonly', [{'sql': 'SELECT emp_no, first_name, last_name FROM employees', 'max_rows': 100}]),
+    'exec.explain': ('/exec/explain', [{'sql': f'SELECT * FROM dept_emp WHERE emp_no = {EMP_NO}'}]),
+    'exec.plans': ('/exec/plans', [{}]),
+
+    # 分析类接口
+    'headcount.changes': ('/headcount/changes', [{}, {'granularity': 'month', 'start_year': 1995, 'end_year': 1996}]),
+    'org_chart': ('/org_chart/full', [{}, {'dept_no': DEPT_NO, 'page': 2}]),
+    'org_chart.subtree': ('/org_chart/subtree/{emp_no}', [{'emp_no': EMP_NO + 1}]),
+    'org_chart.departments': ('/org_chart/departments', [{}]),
+    'promotion.internal_mobility': ('/promotion/internal_mobility', [{'start_date': '1995-01-01', 'end_date': '1995-12-31'}]),
+    'promotion.recent': ('/promotion/recent', [{'window_days': 365}]),
+    'transfer.list': ('/transfer/list', [{'start_date': '1995-01-01', 'end_date': '1995-12-31'}]),
+    'retirement.age': ('/retirement/age', [{}, {'retirement_age': 60, 'dept_no': DEPT_NO}]),
+    'retirement.projection': ('/retirement/projection', [{}, {'months': 36, 'retirement_age': 60, 'dept_no': DEPT_NO}]),
+    'long_single_role': ('/long_single_role/candidates', [{'as_of_date': '2000-01-01'}]),
+
+    # 导出（流式响应，读完整个响应体）
+    'export': ('/export/{resource}', [
+        {'resource': 'employees', 'Employee_ID_max': EMP_NO + 5000},
+        {'resource': 'salaries', 'format': 'csv', 'Employee_ID_max': EMP_NO + 500},
+    ]),
+}
+
+# 不压测的 GET 路由（依赖事先记录的数据，或只是示例），覆盖检查时不报告
+SKIPPED_ROUTES = {
+    '/exec/plans/{name}/diff',
+    '/example/list', '/example/pic', '/example/pic/stream',
+}
+
+# 依赖 MySQL 专有语法（SET SESSION、EXPLAIN FORMAT=JSON、AUTO_INCREMENT 建表）或替身库没有生成的
+# 汇总表（headcount_rollup 的构建用到 MAKEDATE、UPDATE ... JOIN）的场景，SQLite 替身库上不压测
+MYSQL_ONLY = {'exec.readonly', 'exec.explain', 'exec.plans', 'headcount.changes'}
+
+
+def request_for(route: str, params: dict):
+    """
+    Fill the path parameters of `route` from `params`; returns (url, remaining query params).
+    """
+    query = dict(params)
+    url = route
+    for name in list(query):
+        placeholder = '{' + name + '}'
+        if placeholder in url:
+            url = url.replace(placeholder, str(query.pop(name)))
+    return url, query
+
+
+def coverage(openapi: dict):
+    """
+    Compare the GET routes of the app's OpenAPI schema with the scenarios.
+    Returns (GET routes without a scenario, scenarios whose route is not registered).
+    """
+    registered = {path for path, operations in openapi.get('paths', {}).items() if 'get' in operations}
+    covered = {route for route, _ in SCENARIOS.values()}
+    return sorted(registered - covered - SKIPPED_ROUTES), sorted(covered - registered)
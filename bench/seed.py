@@ -0,0 +1,150 @@
+"""
+SQLite 替身库：没有本地 MySQL 时，用 data/generate_dataset.py 的生成器建一个小的、
+可复现的 employees 库，让基准测试可以启动应用并压测大部分路由。
+MySQL 的 YEAR()、IF()、DATEDIFF()、LEAST()、CONCAT() 由 register_functions 在每个连接上注册同名函数代替；
+其余用到 SQLite 不支持的语法（SET SESSION、AUTO_INCREMENT 建表、UPDATE ... JOIN ...）的场景只在 MySQL 上压测
+（见 bench/scenarios.py 的 MYSQL_ONLY）。要得到有意义的数字请使用本地 MySQL。
+"""
+import os
+import re
+import sqlite3
+from datetime import date
+import numpy as np
+
+from data.generate_dataset import generate_block, pick_managers, render, DEPARTMENTS, SCHEMA, FIRST_EMP_NO, BLOCK_SIZE
+from app.db import employee_current, employee_profile_history, employee_transitions
+
+# 基础表，与 data/employees.sql 相同的列和主键（SQLite 语法）
+BASE_TABLES = """
+CREATE TABLE employees (
+    emp_no INT NOT NULL, birth_date DATE NOT NULL, first_name VARCHAR(14) NOT NULL,
+    last_name VARCHAR(16) NOT NULL, gender CHAR(1) NOT NULL, hire_date DATE NOT NULL,
+    PRIMARY KEY (emp_no)
+);
+CREATE TABLE departments (dept_no CHAR(4) NOT NULL, dept_name VARCHAR(40) NOT NULL UNIQUE, PRIMARY KEY (dept_no));
+CREATE TABLE dept_manager (
+    emp_no INT NOT NULL, dept_no CHAR(4) NOT NULL, from_date DATE NOT NULL, to_date DATE NOT NULL,
+    PRIMARY KEY (emp_no, dept_no)
+);
+CREATE TABLE dept_emp (
+    emp_no INT NOT NULL, dept_no CHAR(4) NOT NULL, from_date DATE NOT NULL, to_date DATE NOT NULL,
+    PRIMARY KEY (emp_no, dept_no)
+);
+CREATE TABLE titles (
+    emp_no INT NOT NULL, title VARCHAR(50) NOT NULL, from_date DATE NOT NULL, to_date DATE,
+    PRIMARY KEY (emp_no, title, from_date)
+);
+CREATE TABLE salaries (
+    emp_no INT NOT NULL, salary INT NOT NULL, from_date DATE NOT NULL, to_date DATE NOT NULL,
+    PRIMARY KEY (emp_no, from_date)
+);
+CREATE INDEX idx_dept_emp_dept_no ON dept_emp (dept_no);
+CREATE INDEX idx_dept_manager_dept_no ON dept_manager (dept_no);
+"""
+
+# 派生表：(表名, 建表语句, 列, 查询)，由应用自己的定义换成 SQLite 语法
+DERIVED_TABLES = (
+    ('employee_current', employee_current.create_table_sql,
+     employee_current.columns, employee_current.select_snapshot_sql),
+    ('employee_profile_history', employee_profile_history.create_table_sql,
+     employee_profile_history.columns, employee_profile_history.select_history_sql),
+    ('employee_transitions', employee_transitions.create_table_sql,
+     employee_transitions.columns, employee_transitions.select_transitions_sql.format(where='')),
+)
+
+_MYSQL_ONLY_DEFINITION = re.compile(r'^\s*(KEY|UNIQUE\s+KEY|INDEX|FOREIGN\s+KEY|CONSTRAINT)\b', re.I)
+
+
+def sqlite_ddl(create_sql: str) -> str:
+    """
+    CREATE TABLE statement of the app translated to SQLite: secondary keys and
+    foreign keys dropped, ENUM / TINYINT columns as TEXT / INTEGER.
+    """
+    lines = [line for line in create_sql.strip().splitlines() if not _MYSQL_ONLY_DEFINITION.match(line)]
+    ddl = '\n'.join(lines)
+    ddl = re.sub(r'ENUM\s*\([^)]*\)', 'TEXT', ddl, flags=re.I)
+    ddl = re.sub(r'TINYINT\(\d+\)', 'INTEGER', ddl, flags=re.I)
+    # 删掉最后一列定义后多余的逗号
+    return re.sub(r',\s*\)\s*$', '\n)', ddl)
+
+
+def _day(value):
+    # 日期在替身库中存为 'YYYY-MM-DD' 字符串
+    return date.fromisoformat(str(value)[:10])
+
+
+def _year(value):
+    return None if value is None else _day(value).year
+
+
+def _datediff(end, start):
+    return None if end is None or start is None else (_day(end) - _day(start)).days
+
+
+def _if(condition, then, otherwise):
+    return then if condition else otherwise
+
+
+def _least(*values):
+    return None if None in values else min(values)
+
+
+def _concat(*values):
+    # 与 MySQL 相同：任一参数为 NULL 时结果为 NULL
+    return None if None in values else ''.join(str(value) for value in values)
+
+
+def register_functions(dbapi_conn, connection_record=None):
+    """
+    Register SQLite versions of the MySQL functions the routes use (YEAR(), IF(),
+    DATEDIFF(), LEAST(), CONCAT()) on a sqlite3 connection; usable as a SQLAlchemy
+    'connect' event listener.
+    """
+    dbapi_conn.create_function('YEAR', 1, _year, deterministic=True)
+    dbapi_conn.create_function('DATEDIFF', 2, _datediff, deterministic=True)
+    dbapi_conn.create_function('IF', 3, _if, deterministic=True)
+    dbapi_conn.create_function('LEAST', -1, _least, deterministic=True)
+    dbapi_conn.create_function('CONCAT', -1, _concat, deterministic=True)
+
+
+def _insert(conn, table, columns):
+    # 与 dump 相同的字符串格式写入（日期为 'YYYY-MM-DD'）
+    dump, lines, rows = render(table, columns, tsv=True)
+    values = [line.split(b'\t') for line in lines.splitlines()]
+    placeholders = ', '.join('?' * len(SCHEMA[table]))
+    conn.executemany(
+        f'INSERT INTO {table} VALUES ({placeholders})',
+        ([value.decode() for value in row] for row in values),
+    )
+    return rows
+
+
+def seed_sqlite(path: str, employees: int = 20000, seed: int = 0):
+    """
+    Create a SQLite employees database at `path` with `employees` generated
+    employees (same generator and seed semantics as data/generate_dataset.py)
+    and the derived tables the list endpoints read. Returns {table: rows}.
+    """
+    if os.path.exists(path):
+        os.remove(path)
+    counts = {}
+    conn = sqlite3.connect(path)
+    try:
+        conn.executescript(BASE_TABLES)
+        staff = []
+        for block, first in enumerate(range(0, employees, BLOCK_SIZE)):
+            data = generate_block(seed, block, FIRST_EMP_NO + first, min(BLOCK_SIZE, employees - first))
+            for table in ('employees', 'dept_emp', 'titles', 'salaries'):
+                counts[table] = counts.get(table, 0) + _insert(conn, table, data[table])
+            staff.append(data['staff'])
+        counts['departments'] = _insert(conn, 'departments', list(zip(*DEPARTMENTS)))
+        counts['dept_manager'] = _insert(
+            conn, 'dept_manager', pick_managers(seed, tuple(np.concatenate(column) for column in zip(*staff))))
+
+        for table, create_sql, columns, select_sql in DERIVED_TABLES:
+            conn.execute(sqlite_ddl(create_sql))
+            counts[table] = conn.execute(f'INSERT OR IGNORE INTO {table} ({columns}) {select_sql}').rowcount
+        conn.commit()
+    finally:
+        conn.close()
+    return counts
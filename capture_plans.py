@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+执行计划记录脚本
+部署后运行：记录应用重点查询的执行计划，并与上一次部署比较；
+出现计划退化（如索引失效导致全表扫描）时以非零状态码退出
+用法: python capture_plans.py [部署标识]
+"""
+
+import sys
+
+from app.db.query_plans import capture_plans, db_diff_plans
+
+
+def main(deployment=None):
+    regressions = 0
+    for captured in capture_plans(deployment=deployment):
+        name = captured['name']
+        diff = db_diff_plans(name, target=deployment) if captured['changed'] else None
+        if diff is None:
+            status = "首次记录" if captured['changed'] is None else "未变化"
+            print(f"✓ {name}: {status} ({captured['plan_digest'][:12]})")
+            continue
+        if diff['regressions']:
+            regressions += 1
+            print(f"✗ {name}: 计划退化 (对比 {diff['base']['deployment']})")
+        else:
+            print(f"• {name}: 计划变化 (对比 {diff['base']['deployment']})")
+        for change in diff['changes']:
+            print(f"    {change}")
+    return regressions
+
+
+if __name__ == "__main__":
+    print("开始记录执行计划...")
+    count = main(sys.argv[1] if len(sys.argv) > 1 else None)
+    print(f"\n完成，{count} 个查询计划退化")
+    sys.exit(1 if count else 0)
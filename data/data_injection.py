@@ -1,6 +1,11 @@
 import mysql.connector
 from mysql.connector import errorcode
+import argparse
 import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 # --- 1. DATABASE CONFIGURATION ---
 DB_CONFIG = {
@@ -11,9 +16,10 @@ DB_CONFIG = {
 }
 DB_NAME = 'employees'
 
-# --- 2. LIST OF ALL SQL/DUMP FILES IN THE CORRECT ORDER ---
-SQL_FILES_TO_LOAD = [
-    'employees.sql',
+# --- 2. FILES TO LOAD ---
+# Schema first, then the data dumps (loaded in parallel), then the report.
+SCHEMA_FILE = 'employees.sql'
+DUMP_FILES = [
     'load_departments.dump',
     'load_employees.dump',
     'load_dept_emp.dump',
@@ -22,65 +28,383 @@ SQL_FILES_TO_LOAD = [
     'load_salaries1.dump',
     'load_salaries2.dump',
     'load_salaries3.dump',
-    'show_elapsed.sql'
 ]
+REPORT_FILE = 'show_elapsed.sql'
+# Expected counts / CRCs are read from here (EXPECTED=(table:count:crc ...))
+CHECKSUM_FILE = 'sql_test.sh'
+
+# Commit every N statements while loading a dump (bounds the undo log)
+COMMIT_EVERY = 50
+
+# Parallel connections used for the dumps and for verification
+LOAD_WORKERS = 4
+
+
+# --- 3. STREAMING STATEMENT TOKENIZER ---
+# Reads a file line by line and yields one statement at a time. It knows about
+# quoted strings ('...', "...", `...` with backslash escapes), -- and # line comments
+# and /* */ block comments, so a ';' inside any of them does not end a statement.
+# /*! ... */ version comments are kept, MySQL executes them.
+_NORMAL = re.compile(r"['\"`;#]|--(?=\s)|/\*")
+_QUOTE_END = {
+    "'": re.compile(r"\\[\s\S]|'"),
+    '"': re.compile(r'\\[\s\S]|"'),
+    '`': re.compile(r'`'),
+}
+_CLIENT_COMMAND = re.compile(r'^(source|\\\.)\s', re.I)
+
+
+def iter_statements(path):
+    """
+    Yield the SQL statements of a file one by one, without reading it whole.
+    mysql client commands (`source file`) are skipped.
+    """
+    parts = []
+    quote = None
+    in_comment = False
+
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            pos = 0
+            while pos < len(line):
+                if in_comment:
+                    end = line.find('*/', pos)
+                    if end < 0:
+                        break
+                    pos = end + 2
+                    in_comment = False
+                    continue
+
+                if quote:
+                    m = _QUOTE_END[quote].search(line, pos)
+                    if m is None:
+                        parts.append(line[pos:])
+                        break
+                    parts.append(line[pos:m.end()])
+                    pos = m.end()
+                    if m.group() == quote:
+                        quote = None
+                    continue
+
+                m = _NORMAL.search(line, pos)
+                if m is None:
+                    parts.append(line[pos:])
+                    break
+                parts.append(line[pos:m.start()])
+                token = m.group()
+                pos = m.end()
+
+                if token == ';':
+                    statement = ''.join(parts).strip()
+                    parts = []
+                    if statement and not _CLIENT_COMMAND.match(statement):
+                        yield statement
+                elif token in _QUOTE_END:
+                    quote = token
+                    parts.append(token)
+                elif token == '/*':
+                    if line.startswith('/*!', m.start()):
+                        parts.append(token)
+                    else:
+                        in_comment = True
+                else:
+                    # -- / # comment: skip the rest of the line
+                    parts.append('\n')
+                    break
+
+    statement = ''.join(parts).strip()
+    if statement and not _CLIENT_COMMAND.match(statement):
+        yield statement
+
+
+# --- 4. DEFERRED SECONDARY INDEXES ---
+# Tables are created with their primary key only; unique / secondary keys and
+# foreign keys (which need an index on the referencing columns) are added once
+# the data is in, which is much cheaper than maintaining them row by row.
+_CREATE_TABLE = re.compile(r'^\s*CREATE\s+TABLE\s+`?(\w+)`?\s*\((.*)\)([^)]*)$', re.I | re.S)
+_SECONDARY_KEY = re.compile(r'^(FOREIGN\s+KEY|UNIQUE\b|KEY\b|INDEX\b|CONSTRAINT\b)', re.I)
+
+
+def _split_definitions(body):
+    definitions, depth, current = [], 0, []
+    for char in body:
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        if char == ',' and depth == 0:
+            definitions.append(''.join(current).strip())
+            current = []
+        else:
+            current.append(char)
+    definitions.append(''.join(current).strip())
+    return [d for d in definitions if d]
+
+
+def defer_secondary_keys(statement):
+    """
+    For a CREATE TABLE statement, return (statement without secondary keys,
+    table name, [deferred key definitions]); other statements are returned unchanged.
+    """
+    m = _CREATE_TABLE.match(statement)
+    if not m:
+        return statement, None, []
+    table, body, options = m.groups()
+    keep, deferred = [], []
+    for definition in _split_definitions(body):
+        (deferred if _SECONDARY_KEY.match(definition) else keep).append(' '.join(definition.split()))
+    create = f"CREATE TABLE {table} (\n    " + ",\n    ".join(keep) + f"\n){options}"
+    return create, table, deferred
+
+
+# --- 5. LOAD DATA LOCAL INFILE CONVERSION (optional) ---
+_INSERT = re.compile(r'^\s*INSERT\s+INTO\s+`?(\w+)`?\s+VALUES\s*', re.I)
+_ROW = re.compile(r"\(((?:'(?:[^'\\]|\\.|'')*'|[^'()])*)\)", re.S)
+_FIELD = re.compile(r"'((?:[^'\\]|\\.|'')*)'|([^,\s]+)", re.S)
+_UNESCAPE = re.compile(r"\\(.)|''", re.S)
+_MYSQL_ESCAPES = {'0': '\0', 'b': '\b', 'n': '\n', 'r': '\r', 't': '\t', 'Z': '\x1a'}
+
+
+def _tsv_field(quoted, bare):
+    if bare is not None:
+        return '\\N' if bare.upper() == 'NULL' else bare
+    value = _UNESCAPE.sub(lambda m: _MYSQL_ESCAPES.get(m.group(1), m.group(1)) if m.group(1) else "'", quoted)
+    return value.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n')
+
+
+def convert_dump(path):
+    """
+    Convert an INSERT dump to a tab separated file next to it (<dump>.tsv) for
+    LOAD DATA LOCAL INFILE. Reuses an existing conversion newer than the dump.
+    Returns (table, tsv path).
+    """
+    tsv_path = path + '.tsv'
+    table_path = path + '.table'
+    if (os.path.exists(tsv_path) and os.path.exists(table_path)
+            and os.path.getmtime(tsv_path) >= os.path.getmtime(path)):
+        with open(table_path, 'r', encoding='utf-8') as f:
+            return f.read().strip(), tsv_path
+
+    table = None
+    with open(tsv_path, 'w', encoding='utf-8', newline='\n') as out:
+        for statement in iter_statements(path):
+            m = _INSERT.match(statement)
+            if not m:
+                raise ValueError(f"{os.path.basename(path)}: only INSERT ... VALUES statements can be converted")
+            if table is not None and m.group(1) != table:
+                raise ValueError(f"{os.path.basename(path)}: more than one table in the dump")
+            table = m.group(1)
+            for row in _ROW.finditer(statement, m.end()):
+                fields = [_tsv_field(*field.groups()) for field in _FIELD.finditer(row.group(1))]
+                out.write('\t'.join(fields) + '\n')
+    with open(table_path, 'w', encoding='utf-8') as f:
+        f.write(table or '')
+    return table, tsv_path
+
+
+# --- 6. LOADING ---
+def connect(**extra):
+    return mysql.connector.connect(**DB_CONFIG, **extra)
+
+
+def _execute(cursor, statement):
+    cursor.execute(statement)
+    if cursor.with_rows:
+        return cursor.fetchall() # Fetch rows to clear the buffer
+    return None
+
+
+def _prepare_session(cursor):
+    # Constraints are checked at the end (deferred keys + verification), not per row
+    cursor.execute("SET SESSION unique_checks = 0")
+    cursor.execute("SET SESSION foreign_key_checks = 0")
+
+
+def load_schema(script_dir):
+    """
+    Run the schema script with secondary keys stripped from CREATE TABLE.
+    Returns {table: [deferred key definitions]}.
+    """
+    deferred = {}
+    connection = connect()
+    try:
+        cursor = connection.cursor()
+        for statement in iter_statements(os.path.join(script_dir, SCHEMA_FILE)):
+            statement, table, keys = defer_secondary_keys(statement)
+            if keys:
+                deferred[table] = keys
+            _execute(cursor, statement)
+        connection.commit()
+    finally:
+        connection.close()
+    return deferred
+
+
+def load_dump(path, load_data=False):
+    """
+    Load one dump file on its own connection. Returns (file, statements, seconds).
+    """
+    started = time.perf_counter()
+    connection = connect(database=DB_NAME, allow_local_infile=load_data)
+    statements = 0
+    try:
+        cursor = connection.cursor()
+        _prepare_session(cursor)
+        if load_data:
+            table, tsv_path = convert_dump(path)
+            cursor.execute(
+                f"LOAD DATA LOCAL INFILE '{tsv_path.replace(chr(92), '/')}' INTO TABLE `{table}` "
+                "CHARACTER SET utf8mb4 FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n'"
+            )
+            statements = 1
+        else:
+            for statement in iter_statements(path):
+                _execute(cursor, statement)
+                statements += 1
+                if statements % COMMIT_EVERY == 0:
+                    connection.commit()
+        connection.commit()
+    finally:
+        connection.close()
+    return os.path.basename(path), statements, time.perf_counter() - started
+
+
+def add_deferred_keys(deferred):
+    """
+    Add the secondary keys and foreign keys stripped from the schema, one ALTER per table.
+    """
+    connection = connect(database=DB_NAME)
+    try:
+        cursor = connection.cursor()
+        # The data is verified against sql_test.sh instead of row by row here (allows INPLACE)
+        cursor.execute("SET SESSION foreign_key_checks = 0")
+        for table, keys in deferred.items():
+            started = time.perf_counter()
+            cursor.execute(f"ALTER TABLE {table} " + ", ".join(f"ADD {key}" for key in keys))
+            print(f"  indexed {table} ({len(keys)} keys, {time.perf_counter() - started:.1f}s)")
+        connection.commit()
+    finally:
+        connection.close()
+
+
+# --- 7. VERIFICATION ---
+def read_expected(script_dir):
+    """
+    {table: (count, crc)} from the EXPECTED list of sql_test.sh.
+    """
+    with open(os.path.join(script_dir, CHECKSUM_FILE), 'r', encoding='utf-8') as f:
+        content = f.read()
+    block = re.search(r'EXPECTED=\((.*?)\)', content, re.S)
+    return {
+        table: (int(count), int(crc))
+        for table, count, crc in re.findall(r'(\w+):(\d+):(\d+)', block.group(1) if block else '')
+    }
+
+
+def _table_check(table):
+    connection = connect(database=DB_NAME)
+    try:
+        cursor = connection.cursor()
+        count = _execute(cursor, f"SELECT COUNT(*) FROM {table}")[0][0]
+        crc = _execute(cursor, f"CHECKSUM TABLE {table}")[0][1]
+    finally:
+        connection.close()
+    return table, count, crc
+
+
+def verify(script_dir, workers):
+    """
+    Compare row counts and CHECKSUM TABLE with sql_test.sh. Returns True if all match.
+    """
+    expected = read_expected(script_dir)
+    print(f"\n{'table':<15} {'count':>10}     {'crc':>15}")
+    print('--------------- ----------     ---------------')
+    ok = True
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for table, count, crc in pool.map(_table_check, sorted(expected)):
+            expected_count, expected_crc = expected[table]
+            count_result = 'OK' if count == expected_count else 'DIFFERS'
+            crc_result = 'OK' if crc == expected_crc else 'DIFFERS'
+            ok = ok and count_result == crc_result == 'OK'
+            print(f"{table:<15} {count:>10,}     {crc or 0:>15,} ({count_result:<7} {crc_result:<7})")
+    return ok
+
 
 def main():
     """
-    Connects to MySQL and executes all required SQL files by splitting them
-    into individual statements and consuming any results produced along the way.
+    Create the schema, load the dumps in parallel connections, add the deferred
+    indexes and verify the result against sql_test.sh.
     """
-    
+    parser = argparse.ArgumentParser(description="Load the employees sample database.")
+    parser.add_argument('--workers', type=int, default=LOAD_WORKERS, help="parallel connections (default %(default)s)")
+    parser.add_argument('--load-data', action='store_true',
+                        help="convert the dumps to tab separated files and use LOAD DATA LOCAL INFILE "
+                             "(needs local_infile enabled on the server)")
+    parser.add_argument('--no-verify', action='store_true', help="skip the count / CRC check")
+    parser.add_argument('--data-dir', help="directory of the dumps, e.g. the output of generate_dataset.py "
+                                           "(default: the sample next to this script)")
+    args = parser.parse_args()
+
     try:
         script_dir = os.path.dirname(os.path.abspath(__file__))
     except NameError:
         script_dir = os.getcwd()
 
-    full_sql_script = ""
-    print("Reading and combining all SQL files...")
-
-    for filename in SQL_FILES_TO_LOAD:
-        file_path = os.path.join(script_dir, filename)
-        if not os.path.exists(file_path):
-            print(f"FATAL ERROR: Required file not found: {file_path}")
-            return
-        
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read().replace('\r\n', '\n')
-            lines = [line for line in content.split('\n') if not line.strip().lower().startswith('source ')]
-            full_sql_script += "\n".join(lines)
-    
-    print("All files loaded and combined.")
-    
-    connection = None
+    data_dir = os.path.abspath(args.data_dir) if args.data_dir else script_dir
+    paths = [os.path.join(data_dir, filename) for filename in DUMP_FILES]
+    missing = [path for path in paths if not os.path.exists(path)]
+    if missing:
+        for path in missing:
+            print(f"FATAL ERROR: Required file not found: {path}")
+        return 1
+    # Largest dumps first, so the long salary loads start right away
+    paths.sort(key=os.path.getsize, reverse=True)
+
+    started = time.perf_counter()
     try:
-        connection = mysql.connector.connect(**DB_CONFIG)
-        cursor = connection.cursor()
-        print("Executing combined SQL script... This will take several minutes.")
+        print("Creating database structure (secondary keys deferred)...")
+        deferred = load_schema(script_dir)
 
-        sql_statements = full_sql_script.split(';')
+        print(f"Loading {len(paths)} dumps with {args.workers} connections...")
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            futures = [pool.submit(load_dump, path, args.load_data) for path in paths]
+            for future in futures:
+                name, statements, seconds = future.result()
+                print(f"  loaded {name} ({statements} statements, {seconds:.1f}s)")
 
-        for statement in sql_statements:
-            if statement.strip():
-                cursor.execute(statement)
-                if cursor.with_rows:
-                    cursor.fetchall() # Fetch and discard rows to clear the buffer
+        print("Adding deferred keys...")
+        add_deferred_keys(deferred)
 
-        connection.commit()
-        print("\nAll scripts executed successfully! The 'employees' database is now populated.")
+        connection = connect(database=DB_NAME)
+        try:
+            cursor = connection.cursor()
+            for statement in iter_statements(os.path.join(script_dir, REPORT_FILE)):
+                for row in _execute(cursor, statement) or ():
+                    print(f"  {cursor.column_names[0]}: {row[0]}")
+        finally:
+            connection.close()
+        print(f"\nAll data loaded in {time.perf_counter() - started:.1f}s.")
+
+        if not args.no_verify:
+            # Generated datasets have no sql_test.sh of their own
+            if not os.path.exists(os.path.join(data_dir, CHECKSUM_FILE)):
+                print(f"\nNo {CHECKSUM_FILE} in {data_dir}, verification skipped.")
+            elif not verify(data_dir, args.workers):
+                print("\nVerification FAILED: some tables differ from sql_test.sh.")
+                return 1
 
     except mysql.connector.Error as err:
         if err.errno == errorcode.ER_ACCESS_DENIED_ERROR:
             print("Authentication Error: Please check your MySQL username and password.")
         else:
             print(f"A MySQL error occurred: {err}")
+        return 1
     except Exception as e:
         print(f"An unexpected error occurred: {e}")
-    finally:
-        if connection and connection.is_connected():
-            cursor.close()
-            connection.close()
-            print("MySQL connection closed.")
+        return 1
+
+    print("The 'employees' database is now populated.")
+    return 0
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    sys.exit(main())
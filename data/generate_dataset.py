@@ -0,0 +1,369 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import numpy as np
+
+# Synthetic employees dataset for scale testing.
+#
+# Produces the same tables as the sample (departments, employees, dept_emp,
+# dept_manager, titles, salaries) at `--scale` times its size, written in the
+# dump format data_injection.py loads:
+#
+#   python generate_dataset.py --scale 10 --out generated --tsv
+#   python data_injection.py --data-dir generated --load-data --workers 8
+#
+# Generation is vectorized and done in blocks of BLOCK_SIZE employees. Every
+# block has its own random stream derived from (seed, block number), so the
+# output only depends on --seed and --scale.
+
+# --- 1. SHAPE OF THE SAMPLE ---
+SAMPLE_EMPLOYEES = 300024
+FIRST_EMP_NO = 10001
+BLOCK_SIZE = 100000        # employees generated at a time (bounds memory; part of the seed)
+ROWS_PER_INSERT = 5000     # rows per INSERT statement in the dumps
+SALARY_DUMPS = 3           # salaries are split like load_salaries1/2/3.dump
+MANAGER_STREAM = 2 ** 31   # random stream of dept_manager (block numbers stay below it)
+
+BIRTH_RANGE = ('1952-02-01', '1965-02-01')
+HIRE_RANGE = ('1985-01-01', '2000-01-28')
+# Last date of the sample; histories stop here
+CUTOFF = np.datetime64('2002-08-01')
+CURRENT = np.datetime64('9999-01-01')
+
+DEPARTMENTS = [
+    ('d001', 'Marketing'),
+    ('d002', 'Finance'),
+    ('d003', 'Human Resources'),
+    ('d004', 'Production'),
+    ('d005', 'Development'),
+    ('d006', 'Quality Management'),
+    ('d007', 'Sales'),
+    ('d008', 'Research'),
+    ('d009', 'Customer Service'),
+]
+# Share of the employees per department (as in the sample)
+DEPARTMENT_WEIGHTS = np.array([0.061, 0.051, 0.053, 0.222, 0.256, 0.060, 0.157, 0.064, 0.076])
+ENGINEERING = np.array([d in ('d004', 'd005', 'd006', 'd008') for d, _ in DEPARTMENTS])
+MANAGERS_PER_DEPARTMENT = (2, 4)
+
+MALE_SHARE = 0.6
+LEFT_SHARE = 0.2           # employees whose history ends before the cutoff
+TRANSFER_SHARE = 0.1       # employees who changed department once
+PROMOTION_SHARE = 0.5      # employees who hold a second title
+
+# Titles and the title each one is promoted to (itself: no promotion)
+TITLES = np.array(['Assistant Engineer', 'Engineer', 'Senior Engineer', 'Staff',
+                   'Senior Staff', 'Technique Leader'])
+ASSISTANT, ENGINEER, SENIOR_ENGINEER, STAFF, SENIOR_STAFF, LEADER = range(len(TITLES))
+PROMOTED = np.array([ENGINEER, SENIOR_ENGINEER, SENIOR_ENGINEER, SENIOR_STAFF, SENIOR_STAFF, LEADER])
+
+FIRST_NAMES = np.array([
+    'Georgi', 'Bezalel', 'Parto', 'Chirstian', 'Kyoichi', 'Anneke', 'Tzvetan', 'Saniya', 'Sumant',
+    'Duangkaew', 'Mary', 'Patricio', 'Eberhardt', 'Berni', 'Guoxiang', 'Kazuhito', 'Cristinel',
+    'Kazuhide', 'Lillian', 'Mayuko', 'Ramzi', 'Shahaf', 'Bojan', 'Suzette', 'Prasadram', 'Yongqiao',
+    'Divier', 'Domenick', 'Otmar', 'Elvis', 'Karsten', 'Jeong', 'Arif', 'Bader', 'Alain', 'Adamantios',
+    'Pradeep', 'Huan', 'Alejandro', 'Weiyi', 'Uri', 'Magy', 'Yishay', 'Mingsen', 'Moss', 'Lucien',
+    'Zvonko', 'Florian', 'Basil', 'Yinghua', 'Hidefumi', 'Heping', 'Sanjiv', 'Mayumi', 'Gino',
+    'Udi', 'Jayson', 'Christ', 'Premal', 'Tse', 'Ebbe', 'Hironoby', 'Valter', 'Hironobu',
+])
+LAST_NAMES = np.array([
+    'Facello', 'Simmel', 'Bamford', 'Koblick', 'Maliniak', 'Preusig', 'Zielinski', 'Kalloufi', 'Peac',
+    'Piveteau', 'Sluis', 'Bridgland', 'Terkki', 'Genin', 'Nooteboom', 'Cappelletti', 'Bouloucos',
+    'Peha', 'Haddadi', 'Warwick', 'Erde', 'Famili', 'Montemayor', 'Pettey', 'Heyers', 'Berztiss',
+    'Reistad', 'Tempesti', 'Herbst', 'Demeyer', 'Joslin', 'Reistad', 'Merlo', 'Swan', 'Chappelet',
+    'Portugali', 'Lenart', 'Lortz', 'Brender', 'Meriste', 'Lenart', 'Stamatiou', 'Tramer', 'Casley',
+    'Shanbhogue', 'Rosenbaum', 'Syrotiuk', 'Kambil', 'Waschkowski', 'Mandell', 'Schusler', 'Speek',
+    'Zschoche', 'Gubsky', 'Leonhardt', 'Nyanchama', 'Pocchiola', 'Cooley', 'Baek', 'Peyn', 'Falck',
+])
+
+
+# --- 2. GENERATION ---
+def _random_dates(rng, low, high, size):
+    """Uniform dates in [low, high) as datetime64[D]; low / high may be arrays."""
+    low = np.asarray(low, dtype='datetime64[D]')
+    high = np.asarray(high, dtype='datetime64[D]')
+    span = np.maximum((high - low).astype(np.int64), 1)
+    return low + (rng.random(size) * span).astype(np.int64)
+
+
+def generate_block(seed, block, first_emp_no, size):
+    """
+    Generate `size` employees starting at `first_emp_no` with their department,
+    title and salary histories. Returns {table: (columns...)} of NumPy arrays.
+    """
+    rng = np.random.default_rng([seed, block])
+    emp_no = np.arange(first_emp_no, first_emp_no + size, dtype=np.int64)
+
+    # employees
+    birth_date = _random_dates(rng, *BIRTH_RANGE, size)
+    hire_date = _random_dates(rng, *HIRE_RANGE, size)
+    gender = np.where(rng.random(size) < MALE_SHARE, 'M', 'F')
+    first_name = FIRST_NAMES[rng.integers(len(FIRST_NAMES), size=size)]
+    last_name = LAST_NAMES[rng.integers(len(LAST_NAMES), size=size)]
+
+    # End of the employment: a leave date for some, otherwise still employed
+    left = rng.random(size) < LEFT_SHARE
+    leave_date = _random_dates(rng, hire_date + 365, np.maximum(CUTOFF, hire_date + 366), size)
+    end_date = np.where(left, leave_date, CURRENT)
+    last_day = np.where(left, leave_date, CUTOFF)
+
+    # dept_emp: one department, or two for those who moved (the second differs from the first)
+    dept = rng.choice(len(DEPARTMENTS), size=size, p=DEPARTMENT_WEIGHTS / DEPARTMENT_WEIGHTS.sum())
+    moved = np.flatnonzero(rng.random(size) < TRANSFER_SHARE)
+    moved_on = _random_dates(rng, hire_date[moved] + 1, last_day[moved], len(moved))
+    new_dept = (dept[moved] + rng.integers(1, len(DEPARTMENTS), size=len(moved))) % len(DEPARTMENTS)
+    first_end = end_date.copy()
+    first_end[moved] = moved_on
+    current_dept = dept.copy()
+    current_dept[moved] = new_dept
+    dept_emp = (
+        np.concatenate([emp_no, emp_no[moved]]),
+        np.concatenate([dept, new_dept]),
+        np.concatenate([hire_date, moved_on]),
+        np.concatenate([first_end, end_date[moved]]),
+    )
+
+    # titles: engineering departments follow the engineer track, the others the staff track
+    roll = rng.random(size)
+    first_title = np.where(
+        ENGINEERING[dept],
+        np.select([roll < 0.1, roll < 0.9], [LEADER, ENGINEER], ASSISTANT),
+        STAFF,
+    )
+    promoted = np.flatnonzero((rng.random(size) < PROMOTION_SHARE) & (PROMOTED[first_title] != first_title))
+    promoted_on = _random_dates(rng, hire_date[promoted] + 1, last_day[promoted], len(promoted))
+    title_end = end_date.copy()
+    title_end[promoted] = promoted_on
+    titles = (
+        np.concatenate([emp_no, emp_no[promoted]]),
+        np.concatenate([first_title, PROMOTED[first_title[promoted]]]),
+        np.concatenate([hire_date, promoted_on]),
+        np.concatenate([title_end, end_date[promoted]]),
+    )
+
+    # salaries: one row per year of employment, with a yearly raise of 0-7%
+    years = ((last_day - hire_date).astype(np.int64) // 365 + 1).astype(np.int64)
+    owner = np.repeat(np.arange(size), years)
+    starts = np.cumsum(years) - years
+    year = np.arange(len(owner)) - starts[owner]
+    growth = np.log1p(rng.uniform(0.0, 0.07, size=len(owner)))
+    growth[starts] = 0.0
+    growth = np.cumsum(growth)
+    growth -= growth[starts][owner]
+    start_salary = np.clip(rng.normal(52000, 9000, size=size), 38623, None)
+    salary = (start_salary[owner] * np.exp(growth)).astype(np.int64)
+    from_date = hire_date[owner] + year * 365
+    to_date = from_date + 365
+    last = starts + years - 1
+    to_date[last] = end_date
+    salaries = (emp_no[owner], salary, from_date, to_date)
+
+    return {
+        'employees': (emp_no, birth_date, first_name, last_name, gender, hire_date),
+        'dept_emp': dept_emp,
+        'titles': titles,
+        'salaries': salaries,
+        # Candidates for dept_manager: employees still in their department at the cutoff
+        'staff': (emp_no[~left], current_dept[~left], hire_date[~left]),
+    }
+
+
+def pick_managers(seed, staff):
+    """
+    dept_manager rows: a few consecutive managers per department, chosen among
+    its current employees in hiring order. Returns (emp_no, dept, from, to).
+    """
+    rng = np.random.default_rng([seed, MANAGER_STREAM])
+    emp_no, dept, hire_date = staff
+    rows = ([], [], [], [])
+    for index in range(len(DEPARTMENTS)):
+        candidates = np.flatnonzero(dept == index)
+        count = min(len(candidates), rng.integers(MANAGERS_PER_DEPARTMENT[0], MANAGERS_PER_DEPARTMENT[1] + 1))
+        chosen = rng.choice(candidates, size=count, replace=False)
+        chosen = chosen[np.argsort(hire_date[chosen], kind='stable')]
+        starts = hire_date[chosen]
+        ends = np.append(starts[1:], CURRENT)
+        for column, values in zip(rows, (emp_no[chosen], np.full(count, index), starts, ends)):
+            column.append(values)
+    return tuple(np.concatenate(column) for column in rows)
+
+
+# --- 3. OUTPUT ---
+# Column kinds; 'int' is written bare, everything else quoted
+SCHEMA = {
+    'departments': ('str', 'str'),
+    'employees': ('int', 'date', 'str', 'str', 'str', 'date'),
+    'dept_emp': ('int', 'dept', 'date', 'date'),
+    'dept_manager': ('int', 'dept', 'date', 'date'),
+    'titles': ('int', 'title', 'date', 'date'),
+    'salaries': ('int', 'int', 'date', 'date'),
+}
+DEPT_NOS = np.array([dept_no for dept_no, _ in DEPARTMENTS], dtype='S')
+TITLE_NAMES = TITLES.astype('S')
+
+
+def _as_bytes(kind, values):
+    """
+    Column as a NumPy bytes array. Ints and dates go through a table of their
+    distinct values, which is much cheaper than converting every element.
+    The names contain no quotes or backslashes, so nothing needs escaping.
+    """
+    values = np.asarray(values)
+    if kind == 'int':
+        low = values.min()
+        return np.arange(low, values.max() + 1).astype('S')[values - low]
+    if kind == 'date':
+        distinct, inverse = np.unique(values, return_inverse=True)
+        return distinct.astype('datetime64[D]').astype('S10')[inverse]
+    if kind == 'dept':
+        return DEPT_NOS[values]
+    if kind == 'title':
+        return TITLE_NAMES[values]
+    return values.astype('S')
+
+
+def _join_columns(columns, quoted, separator, prefix=b'', suffix=b''):
+    # Row strings built column by column with vectorized concatenation
+    rows = None
+    for index, (column, quote) in enumerate(zip(columns, quoted)):
+        head = (prefix if index == 0 else separator) + quote
+        rows = np.char.add(head, column) if rows is None else np.char.add(np.char.add(rows, head), column)
+        rows = np.char.add(rows, quote)
+    return np.char.add(rows, suffix)
+
+
+def render(table, columns, tsv=False):
+    """
+    Format rows of `table` as dump statements (and tab separated lines).
+    Returns (dump bytes, tsv bytes or None, rows).
+    """
+    kinds = SCHEMA[table]
+    columns = [_as_bytes(kind, values) for kind, values in zip(kinds, columns)]
+    rows = _join_columns(columns, [b'' if kind == 'int' else b"'" for kind in kinds], b',', b'(', b')')
+    insert = f"INSERT INTO `{table}` VALUES\n".encode()
+    dump = b''.join(
+        insert + b',\n'.join(rows[start:start + ROWS_PER_INSERT].tolist()) + b';\n'
+        for start in range(0, len(rows), ROWS_PER_INSERT)
+    )
+    lines = None
+    if tsv:
+        lines = b''.join(_join_columns(columns, [b''] * len(columns), b'\t', suffix=b'\n').tolist())
+    return dump, lines, len(rows)
+
+
+def render_block(seed, block, first_emp_no, size, tsv=False):
+    """
+    Generate and format one block (runs in a worker process).
+    Returns ({table: render(...)}, dept_manager candidates).
+    """
+    data = generate_block(seed, block, first_emp_no, size)
+    rendered = {table: render(table, data[table], tsv) for table in ('employees', 'dept_emp', 'titles')}
+    # Salaries are split in SALARY_DUMPS parts, one for each salary dump
+    parts = np.array_split(np.arange(len(data['salaries'][0])), SALARY_DUMPS)
+    rendered['salaries'] = [render('salaries', [column[part] for column in data['salaries']], tsv) for part in parts]
+    return rendered, data['staff']
+
+
+class DumpWriter:
+    """
+    One dump file (INSERT ... VALUES, one row per line) and optionally the
+    <dump>.tsv / <dump>.table pair `data_injection.py --load-data` reads.
+    """
+
+    def __init__(self, path, table, tsv=False):
+        self.path = path
+        self.table = table
+        self.rows = 0
+        self.dump = open(path, 'wb')
+        self.tsv = open(path + '.tsv', 'wb') if tsv else None
+
+    def write(self, rendered):
+        dump, lines, rows = rendered
+        self.dump.write(dump)
+        if self.tsv:
+            self.tsv.write(lines)
+        self.rows += rows
+
+    def close(self):
+        self.dump.close()
+        if self.tsv:
+            self.tsv.close()
+            # Written after the dump, so data_injection.py reuses it instead of converting
+            with open(self.path + '.table', 'w', encoding='utf-8') as f:
+                f.write(self.table)
+
+
+def generate(out_dir, scale=1.0, seed=0, tsv=False, workers=None):
+    """
+    Write load_*.dump files for `scale` times the sample size into out_dir,
+    generating blocks in `workers` processes. Returns {file name: rows}.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    total = max(int(round(SAMPLE_EMPLOYEES * scale)), len(DEPARTMENTS))
+
+    def writer(name, table):
+        return DumpWriter(os.path.join(out_dir, name), table, tsv)
+
+    writers = {
+        'employees': writer('load_employees.dump', 'employees'),
+        'dept_emp': writer('load_dept_emp.dump', 'dept_emp'),
+        'titles': writer('load_titles.dump', 'titles'),
+    }
+    salary_writers = [writer(f'load_salaries{i + 1}.dump', 'salaries') for i in range(SALARY_DUMPS)]
+    staff = []
+    firsts = list(range(0, total, BLOCK_SIZE))
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Blocks are written in order of employee numbers
+            results = pool.map(
+                render_block,
+                repeat(seed), range(len(firsts)), [FIRST_EMP_NO + first for first in firsts],
+                [min(BLOCK_SIZE, total - first) for first in firsts], repeat(tsv),
+            )
+            for rendered, candidates in results:
+                for table, out in writers.items():
+                    out.write(rendered[table])
+                for out, part in zip(salary_writers, rendered['salaries']):
+                    out.write(part)
+                staff.append(candidates)
+    finally:
+        for out in [*writers.values(), *salary_writers]:
+            out.close()
+
+    departments = writer('load_departments.dump', 'departments')
+    departments.write(render('departments', list(zip(*DEPARTMENTS)), tsv))
+    departments.close()
+
+    managers = writer('load_dept_manager.dump', 'dept_manager')
+    managers.write(render('dept_manager', pick_managers(seed, tuple(np.concatenate(c) for c in zip(*staff))), tsv))
+    managers.close()
+
+    every = [departments, managers, *writers.values(), *salary_writers]
+    return {os.path.basename(out.path): out.rows for out in every}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic employees dataset for scale testing.")
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help=f"size as a multiple of the {SAMPLE_EMPLOYEES:,}-employee sample (default %(default)s)")
+    parser.add_argument('--seed', type=int, default=0, help="random seed (default %(default)s)")
+    parser.add_argument('--out', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'generated'),
+                        help="output directory (default: generated/ next to this script)")
+    parser.add_argument('--tsv', action='store_true',
+                        help="also write tab separated files for data_injection.py --load-data")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: one per CPU)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    counts = generate(args.out, args.scale, args.seed, args.tsv, args.workers)
+    for name, rows in counts.items():
+        print(f"  {name:<25} {rows:>12,} rows")
+    print(f"Generated {sum(counts.values()):,} rows in {time.perf_counter() - started:.1f}s into {args.out}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
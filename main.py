@@ -5,9 +5,16 @@ import logging
 
 # 导入自定义模块
 # from database import get_db, create_tables, engine
+from app.db.init import engine
+from app.db.dispatch import run_db, shutdown_db_executor
+from app.db.org_chart import org_tree
+from app.db.current_titles import current_titles
+from app.core.render_pool import warm_render_pool, shutdown_render_pool
+from app.core.metrics import MetricsMiddleware
+from app.core.responses import FastJSONResponse
 
 
-from app.router import home_viz_router1, home_viz_router2, home_viz_router3, home_viz_router4, employee, title_router, dept_router, dept_manager_router, dept_emp_router, employee_view_router, salary_router, executor
+from app.router import home_viz_router1, home_viz_router2, home_viz_router3, home_viz_router4, chart_data, employee, title_router, dept_router, dept_manager_router, dept_emp_router, employee_view_router, salary_router, executor, headcount_trends, export, metrics, org_chart, promotion, transfer, retirement, long_single_role
 
 
 # 配置日志
@@ -23,7 +30,8 @@ app = FastAPI(
     description="Backend Based on FastAPI & MySQL",
     version="1.0.0",
     docs_url="/docs",  # Swagger UI文档地址
-    redoc_url="/redoc"  # ReDoc文档地址
+    redoc_url="/redoc",  # ReDoc文档地址
+    default_response_class=FastJSONResponse  # orjson 序列化（app/core/responses.py）
 )
 
 # 配置CORS中间件，允许跨域请求
@@ -34,11 +42,14 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# 记录每个请求的耗时（/metrics）
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(home_viz_router1.router)
 app.include_router(home_viz_router2.router)
 app.include_router(home_viz_router3.router)
 app.include_router(home_viz_router4.router)
+app.include_router(chart_data.router)
 # Register employee_view_router BEFORE employee.router to avoid route conflict
 # /employees/view must be matched before /employees/{emp_no}
 app.include_router(employee_view_router.router)
@@ -49,6 +60,14 @@ app.include_router(dept_manager_router.router)
 app.include_router(dept_emp_router.router)
 app.include_router(salary_router.router)
 app.include_router(executor.router)
+app.include_router(headcount_trends.router)
+app.include_router(org_chart.router)
+app.include_router(promotion.router)
+app.include_router(transfer.router)
+app.include_router(retirement.router)
+app.include_router(long_single_role.router)
+app.include_router(export.router)
+app.include_router(metrics.router)
 
 # 应用启动事件
 @app.on_event("startup")
@@ -60,6 +79,19 @@ async def startup_event():
     try:
         # create_tables()
         logger.info("Finished Database Initialization.")
+        # 预先启动图表渲染进程（导入 matplotlib / seaborn 较慢）
+        await warm_render_pool()
+        logger.info("Chart render pool ready.")
+        # 载入组织架构树；失败时不影响启动，首次请求 /org_chart 时再载入
+        try:
+            await run_db(org_tree.refresh)
+        except Exception as e:
+            logger.warning(f"Org tree not loaded at startup: {e}")
+        # 载入当前职称索引；失败时首次请求 /long_single_role 时再载入
+        try:
+            await run_db(current_titles.refresh)
+        except Exception as e:
+            logger.warning(f"Current titles not loaded at startup: {e}")
     except Exception as e:
         logger.error(f"Failure to cretate database: {e}")
         raise
@@ -71,6 +103,8 @@ async def shutdown_event():
     Closing the Application.
     """
     logger.info("Application Closing...")
+    shutdown_db_executor()
+    shutdown_render_pool()
     engine.dispose()
     logger.info("Database Shutdown...")
 
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+物化表构建脚本
+用于创建并全量重建由写接口增量维护的派生表（快照/汇总表/变动记录）
+
+    python materialize.py                        # 重建全部派生表
+    python materialize.py employee_transitions   # 只重建（回填）指定的表
+"""
+
+import sys
+
+from app.db.employee_current import rebuild_employee_current
+from app.db.headcount_rollup import rebuild_headcount_rollup
+from app.db.employee_profile_history import rebuild_employee_profile_history
+from app.db.employee_transitions import rebuild_employee_transitions
+
+
+STEPS = [
+    ("employee_current", rebuild_employee_current),
+    ("headcount_rollup", rebuild_headcount_rollup),
+    ("employee_profile_history", rebuild_employee_profile_history),
+    ("employee_transitions", rebuild_employee_transitions),
+]
+
+
+def rebuild_all(names=None):
+    """
+    全量重建所有派生表（names 不为空时只重建其中的表）
+    """
+    unknown = set(names or ()) - {name for name, rebuild in STEPS}
+    if unknown:
+        print(f"✗ 未知的派生表: {', '.join(sorted(unknown))}")
+        return
+
+    for name, rebuild in STEPS:
+        if names and name not in names:
+            continue
+        try:
+            result = rebuild()
+            print(f"✓ 成功重建: {name} {result}")
+        except Exception as e:
+            print(f"✗ 重建失败 ({name}): {e}")
+
+
+if __name__ == "__main__":
+    print("开始重建派生表...")
+    rebuild_all(sys.argv[1:])
+    print("\n派生表重建完成！")
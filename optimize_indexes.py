@@ -36,6 +36,15 @@ def create_indexes():
         
         # departments表索引
         "CREATE INDEX idx_departments_dept_name ON departments(dept_name)",
+
+        # employee_current快照表索引（退休查询按 birth_date, emp_no 排序；新建的快照表已包含，旧表需要补建）
+        "CREATE INDEX idx_employee_current_birth_date ON employee_current(is_current, birth_date, emp_no, dept_no)",
+        # 已有 (is_current, birth_date, dept_no) 索引的表：补上 emp_no，一条语句内替换
+        "ALTER TABLE employee_current DROP INDEX idx_employee_current_birth_date, "
+        "ADD INDEX idx_employee_current_birth_date (is_current, birth_date, emp_no, dept_no)",
+        # 部门筛选的退休查询：旧表的 (dept_no, is_current) 索引补上 birth_date, emp_no，一条语句内替换
+        "ALTER TABLE employee_current DROP INDEX idx_employee_current_dept_no, "
+        "ADD INDEX idx_employee_current_dept_no (dept_no, is_current, birth_date, emp_no)",
     ]
     
     with engine.connect() as conn:
@@ -71,6 +80,11 @@ def drop_indexes():
         "DROP INDEX idx_employees_hire_date ON employees",
         
         "DROP INDEX idx_departments_dept_name ON departments",
+
+        "DROP INDEX idx_employee_current_birth_date ON employee_current",
+        # 恢复原来的 (dept_no, is_current) 索引
+        "ALTER TABLE employee_current DROP INDEX idx_employee_current_dept_no, "
+        "ADD INDEX idx_employee_current_dept_no (dept_no, is_current)",
     ]
     
     with engine.connect() as conn:
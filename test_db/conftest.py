@@ -0,0 +1,71 @@
+import os
+import sys
+
+import pytest
+from sqlalchemy import create_engine, text
+
+# 测试不连接 MySQL：导入 app.db 之前先把应用的默认库指向内存 SQLite
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.seed import BASE_TABLES, DERIVED_TABLES, sqlite_ddl
+
+# 小样本：三个部门各一名当前经理（10004-10006）；
+# 10001 1990 年进入 d001、2000 年调到 d002 并晋升，10002 在 d003，10003 1998 年离职
+ROWS = """
+INSERT INTO departments VALUES ('d001', 'Marketing'), ('d002', 'Finance'), ('d003', 'Development');
+INSERT INTO employees VALUES
+    (10001, '1953-09-02', 'Georgi', 'Facello', 'M', '1986-06-26'),
+    (10002, '1964-06-02', 'Bezalel', 'Simmel', 'F', '1985-11-21'),
+    (10003, '1959-12-03', 'Parto', 'Bamford', 'M', '1986-08-28'),
+    (10004, '1954-05-01', 'Chirstian', 'Koblick', 'M', '1980-12-01'),
+    (10005, '1955-01-21', 'Kyoichi', 'Maliniak', 'M', '1980-09-12'),
+    (10006, '1953-04-20', 'Anneke', 'Preusig', 'F', '1980-06-02');
+INSERT INTO dept_manager VALUES
+    (10004, 'd001', '1985-01-01', '9999-01-01'),
+    (10005, 'd002', '1985-01-01', '9999-01-01'),
+    (10006, 'd003', '1985-01-01', '9999-01-01');
+INSERT INTO dept_emp VALUES
+    (10001, 'd001', '1990-01-01', '2000-01-01'),
+    (10001, 'd002', '2000-01-01', '9999-01-01'),
+    (10002, 'd003', '1995-01-01', '9999-01-01'),
+    (10003, 'd001', '1992-01-01', '1998-01-01'),
+    (10004, 'd001', '1985-01-01', '9999-01-01'),
+    (10005, 'd002', '1985-01-01', '9999-01-01'),
+    (10006, 'd003', '1985-01-01', '9999-01-01');
+INSERT INTO titles VALUES
+    (10001, 'Engineer', '1990-01-01', '2000-01-01'),
+    (10001, 'Senior Engineer', '2000-01-01', '9999-01-01'),
+    (10002, 'Staff', '1995-01-01', '9999-01-01'),
+    (10003, 'Staff', '1992-01-01', '1998-01-01'),
+    (10004, 'Manager', '1985-01-01', '9999-01-01'),
+    (10005, 'Manager', '1985-01-01', '9999-01-01'),
+    (10006, 'Manager', '1985-01-01', '9999-01-01');
+INSERT INTO salaries VALUES
+    (10001, 50000, '1990-01-01', '2000-01-01'),
+    (10001, 60000, '2000-01-01', '9999-01-01'),
+    (10002, 40000, '1995-01-01', '9999-01-01'),
+    (10003, 30000, '1992-01-01', '1998-01-01'),
+    (10004, 90000, '1985-01-01', '9999-01-01'),
+    (10005, 90000, '1985-01-01', '9999-01-01'),
+    (10006, 90000, '1985-01-01', '9999-01-01');
+"""
+
+
+@pytest.fixture
+def sqlite_engine(tmp_path):
+    """
+    Engine on a fresh SQLite file with the base tables (ROWS) and the derived
+    tables built from them, like the benchmark stand-in.
+    """
+    engine = create_engine(f"sqlite:///{tmp_path / 'employees.sqlite3'}")
+    with engine.begin() as conn:
+        for statement in (BASE_TABLES + ROWS).split(';'):
+            if statement.strip():
+                conn.execute(text(statement))
+        for table, create_sql, columns, select_sql in DERIVED_TABLES:
+            conn.execute(text(sqlite_ddl(create_sql)))
+            conn.execute(text(f'INSERT INTO {table} ({columns}) {select_sql}'))
+    yield engine
+    engine.dispose()
+
@@ -0,0 +1,56 @@
+from datetime import date
+
+from sqlalchemy import text
+
+from app.db.current_titles import CurrentTitles, load_current_titles, update_current_titles
+
+
+def _entries(index):
+    return [index.entry(i) for i in range(len(index))]
+
+
+def _day(value):
+    return date.fromisoformat(value).toordinal()
+
+
+ENTRIES = [
+    (_day('2000-01-01'), 1, 'Engineer'),
+    (_day('2000-01-01'), 3, 'Staff'),
+    (_day('1995-06-01'), 2, 'Staff'),
+    (_day('2010-01-01'), 4, 'Manager'),
+]
+
+
+def test_replace_matches_a_fresh_index():
+    index = CurrentTitles(list(ENTRIES))
+    before = _entries(index)
+
+    # 4 晋升为新职称，2 的开始日期与 1、3 相同（按员工编号排在中间），3 没有职称了，5 是新员工
+    entries = [(_day('2012-01-01'), 4, 'Director'), (_day('2000-01-01'), 2, 'Senior Staff'),
+               (_day('1990-01-01'), 5, 'Staff')]
+    replaced = index.replace([2, 3, 4, 5], entries)
+    expected = CurrentTitles([ENTRIES[0]] + entries)
+
+    assert _entries(replaced) == _entries(expected)
+    assert [replaced.entry(i)[0] for i in range(len(replaced))] == [5, 1, 2, 4]
+    assert replaced.started_by(date(2000, 1, 1)) == expected.started_by(date(2000, 1, 1)) == 3
+    assert _entries(index) == before
+
+
+def test_update_matches_a_full_load(sqlite_engine):
+    with sqlite_engine.connect() as conn:
+        index = load_current_titles(conn)
+    with sqlite_engine.begin() as conn:
+        conn.execute(text("UPDATE titles SET to_date = '2010-01-01' WHERE emp_no = 10002"))
+        conn.execute(text("INSERT INTO titles VALUES (10002, 'Senior Staff', '2010-01-01', '9999-01-01')"))
+        conn.execute(text("DELETE FROM titles WHERE emp_no = 10003"))
+        conn.execute(text("INSERT INTO employees VALUES (10007, '1970-01-01', 'Mary', 'Smith', 'F', '2020-01-01')"))
+        conn.execute(text("INSERT INTO titles VALUES (10007, 'Staff', '2020-01-01', '9999-01-01')"))
+
+    with sqlite_engine.connect() as conn:
+        updated = update_current_titles(conn, index, {10002, 10003, 10007})
+        loaded = load_current_titles(conn)
+
+    assert _entries(updated) == _entries(loaded)
+    assert (10002, 'Senior Staff', date(2010, 1, 1)) in _entries(updated)
+    assert 10003 not in updated.emp_nos
@@ -0,0 +1,29 @@
+import pytest
+
+# data_injection 在模块顶层导入 mysql.connector
+pytest.importorskip('mysql.connector')
+
+from data.data_injection import iter_statements
+
+
+def _statements(tmp_path, script):
+    path = tmp_path / 'dump.sql'
+    path.write_text(script, encoding='utf-8')
+    return [statement.strip() for statement in iter_statements(path)]
+
+
+def test_semicolon_in_quoted_value_does_not_split(tmp_path):
+    statements = _statements(tmp_path, (
+        "INSERT INTO departments VALUES ('d010','R;D');\n"
+        "INSERT INTO departments VALUES ('d011','It''s; fine');\n"
+    ))
+
+    assert len(statements) == 2
+    assert "'R;D'" in statements[0]
+    assert "'It''s; fine'" in statements[1]
+
+
+def test_semicolon_in_comment_does_not_split(tmp_path):
+    statements = _statements(tmp_path, "/* a; b */ SELECT 1;\n-- c; d\nSELECT 2;\n")
+
+    assert len(statements) == 2
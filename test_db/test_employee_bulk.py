@@ -0,0 +1,124 @@
+import pytest
+from sqlalchemy import text
+
+from app.db import employee_bulk
+
+
+def _rows(engine, table, emp_no):
+    with engine.connect() as conn:
+        sql = text(f'SELECT * FROM {table} WHERE emp_no = :emp_no ORDER BY 1, 2, 3')
+        return [tuple(row) for row in conn.execute(sql, {'emp_no': emp_no})]
+
+
+def _new(emp_no, dept_no='d001', salary=45000, title='Staff', first_name='Mary'):
+    return {'emp_no': emp_no, 'birth_date': '1970-01-01', 'first_name': first_name, 'last_name': 'Smith',
+            'gender': 'F', 'hire_date': '2020-01-01', 'dept_no': dept_no, 'salary': salary, 'title': title}
+
+
+@pytest.fixture
+def bulk(sqlite_engine, monkeypatch):
+    """
+    employee_bulk on the SQLite test database; records the derived-table syncs and change signals.
+    """
+    # 派生表同步（人数汇总）和 FOR UPDATE 只能在 MySQL 上执行；编号在测试数据中直接给出
+    calls = {'sync_derived': [], 'tables_changed': []}
+    monkeypatch.setattr(employee_bulk, 'engine', sqlite_engine)
+    monkeypatch.setattr(employee_bulk, '_allocate_emp_nos', lambda conn, rows: None)
+    monkeypatch.setattr(employee_bulk, 'capture_derived', lambda *args, **kwargs: {})
+    monkeypatch.setattr(employee_bulk, 'sync_derived',
+                        lambda conn, table, emp_nos, *args: calls['sync_derived'].append(list(emp_nos)))
+    monkeypatch.setattr(employee_bulk, 'tables_changed',
+                        lambda *tables, **rows: calls['tables_changed'].append((set(tables), rows['emp_nos'])))
+    return calls
+
+
+class _MaxEmpNo:
+    def __init__(self, value):
+        self.value = value
+
+    def execute(self, statement):
+        return self
+
+    def scalar(self):
+        return self.value
+
+
+def test_allocated_emp_nos_skip_the_ones_given():
+    rows = [{'emp_no': None}, {'emp_no': 10008}, {'emp_no': None}, {'emp_no': None}]
+    employee_bulk._allocate_emp_nos(_MaxEmpNo(10006), rows)
+
+    assert [row['emp_no'] for row in rows] == [10007, 10008, 10009, 10010]
+
+
+def test_bulk_add_writes_all_four_tables(sqlite_engine, bulk):
+    result = employee_bulk.db_bulk_add_emps(
+        [(0, _new(10007)), (1, _new(10008, salary=None, title=None))])
+
+    assert result == {"inserted": 2, "failed": 0, "emp_nos": [10007, 10008], "errors": []}
+    assert _rows(sqlite_engine, 'employees', 10007)[0][2:4] == ('Mary', 'Smith')
+    assert [row[1] for row in _rows(sqlite_engine, 'dept_emp', 10007)] == ['d001']
+    assert [row[1] for row in _rows(sqlite_engine, 'salaries', 10007)] == [45000]
+    assert [row[1] for row in _rows(sqlite_engine, 'titles', 10007)] == ['Staff']
+    # 没有薪资、职称的行不写这两张表
+    assert _rows(sqlite_engine, 'salaries', 10008) == [] and _rows(sqlite_engine, 'titles', 10008) == []
+    assert bulk['sync_derived'] == [[10007, 10008]]
+    assert bulk['tables_changed'] == [({'employees', 'dept_emp', 'salaries', 'titles'}, [10007, 10008])]
+
+
+def test_bulk_add_skips_failing_rows_and_keeps_the_rest(sqlite_engine, bulk):
+    salaries = _rows(sqlite_engine, 'salaries', 10001)
+
+    result = employee_bulk.db_bulk_add_emps(
+        [(0, _new(10007)), (1, _new(10008, dept_no='d999')), (2, _new(10001, first_name="O'Brien")),
+         (3, _new(10009))],
+        chunk_size=3)
+
+    assert result['emp_nos'] == [10007, 10009]
+    assert [(error['index'], error['emp_no']) for error in result['errors']] == [(1, 10008), (2, 10001)]
+    assert result['errors'][0]['error'] == 'Unknown department: d999'
+    # 重复的 10001 整行回滚，已有的历史行不受影响
+    assert _rows(sqlite_engine, 'employees', 10001)[0][2] == 'Georgi'
+    assert _rows(sqlite_engine, 'salaries', 10001) == salaries
+    assert _rows(sqlite_engine, 'employees', 10008) == []
+    assert [row[1] for row in _rows(sqlite_engine, 'titles', 10007)] == ['Staff']
+    assert bulk['sync_derived'] == [[10007], [10009]]
+    assert bulk['tables_changed'][0][1] == [10007, 10009]
+
+
+def _change(emp_no, values=None, dept_no=None, title=None, salary=None):
+    return {'emp_no': emp_no, 'values': values or {}, 'dept_no': dept_no, 'title': title, 'salary': salary}
+
+
+def test_bulk_update_applies_valid_rows_and_reports_the_others(sqlite_engine, bulk):
+    dept_emp = _rows(sqlite_engine, 'dept_emp', 10001)
+
+    result = employee_bulk.db_bulk_update_emps(
+        [(0, _change(10001, {'last_name': 'Moved'}, dept_no='d001')),
+         (1, _change(10002, {'last_name': 'Raised'}, salary=45000)),
+         (2, _change(99999, salary=1)),
+         (3, _change(10005, dept_no='d999')),
+         (4, _change(10006, {'last_name': 'Promoted'}, title='Senior Manager'))],
+        from_date='2010-01-01')
+
+    assert result['emp_nos'] == [10002, 10006]
+    assert [(error['index'], error['emp_no']) for error in result['errors']] == [(2, 99999), (3, 10005), (0, 10001)]
+    assert result['errors'][0]['error'] == 'Employee not found'
+    # 调回曾经所在的 d001 被拒绝：整行跳过，employees 也不修改
+    assert _rows(sqlite_engine, 'dept_emp', 10001) == dept_emp
+    assert _rows(sqlite_engine, 'employees', 10001)[0][3] == 'Facello'
+
+    assert _rows(sqlite_engine, 'employees', 10002)[0][3] == 'Raised'
+    assert [(row[1], row[2], row[3]) for row in _rows(sqlite_engine, 'salaries', 10002)] == [
+        (40000, '1995-01-01', '2010-01-01'), (45000, '2010-01-01', '9999-01-01')]
+    assert [row[1] for row in _rows(sqlite_engine, 'titles', 10006)] == ['Manager', 'Senior Manager']
+    assert bulk['sync_derived'] == [[10002, 10006]]
+    assert bulk['tables_changed'] == [({'employees', 'salaries', 'titles'}, [10002, 10006])]
+
+
+def test_bulk_update_with_only_rejected_rows_writes_nothing(sqlite_engine, bulk):
+    result = employee_bulk.db_bulk_update_emps(
+        [(0, _change(10001, salary=70000))], from_date='1999-01-01')
+
+    assert result['updated'] == 0 and result['failed'] == 1
+    assert [row[1] for row in _rows(sqlite_engine, 'salaries', 10001)] == [50000, 60000]
+    assert bulk['sync_derived'] == [] and bulk['tables_changed'] == []
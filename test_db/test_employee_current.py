@@ -0,0 +1,45 @@
+from sqlalchemy import text
+
+from app.db.employee_current import refresh_employee_current, columns, select_snapshot_sql
+
+
+def _snapshot(conn):
+    return [tuple(row) for row in conn.execute(text(f'SELECT {columns} FROM employee_current ORDER BY emp_no'))]
+
+
+def _recomputed(conn):
+    return [tuple(row) for row in conn.execute(text(f'SELECT * FROM ({select_snapshot_sql}) s ORDER BY emp_no'))]
+
+
+def test_refresh_matches_a_full_recompute_after_writes(sqlite_engine):
+    with sqlite_engine.begin() as conn:
+        # 10002 调到 d001 并加薪，10003 重新入职 d002
+        conn.execute(text("UPDATE dept_emp SET to_date = '2005-01-01' WHERE emp_no = 10002"))
+        conn.execute(text("INSERT INTO dept_emp VALUES (10002, 'd001', '2005-01-01', '9999-01-01')"))
+        conn.execute(text("UPDATE salaries SET to_date = '2005-01-01' WHERE emp_no = 10002"))
+        conn.execute(text("INSERT INTO salaries VALUES (10002, 45000, '2005-01-01', '9999-01-01')"))
+        conn.execute(text("INSERT INTO dept_emp VALUES (10003, 'd002', '2010-01-01', '9999-01-01')"))
+        refresh_employee_current(conn, [10002, 10003])
+
+        assert _snapshot(conn) == _recomputed(conn)
+        assert _snapshot(conn)[1][6:] == ('d001', 45000, 'Staff', 1)
+        assert _snapshot(conn)[2][6:] == ('d002', 30000, 'Staff', 1)
+
+
+def test_refresh_adds_new_employees_and_leaves_others_alone(sqlite_engine):
+    with sqlite_engine.begin() as conn:
+        conn.execute(text("INSERT INTO employees VALUES (10007, '1970-01-01', 'Mary', 'Smith', 'F', '2020-01-01')"))
+        conn.execute(text("INSERT INTO dept_emp VALUES (10007, 'd003', '2020-01-01', '9999-01-01')"))
+        # 10001 的基础表也改了，但没有刷新：快照仍是旧值
+        conn.execute(text("UPDATE titles SET title = 'Staff' WHERE emp_no = 10001 AND to_date = '9999-01-01'"))
+
+        assert refresh_employee_current(conn, [10007, None]) == 1
+        rows = {row[0]: row for row in _snapshot(conn)}
+
+        assert rows[10007][6:] == ('d003', None, None, 1)
+        assert rows[10001][8] == 'Senior Engineer'
+
+
+def test_refresh_without_employees_does_nothing(sqlite_engine):
+    with sqlite_engine.begin() as conn:
+        assert refresh_employee_current(conn, [None]) == 0
@@ -0,0 +1,35 @@
+import pytest
+
+from app.db.executor import check_readonly_sql
+
+
+@pytest.mark.parametrize('sql, statement', [
+    ('SELECT 1', 'SELECT 1'),
+    ('  select * from employees;  ', 'select * from employees'),
+    ('SELECT 1;; -- done\n', 'SELECT 1'),
+    ("SELECT ';' AS semicolon", "SELECT ';' AS semicolon"),
+    ('SELECT `a;b` /* ; */ FROM t /* end */', 'SELECT `a;b` /* ; */ FROM t'),
+    ("SELECT 'it''s; fine', \"x\\\";\"", "SELECT 'it''s; fine', \"x\\\";\""),
+    ('(SELECT 1) UNION (SELECT 2)', '(SELECT 1) UNION (SELECT 2)'),
+    ('WITH t AS (SELECT 1) SELECT * FROM t', 'WITH t AS (SELECT 1) SELECT * FROM t'),
+    ('explain SELECT 1', 'explain SELECT 1'),
+    ("SELECT 'INTO OUTFILE'", "SELECT 'INTO OUTFILE'"),
+])
+def test_read_statements_are_accepted(sql, statement):
+    assert check_readonly_sql(sql) == statement
+
+
+@pytest.mark.parametrize('sql, message', [
+    ('', 'empty'),
+    (' ; -- nothing', 'empty'),
+    ('SELECT 1; SELECT 2', 'single statement'),
+    ("SELECT 1; DELETE FROM t WHERE x = ';'", 'single statement'),
+    ('DELETE FROM employees', 'DELETE'),
+    ('/* SELECT */ UPDATE employees SET gender = 1', 'UPDATE'),
+    ('DROP TABLE employees', 'DROP'),
+    ("SELECT * FROM employees INTO OUTFILE '/tmp/x'", 'OUTFILE'),
+    ("SELECT 1 into\n dumpfile '/tmp/x'", 'OUTFILE'),
+])
+def test_other_statements_are_rejected(sql, message):
+    with pytest.raises(ValueError, match=message):
+        check_readonly_sql(sql)
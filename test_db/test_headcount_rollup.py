@@ -0,0 +1,69 @@
+from datetime import date
+
+from sqlalchemy import text, bindparam
+
+from bench.seed import sqlite_ddl
+from app.db.headcount_rollup import (
+    create_table_sql, refresh_period_sql, delete_empty_sql, period_start, period_end
+)
+
+# refresh_active_sql（UPDATE ... JOIN）和全量构建（MAKEDATE）只能在 MySQL 上执行；
+# 这里在 SQLite 上检查单个期间的计数和 Python 中的期间计算
+
+
+def _refresh(conn, granularity, start):
+    conn.execute(text(refresh_period_sql), {
+        "granularity": granularity,
+        "period_start": start,
+        "period_end": period_end(granularity, start),
+    })
+
+
+def _period(conn, granularity, start):
+    sql = text('SELECT hires, departures, separations FROM headcount_rollup '
+               'WHERE granularity = :granularity AND period = :period')
+    return conn.execute(sql, {"granularity": granularity, "period": start}).one_or_none()
+
+
+def test_period_bounds():
+    assert period_start('year', date(1998, 7, 15)) == date(1998, 1, 1)
+    assert period_start('month', date(1998, 7, 15)) == date(1998, 7, 1)
+    assert period_end('year', date(1998, 1, 1)) == date(1999, 1, 1)
+    assert period_end('month', date(1998, 7, 1)) == date(1998, 8, 1)
+    assert period_end('month', date(1998, 12, 1)) == date(1999, 1, 1)
+
+
+def test_refresh_period_counts_transfers_as_departures_only(sqlite_engine):
+    with sqlite_engine.begin() as conn:
+        conn.execute(text(sqlite_ddl(create_table_sql)))
+        # 10003 1998 年离职；10001 2000 年从 d001 转到 d002，不是离职
+        _refresh(conn, 'year', date(1998, 1, 1))
+        _refresh(conn, 'year', date(2000, 1, 1))
+        _refresh(conn, 'month', date(1986, 6, 1))
+
+        assert tuple(_period(conn, 'year', date(1998, 1, 1))) == (0, 1, 1)
+        assert tuple(_period(conn, 'year', date(2000, 1, 1))) == (0, 1, 0)
+        assert tuple(_period(conn, 'month', date(1986, 6, 1))) == (1, 0, 0)
+
+
+def test_refresh_period_recomputes_after_a_write(sqlite_engine):
+    with sqlite_engine.begin() as conn:
+        conn.execute(text(sqlite_ddl(create_table_sql)))
+        _refresh(conn, 'year', date(1998, 1, 1))
+        # 10003 在 2001 年重新入职后，1998 年的离开不再算离职
+        conn.execute(text("INSERT INTO dept_emp VALUES (10003, 'd002', '2001-01-01', '9999-01-01')"))
+        _refresh(conn, 'year', date(1998, 1, 1))
+
+        assert tuple(_period(conn, 'year', date(1998, 1, 1))) == (0, 1, 0)
+
+
+def test_empty_periods_are_deleted(sqlite_engine):
+    with sqlite_engine.begin() as conn:
+        conn.execute(text(sqlite_ddl(create_table_sql)))
+        _refresh(conn, 'year', date(1998, 1, 1))
+        _refresh(conn, 'year', date(1999, 1, 1))
+        conn.execute(text(delete_empty_sql).bindparams(bindparam('periods', expanding=True)),
+                     {"granularity": 'year', "periods": [date(1998, 1, 1), date(1999, 1, 1)]})
+
+        assert _period(conn, 'year', date(1998, 1, 1)) is not None
+        assert _period(conn, 'year', date(1999, 1, 1)) is None
@@ -0,0 +1,85 @@
+from sqlalchemy import text
+
+from app.db.org_chart import OrgDepartment, load_org_snapshot, update_org_snapshot
+
+
+def _chart(snapshot):
+    return [(department.dept_no, department.row(k))
+            for department in snapshot.departments for k in range(department.rows)]
+
+
+def _update(engine, snapshot, emp_nos=(), dept_nos=()):
+    with engine.connect() as conn:
+        updated = update_org_snapshot(conn, snapshot, set(emp_nos), set(dept_nos))
+        loaded = load_org_snapshot(conn)
+    assert _chart(updated) == _chart(loaded)
+    assert list(updated.starts) == list(loaded.starts)
+    assert updated.employees == loaded.employees
+    assert {emp_no: [d.dept_no for d in departments] for emp_no, departments in updated.managed.items()} == \
+        {emp_no: [d.dept_no for d in departments] for emp_no, departments in loaded.managed.items()}
+    return updated
+
+
+def _snapshot(engine):
+    with engine.connect() as conn:
+        return load_org_snapshot(conn)
+
+
+def test_rows_skip_the_manager_under_their_own_name():
+    department = OrgDepartment('d001', 'Marketing')
+    department.managers = [(2, 'A', 'A', 'Manager'), (4, 'B', 'B', 'Manager')]
+    for emp_no in (1, 2, 3, 4, 5):
+        department.add(emp_no, 'F', 'L', 'Staff')
+    department.seal()
+
+    expected = [(emp_no, manager) for emp_no in (1, 2, 3, 4, 5) for manager in (2, 4) if manager != emp_no]
+    rows = [department.row(k) for k in range(department.rows)]
+    assert [(row['emp_no'], row['manager_emp_no']) for row in rows[2:]] == expected
+    assert [row['emp_no'] for row in rows[:2]] == [2, 4]
+    assert list(department.row_starts) == [0, 2, 3, 5, 6, 8]
+
+
+def test_transfer_moves_the_employee_and_keeps_the_old_snapshot(sqlite_engine):
+    snapshot = _snapshot(sqlite_engine)
+    before = _chart(snapshot)
+    with sqlite_engine.begin() as conn:
+        conn.execute(text("UPDATE dept_emp SET to_date = '2010-01-01' WHERE emp_no = 10002"))
+        conn.execute(text("INSERT INTO dept_emp VALUES (10002, 'd001', '2010-01-01', '9999-01-01')"))
+
+    updated = _update(sqlite_engine, snapshot, emp_nos=[10002])
+
+    assert _chart(snapshot) == before
+    assert updated.by_dept_no['d001'].find(10002) >= 0 and updated.by_dept_no['d003'].find(10002) < 0
+    # 没有变化的部门与旧快照共用
+    assert updated.by_dept_no['d002'] is snapshot.by_dept_no['d002']
+
+
+def test_manager_changes_and_title_changes(sqlite_engine):
+    snapshot = _snapshot(sqlite_engine)
+    with sqlite_engine.begin() as conn:
+        # 10005 同时管理 d001，10004 不再是经理；10001 晋升
+        conn.execute(text("INSERT INTO dept_manager VALUES (10005, 'd001', '2010-01-01', '9999-01-01')"))
+        conn.execute(text("UPDATE dept_manager SET to_date = '2010-01-01' WHERE emp_no = 10004"))
+        conn.execute(text("UPDATE titles SET to_date = '2010-01-01' WHERE emp_no = 10001 AND to_date = '9999-01-01'"))
+        conn.execute(text("INSERT INTO titles VALUES (10001, 'Staff Engineer', '2010-01-01', '9999-01-01')"))
+
+    updated = _update(sqlite_engine, snapshot, emp_nos=[10004, 10005, 10001], dept_nos=['d001'])
+
+    assert [manager[0] for manager in updated.by_dept_no['d001'].managers] == [10005]
+    assert [d.dept_no for d in updated.managed[10005]] == ['d001', 'd002']
+
+
+def test_department_rename_add_and_delete(sqlite_engine):
+    snapshot = _snapshot(sqlite_engine)
+    with sqlite_engine.begin() as conn:
+        conn.execute(text("UPDATE departments SET dept_name = 'Sales' WHERE dept_no = 'd001'"))
+        conn.execute(text("INSERT INTO departments VALUES ('d004', 'Research')"))
+        conn.execute(text("INSERT INTO dept_manager VALUES (10001, 'd004', '2010-01-01', '9999-01-01')"))
+        conn.execute(text("DELETE FROM dept_manager WHERE dept_no = 'd003'"))
+        conn.execute(text("DELETE FROM dept_emp WHERE dept_no = 'd003'"))
+        conn.execute(text("DELETE FROM departments WHERE dept_no = 'd003'"))
+
+    updated = _update(sqlite_engine, snapshot, emp_nos=[10001], dept_nos=['d001', 'd003', 'd004'])
+
+    assert [department.dept_no for department in updated.departments] == ['d001', 'd002', 'd004']
+    assert updated.by_dept_no['d001'].dept_name == 'Sales'
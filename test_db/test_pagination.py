@@ -0,0 +1,47 @@
+from datetime import date
+
+import pytest
+from fastapi import HTTPException
+
+from app.db.pagination import encode_cursor, decode_cursor, keyset_where, next_page
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor([10001, date(1990, 1, 1), 'd005'])
+
+    assert '=' not in cursor
+    assert decode_cursor(cursor, 3) == [10001, '1990-01-01', 'd005']
+
+
+def test_empty_cursor_is_first_page():
+    assert decode_cursor('', 1) is None
+    assert decode_cursor(None, 1) is None
+
+
+@pytest.mark.parametrize('cursor', ['not a cursor!', encode_cursor([1, 2]), encode_cursor({'a': 1})[:-2], 'e30'])
+def test_bad_cursor_is_400(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor, 1)
+    assert error.value.status_code == 400
+
+
+def test_next_page_cursor_points_at_last_row():
+    rows = [{'emp_no': emp_no, 'from_date': date(2000, 1, emp_no)} for emp_no in range(1, 5)]
+
+    page = next_page(rows, ('emp_no', 'from_date'), 3)
+
+    assert page['data'] == rows[:3]
+    assert decode_cursor(page['next_cursor'], 2) == [3, '2000-01-03']
+
+
+def test_last_page_has_no_cursor():
+    rows = [{'emp_no': 1}, {'emp_no': 2}]
+
+    assert next_page(rows, ('emp_no',), 2) == {"data": rows, "next_cursor": None}
+
+
+def test_keyset_where_expands_leading_column():
+    sql, params = keyset_where(['emp_no', 'from_date'], [10001, '1990-01-01'])
+
+    assert sql == '(emp_no >= :cursor_0 AND (emp_no > :cursor_0 OR (from_date > :cursor_1)))'
+    assert params == {'cursor_0': 10001, 'cursor_1': '1990-01-01'}
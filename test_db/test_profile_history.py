@@ -0,0 +1,52 @@
+from sqlalchemy import text
+
+from app.db.employee_profile_history import (
+    refresh_history_for_managers, manager_intervals, remove_history_departments, columns, select_history_sql
+)
+
+# refresh_history_for_employees / rename_history_departments 使用 UPDATE ... JOIN，只能在 MySQL 上执行
+
+
+def _history(conn):
+    return [tuple(row) for row in conn.execute(text(
+        f'SELECT {columns} FROM employee_profile_history ORDER BY emp_no, effective_date, manager_emp_no'))]
+
+
+def _recomputed(conn):
+    return [tuple(row) for row in conn.execute(text(
+        f'SELECT * FROM ({select_history_sql}) h ORDER BY emp_no, effective_date, manager_emp_no'))]
+
+
+def test_manager_change_refreshes_the_affected_rows(sqlite_engine):
+    with sqlite_engine.begin() as conn:
+        # d001 经理 1995 年起由 10004 换成 10005
+        before = manager_intervals(conn, [10004], ['d001'])
+        conn.execute(text("UPDATE dept_manager SET to_date = '1995-01-01' WHERE emp_no = 10004"))
+        conn.execute(text("INSERT INTO dept_manager VALUES (10005, 'd001', '1995-01-01', '9999-01-01')"))
+        refresh_history_for_managers(conn, [10004, 10005], ['d001'], before)
+
+        assert _history(conn) == _recomputed(conn)
+        managers = {(row[0], str(row[10]), row[7]) for row in _history(conn) if row[5] == 'd001'}
+        # 1990-2000 的薪资期间与两任经理都重叠
+        assert {(10001, '1990-01-01', 10004), (10001, '1990-01-01', 10005)} <= managers
+        assert (10004, '1985-01-01', 10005) in managers
+
+
+def test_deleting_a_manager_uses_the_tenure_captured_before(sqlite_engine):
+    with sqlite_engine.begin() as conn:
+        before = manager_intervals(conn, [10006], ['d003'])
+        conn.execute(text("DELETE FROM dept_manager WHERE emp_no = 10006"))
+        # 删除后 dept_manager 中已没有这段任期，只能靠 before 找到要删除的行
+        assert manager_intervals(conn, [10006], ['d003']) == {}
+        refresh_history_for_managers(conn, [10006], ['d003'], before)
+
+        assert _history(conn) == _recomputed(conn)
+        assert not [row for row in _history(conn) if row[5] == 'd003']
+
+
+def test_removed_departments_lose_their_rows(sqlite_engine):
+    with sqlite_engine.begin() as conn:
+        conn.execute(text("DELETE FROM departments WHERE dept_no = 'd003'"))
+
+        assert remove_history_departments(conn, ['d003', 'd001']) == 2
+        assert _history(conn) == _recomputed(conn)
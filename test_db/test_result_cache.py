@@ -0,0 +1,92 @@
+from app.db.result_cache import ResultCache, cached, normalize
+from app.db.signals import tables_changed
+
+
+def test_normalize_ignores_dict_order():
+    assert normalize({'a': 1, 'b': [1, 2]}) == normalize({'b': (1, 2), 'a': 1})
+
+
+def test_normalize_lists_and_sets():
+    assert normalize([1, [2, 3]]) == normalize((1, (2, 3)))
+    assert normalize({3, 1, 2}) == normalize(frozenset({2, 3, 1}))
+    assert normalize([1, 2]) != normalize([2, 1])
+
+
+def test_normalize_unhashable_value_is_hashable():
+    class Unhashable:
+        __hash__ = None
+
+        def __repr__(self):
+            return 'Unhashable()'
+
+    assert hash(normalize({'value': Unhashable()}))
+
+
+def test_invalidation_drops_entries_of_the_written_tables():
+    cache = ResultCache()
+    cache.register('test.reads_a', ['cache_test_a'])
+    cache.register('test.reads_b', ['cache_test_b'])
+    key_a, key_b = ('test.reads_a', ()), ('test.reads_b', ())
+    cache.put(key_a, [1], cache.generation('test.reads_a'))
+    cache.put(key_b, [2], cache.generation('test.reads_b'))
+
+    cache.invalidate_tables({'cache_test_a'})
+
+    assert cache.get(key_a) == (False, None)
+    assert cache.get(key_b) == (True, [2])
+
+
+def test_result_computed_before_an_invalidation_is_not_cached():
+    cache = ResultCache()
+    cache.register('test.race', ['cache_test_race'])
+    key = ('test.race', ())
+    # 读取开始时记下代数，读取期间有写入
+    generation = cache.generation('test.race')
+    cache.invalidate_tables({'cache_test_race'})
+    cache.put(key, ['stale'], generation)
+
+    assert cache.get(key) == (False, None)
+    cache.put(key, ['fresh'], cache.generation('test.race'))
+    assert cache.get(key) == (True, ['fresh'])
+
+
+def test_expired_entry_is_a_miss():
+    cache = ResultCache()
+    cache.register('test.ttl', ['cache_test_ttl'])
+    key = ('test.ttl', ())
+    cache.put(key, [1], cache.generation('test.ttl'), ttl=0)
+
+    assert cache.get(key) == (False, None)
+
+
+def test_memory_budget_evicts_least_recently_used():
+    cache = ResultCache(max_bytes=4000)
+    cache.register('test.lru', ['cache_test_lru'])
+    generation = cache.generation('test.lru')
+    keys = [('test.lru', i) for i in range(20)]
+    for key in keys:
+        cache.put(key, list(range(10)), generation)
+
+    assert cache.bytes <= cache.max_bytes
+    assert cache.get(keys[0]) == (False, None)
+    assert cache.get(keys[-1])[0]
+
+
+def test_cached_function_until_its_table_is_written():
+    calls = []
+
+    @cached('cache_test_departments')
+    def departments(page: int = 1, name: str = None):
+        calls.append((page, name))
+        return [{'page': page, 'name': name}]
+
+    assert departments(1, None) == departments(page=1)
+    assert len(calls) == 1
+
+    tables_changed('cache_test_departments')
+    departments(1)
+    assert len(calls) == 2
+
+    tables_changed('cache_test_other_table')
+    departments(1)
+    assert len(calls) == 2
@@ -0,0 +1,93 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import text
+
+from app.db import employee
+from app.db.statements import plan_current_changes, apply_current_changes
+
+
+def _rows(engine, table, emp_no=10001):
+    with engine.connect() as conn:
+        sql = text(f'SELECT * FROM {table} WHERE emp_no = :emp_no ORDER BY 1, 2, 3')
+        return [tuple(row) for row in conn.execute(sql, {'emp_no': emp_no})]
+
+
+def test_transfer_back_to_former_department_is_rejected(sqlite_engine):
+    with sqlite_engine.connect() as conn:
+        plan, rejected = plan_current_changes(
+            conn, 'dept_emp', [{'emp_no': 10001, 'dept_no': 'd001'}], '2010-01-01', '9999-01-01')
+
+    assert plan == []
+    assert rejected == {10001: "Employee 10001 already has a department record for d001"}
+
+
+def test_transfer_to_current_department_is_a_no_op(sqlite_engine):
+    with sqlite_engine.connect() as conn:
+        plan, rejected = plan_current_changes(
+            conn, 'dept_emp', [{'emp_no': 10001, 'dept_no': 'd002'}], '2010-01-01', '9999-01-01')
+
+    assert (plan, rejected) == ([], {})
+
+
+def test_transfer_closes_current_row_and_keeps_history(sqlite_engine):
+    with sqlite_engine.begin() as conn:
+        plan, rejected = plan_current_changes(
+            conn, 'dept_emp', [{'emp_no': 10001, 'dept_no': 'd003'}], '2010-01-01', '9999-01-01')
+        apply_current_changes(conn, 'dept_emp', plan)
+
+    assert _rows(sqlite_engine, 'dept_emp') == [
+        (10001, 'd001', '1990-01-01', '2000-01-01'),
+        (10001, 'd002', '2000-01-01', '2010-01-01'),
+        (10001, 'd003', '2010-01-01', '9999-01-01'),
+    ]
+
+
+def test_same_day_change_restates_current_row(sqlite_engine):
+    with sqlite_engine.begin() as conn:
+        plan, rejected = plan_current_changes(
+            conn, 'salaries', [{'emp_no': 10001, 'salary': 65000}], '2000-01-01', '9999-01-01')
+        apply_current_changes(conn, 'salaries', plan)
+
+    assert _rows(sqlite_engine, 'salaries') == [
+        (10001, 50000, '1990-01-01', '2000-01-01'),
+        (10001, 65000, '2000-01-01', '9999-01-01'),
+    ]
+
+
+def test_change_before_current_row_is_rejected(sqlite_engine):
+    with sqlite_engine.connect() as conn:
+        plan, rejected = plan_current_changes(
+            conn, 'salaries', [{'emp_no': 10001, 'salary': 65000}], '1999-01-01', '9999-01-01')
+
+    assert plan == []
+    assert list(rejected) == [10001]
+
+
+def test_update_employee_transfer_back_is_409_and_writes_nothing(sqlite_engine, monkeypatch):
+    # 派生表不在测试库中
+    monkeypatch.setattr(employee, 'engine', sqlite_engine)
+    monkeypatch.setattr(employee, 'capture_derived', lambda *args, **kwargs: {})
+    monkeypatch.setattr(employee, 'sync_derived', lambda *args, **kwargs: None)
+    salaries = _rows(sqlite_engine, 'salaries')
+
+    with pytest.raises(HTTPException) as error:
+        employee.db_update_emp(10001, None, None, None, 'New Name', dept_no='d001', salary=70000,
+                               from_date='2010-01-01')
+
+    assert error.value.status_code == 409
+    assert _rows(sqlite_engine, 'salaries') == salaries
+    assert _rows(sqlite_engine, 'employees')[0][2] == 'Georgi'
+
+
+def test_add_employee_binds_quoted_names(sqlite_engine, monkeypatch):
+    monkeypatch.setattr(employee, 'engine', sqlite_engine)
+    monkeypatch.setattr(employee, 'sync_derived', lambda *args, **kwargs: None)
+    monkeypatch.setattr(employee, 'tables_changed', lambda *args, **kwargs: None)
+
+    employee.db_add_emp(10007, 'F', '1970-01-01', '2020-01-01', "Mary O'Brien", 'd001', 45000, "Chef d'équipe")
+
+    assert _rows(sqlite_engine, 'employees', 10007) == [
+        (10007, '1970-01-01', 'Mary', "O'Brien", 'F', '2020-01-01')]
+    assert [row[1] for row in _rows(sqlite_engine, 'titles', 10007)] == ["Chef d'équipe"]
+    assert [row[1] for row in _rows(sqlite_engine, 'dept_emp', 10007)] == ['d001']
+    assert [row[1] for row in _rows(sqlite_engine, 'salaries', 10007)] == [45000]
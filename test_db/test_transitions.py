@@ -0,0 +1,59 @@
+from sqlalchemy import text
+
+from app.db.employee_transitions import refresh_transitions, columns, select_transitions_sql
+
+
+def _transitions(conn, emp_no=10001):
+    sql = text(f'SELECT {columns} FROM employee_transitions WHERE emp_no = :emp_no ORDER BY kind, at_date')
+    return [tuple(row) for row in conn.execute(sql, {'emp_no': emp_no})]
+
+
+def _all(conn, source='employee_transitions'):
+    return [tuple(row) for row in conn.execute(text(f'SELECT {columns} FROM {source} ORDER BY 1, 2, 3, 5'))]
+
+
+def test_new_record_appends_a_transition(sqlite_engine):
+    with sqlite_engine.begin() as conn:
+        conn.execute(text("UPDATE dept_emp SET to_date = '2005-01-01' WHERE emp_no = 10001 AND dept_no = 'd002'"))
+        conn.execute(text("INSERT INTO dept_emp VALUES (10001, 'd003', '2005-01-01', '9999-01-01')"))
+        refresh_transitions(conn, [10001])
+
+        assert _transitions(conn) == [
+            (10001, 'dept', '2000-01-01', 'd001', 'd002'),
+            (10001, 'dept', '2005-01-01', 'd002', 'd003'),
+            (10001, 'title', '2000-01-01', 'Engineer', 'Senior Engineer'),
+        ]
+
+
+def test_deleting_the_middle_record_keeps_the_merged_transition(sqlite_engine):
+    # d001 -> d002 -> d003 变成 d001 -> d003：新行与旧的 d002 -> d003 行主键相同
+    with sqlite_engine.begin() as conn:
+        conn.execute(text("UPDATE dept_emp SET to_date = '2005-01-01' WHERE emp_no = 10001 AND dept_no = 'd002'"))
+        conn.execute(text("INSERT INTO dept_emp VALUES (10001, 'd003', '2005-01-01', '9999-01-01')"))
+        refresh_transitions(conn, [10001])
+        conn.execute(text("DELETE FROM dept_emp WHERE emp_no = 10001 AND dept_no = 'd002'"))
+        refresh_transitions(conn, [10001])
+
+        assert _transitions(conn) == [
+            (10001, 'dept', '2005-01-01', 'd001', 'd003'),
+            (10001, 'title', '2000-01-01', 'Engineer', 'Senior Engineer'),
+        ]
+        assert _all(conn) == _all(conn, f'({select_transitions_sql.format(where="")}) derived')
+
+
+def test_edited_title_replaces_its_transition(sqlite_engine):
+    with sqlite_engine.begin() as conn:
+        conn.execute(text("UPDATE titles SET title = 'Staff' WHERE emp_no = 10001 AND title = 'Engineer'"))
+        refresh_transitions(conn, [10001])
+
+        assert _transitions(conn) == [
+            (10001, 'dept', '2000-01-01', 'd001', 'd002'),
+            (10001, 'title', '2000-01-01', 'Staff', 'Senior Engineer'),
+        ]
+
+
+def test_refresh_without_changes_writes_nothing(sqlite_engine):
+    with sqlite_engine.begin() as conn:
+        before = _all(conn)
+        assert refresh_transitions(conn, [10001, 10002]) == 0
+        assert _all(conn) == before